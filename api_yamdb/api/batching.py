@@ -0,0 +1,176 @@
+# api/batching.py
+"""
+Приложение api.
+Пакетная запись: id объектов после bulk_create и отложенная
+групповая вставка комментариев (write-behind).
+В режиме `COMMENT_WRITE_BEHIND` комментарии из параллельных запросов
+копятся в очереди процесса и вставляются одним bulk_create в одной
+транзакции: одна фиксация (и один fsync) на пакет, а не на комментарий.
+Каждый запрос получает ответ только после фиксации своего пакета.
+Параллельные запросы бывают только у многопоточных воркеров
+(gunicorn --threads); без них комментарий пишется сразу.
+"""
+import threading
+from collections import Counter
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import NotSupportedError, connection, transaction
+
+from reviews.counters import apply_comments_delta
+from reviews.models import Comment
+from .caching import bump_on_commit, comments_scope, reviews_scope
+
+
+def fill_bulk_ids(objects):
+    """
+    Проставляет id объектам после bulk_create, если СУБД их
+    не возвращает (SQLite). Вызывается в той же транзакции: пока
+    транзакция держит блокировку записи SQLite, другие не вставляют,
+    а AUTOINCREMENT выдаёт id по возрастанию, поэтому последние id
+    таблицы — наши. На других СУБД это не так: там — ошибка.
+    """
+    if not objects or connection.features.can_return_rows_from_bulk_insert:
+        return
+    if connection.vendor != 'sqlite' or not connection.in_atomic_block:
+        raise NotSupportedError(
+            'id после bulk_create восстанавливаются только на SQLite '
+            'внутри транзакции; на этой СУБД нужен bulk_create, '
+            'возвращающий id.'
+        )
+    model = type(objects[0])
+    ids = (model.objects
+           .order_by('-id')
+           .values_list('id', flat=True)[:len(objects)])
+    for obj, pk in zip(objects, sorted(ids)):
+        obj.pk = pk
+
+
+class PendingWrite:
+    """Комментарий в очереди и результат его записи."""
+
+    def __init__(self, comment):
+        self.comment = comment
+        self.error = None
+        self.done = threading.Event()
+
+
+class CommentWriteBehind:
+    """
+    Групповая фиксация без фонового потока: первый запрос пустой
+    очереди становится ведущим и записывает всю очередь на своём
+    соединении. Ждёт он, только пока есть запросы на создание
+    комментария, ещё не вставшие в очередь (`expect`), — не дольше
+    `COMMENT_WRITE_BEHIND_DELAY` секунд и до заполнения пакета
+    `COMMENT_WRITE_BEHIND_MAX_BATCH`. Без других запросов (например,
+    в синхронном воркере) пакет пишется сразу. Остальные запросы
+    ждут, пока ведущий зафиксирует пакет.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.changed = threading.Condition(self.lock)
+        self.pending = []
+        # Запросы внутри expect(), ещё не вставшие в очередь.
+        self.incoming = 0
+        self.local = threading.local()
+
+    @contextmanager
+    def expect(self):
+        """Отмечает запрос, который, вероятно, сохранит комментарий."""
+        if not self.enabled():
+            yield
+            return
+        with self.lock:
+            self.incoming += 1
+        self.local.expected = True
+        try:
+            yield
+        finally:
+            self.arrived()
+
+    def arrived(self):
+        """Запрос встал в очередь или завершился без комментария."""
+        if getattr(self.local, 'expected', False):
+            self.local.expected = False
+            with self.lock:
+                self.incoming -= 1
+                self.changed.notify_all()
+
+    @staticmethod
+    def enabled():
+        # Внутри внешней транзакции нельзя фиксировать чужие
+        # комментарии — тогда пишем сразу.
+        return (getattr(settings, 'COMMENT_WRITE_BEHIND', False)
+                and not connection.in_atomic_block)
+
+    def save(self, comment):
+        """Сохраняет комментарий; возвращает его после фиксации."""
+        if not self.enabled():
+            comment.save()
+            return comment
+        entry = PendingWrite(comment)
+        max_batch = getattr(settings, 'COMMENT_WRITE_BEHIND_MAX_BATCH', 100)
+        with self.lock:
+            self.pending.append(entry)
+            leader = len(self.pending) == 1
+        self.arrived()
+        if leader:
+            with self.lock:
+                self.changed.wait_for(
+                    lambda: (len(self.pending) >= max_batch
+                             or not self.incoming),
+                    timeout=getattr(
+                        settings, 'COMMENT_WRITE_BEHIND_DELAY', 0.005
+                    )
+                )
+                batch, self.pending = self.pending, []
+            self.flush(batch)
+        entry.done.wait()
+        if entry.error is not None:
+            raise entry.error
+        return comment
+
+    def flush(self, batch):
+        try:
+            try:
+                self.write(batch)
+            except Exception:
+                # Один неудачный комментарий (например, отзыв успели
+                # удалить) не должен отменять остальные: пишем по одному.
+                for entry in batch:
+                    comment = entry.comment
+                    comment.pk = None
+                    comment._state.adding = True
+                    try:
+                        with transaction.atomic():
+                            comment.save()
+                    except Exception as error:
+                        entry.error = error
+        finally:
+            for entry in batch:
+                entry.done.set()
+
+    @staticmethod
+    def write(batch):
+        """
+        Вставляет пакет одной транзакцией. bulk_create не отправляет
+        сигналы, поэтому счётчики отзывов и версии кэша обновляются
+        здесь — по одному разу на отзыв.
+        """
+        comments = [entry.comment for entry in batch]
+        with transaction.atomic():
+            Comment.objects.bulk_create(comments)
+            fill_bulk_ids(comments)
+            added = Counter(comment.review_id for comment in comments)
+            for review_id, count in added.items():
+                apply_comments_delta(review_id, count)
+            title_ids = {comment.review.title_id for comment in comments}
+            bump_on_commit(
+                *map(comments_scope, added), *map(reviews_scope, title_ids)
+            )
+        for comment in comments:
+            comment._loaded_review_id = comment.review_id
+
+
+comment_writer = CommentWriteBehind()
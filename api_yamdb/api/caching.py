@@ -0,0 +1,192 @@
+# api/caching.py
+"""
+Приложение api.
+Кэш ответов на чтение каталога с версионной инвалидацией.
+Любое изменение произведений, жанров, категорий или отзывов
+увеличивает версию каталога, и все старые ключи перестают читаться.
+Версии других ресурсов (отзывы произведения, комментарии к отзыву,
+пользователи) хранятся так же и используются для ETag.
+"""
+import hashlib
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from rest_framework.response import Response
+
+CATALOG = 'catalog'
+USERS = 'users'
+USERNAMES = 'usernames'
+STATS_KEYS = {
+    'hits': 'response_cache:hits',
+    'misses': 'response_cache:misses',
+}
+# Как часто процесс переносит свои счётчики в общий кэш, секунд.
+STATS_FLUSH_INTERVAL = 10
+
+
+def get_cache():
+    return caches[settings.RESPONSE_CACHE_ALIAS]
+
+
+def reviews_scope(title_id):
+    return f'reviews:{title_id}'
+
+
+def comments_scope(review_id):
+    return f'comments:{review_id}'
+
+
+def get_version(scope):
+    """
+    Версия ресурса — время последнего изменения в наносекундах.
+    Если ключ вытеснен из кэша, версия начинается с текущего времени
+    и не повторяет уже выданные значения.
+    """
+    cache = get_cache()
+    key = f'version:{scope}'
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, time.time_ns(), None)
+        version = cache.get(key)
+    return version
+
+
+def get_versions(scopes):
+    cache = get_cache()
+    keys = {f'version:{scope}': scope for scope in scopes}
+    found = cache.get_many(keys)
+    return [
+        found[key] if key in found else get_version(scope)
+        for key, scope in keys.items()
+    ]
+
+
+def bump_version(scope):
+    cache = get_cache()
+    key = f'version:{scope}'
+    current = cache.get(key) or 0
+    cache.set(key, max(time.time_ns(), current + 1), None)
+
+
+def bump_on_commit(*scopes):
+    """
+    Увеличивает версии после фиксации транзакции, чтобы под новой
+    версией не закэшировались ещё не зафиксированные данные.
+    """
+    def bump():
+        for scope in scopes:
+            bump_version(scope)
+    transaction.on_commit(bump)
+
+
+def get_catalog_version():
+    return get_version(CATALOG)
+
+
+def bump_catalog_version():
+    bump_version(CATALOG)
+
+
+class LookupStats:
+    """
+    Счётчики попаданий и промахов в памяти процесса. Запрос только
+    увеличивает счётчик под блокировкой; в общий кэш накопленное
+    переносится не чаще раза в STATS_FLUSH_INTERVAL секунд, а не
+    записью файла кэша на каждый запрос. Итог приблизительный:
+    incr файлового кэша не атомарен между процессами.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.pending = Counter()
+        self.flushed_at = time.monotonic()
+
+    def count(self, result):
+        with self.lock:
+            self.pending[result] += 1
+            now = time.monotonic()
+            if now - self.flushed_at < STATS_FLUSH_INTERVAL:
+                return
+            pending, self.pending = self.pending, Counter()
+            self.flushed_at = now
+        cache = get_cache()
+        for name, count in pending.items():
+            key = STATS_KEYS[name]
+            if not cache.add(key, count, None):
+                try:
+                    cache.incr(key, count)
+                except ValueError:
+                    cache.set(key, count, None)
+
+    def get(self):
+        """Общие счётчики плюс ещё не перенесённые счётчики процесса."""
+        cache = get_cache()
+        with self.lock:
+            pending = dict(self.pending)
+        return {
+            name: cache.get(key, 0) + pending.get(name, 0)
+            for name, key in STATS_KEYS.items()
+        }
+
+    def reset(self):
+        with self.lock:
+            self.pending.clear()
+
+
+lookup_stats = LookupStats()
+
+
+def count_lookup(result):
+    lookup_stats.count(result)
+
+
+def get_stats():
+    return lookup_stats.get()
+
+
+def make_cache_key(request, version):
+    """Ключ из версии, хоста, пути и отсортированных параметров запроса."""
+    query = '&'.join(
+        f'{name}={value}'
+        for name, values in sorted(request.query_params.lists())
+        for value in values
+    )
+    signature = f'{request.get_host()}{request.path}?{query}'
+    digest = hashlib.md5(signature.encode('utf-8')).hexdigest()
+    return f'response:{version}:{digest}'
+
+
+class CatalogCacheMixin:
+    """
+    Кэширует ответы `list` и `retrieve`. Ответы каталога не зависят
+    от пользователя, поэтому ключ общий для всех клиентов.
+    Заголовок `X-Cache` показывает, был ли ответ взят из кэша.
+    """
+
+    def cached_response(self, handler, request, *args, **kwargs):
+        cache = get_cache()
+        key = make_cache_key(request, get_catalog_version())
+        data = cache.get(key)
+        if data is not None:
+            count_lookup('hits')
+            response = Response(data)
+            response['X-Cache'] = 'HIT'
+            return response
+        count_lookup('misses')
+        response = handler(request, *args, **kwargs)
+        if response.status_code == 200:
+            cache.set(key, response.data, settings.RESPONSE_CACHE_TIMEOUT)
+        response['X-Cache'] = 'MISS'
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(
+            super().retrieve, request, *args, **kwargs
+        )
@@ -0,0 +1,34 @@
+# api/checks.py
+"""
+Приложение api.
+Системные проверки настроек (`manage.py check`, runserver, migrate).
+"""
+from django.conf import settings
+from django.core import checks
+
+# Бэкенды, которые не видят изменения из других процессов.
+PROCESS_LOCAL_BACKENDS = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+@checks.register(checks.Tags.caches)
+def check_shared_cache(app_configs=None, **kwargs):
+    """
+    Кэш в памяти процесса недопустим: версию увеличил бы только
+    воркер, обработавший запись, а остальные отдавали бы старые
+    ответы, 304 и справочники до перезапуска.
+    """
+    alias = settings.RESPONSE_CACHE_ALIAS
+    backend = settings.CACHES[alias]['BACKEND']
+    if (backend not in PROCESS_LOCAL_BACKENDS
+            or getattr(settings, 'RESPONSE_CACHE_ALLOW_LOCAL', False)):
+        return []
+    return [checks.Error(
+        f'Кэш `{alias}` ({backend}) не общий для процессов: версии '
+        'каталога, ETag и справочников разойдутся между воркерами.',
+        hint='Укажите файловый, Redis или Memcached бэкенд, а для '
+             'одного процесса — RESPONSE_CACHE_ALLOW_LOCAL = True.',
+        id='api.E001',
+    )]
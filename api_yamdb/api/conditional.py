@@ -0,0 +1,78 @@
+# api/conditional.py
+"""
+Приложение api.
+Условные GET-запросы: ETag и Last-Modified по версиям ресурсов.
+Версии читаются из общего для воркеров кэша, поэтому ответ 304
+отдаётся без запросов к базе и без сериализации.
+"""
+import hashlib
+
+from django.utils.cache import get_conditional_response, quote_etag
+from django.utils.http import http_date
+
+from .caching import get_versions
+
+
+class NotModified(Exception):
+    """Прерывает обработку запроса готовым ответом 304/412."""
+
+    def __init__(self, response):
+        super().__init__()
+        self.response = response
+
+
+class ConditionalGetMixin:
+    """
+    Добавляет ETag и Last-Modified к ответам на GET и отвечает 304
+    на `If-None-Match`/`If-Modified-Since` сразу после проверки прав,
+    до обращения к базе.
+    Вьюсет перечисляет версии, от которых зависит ответ,
+    в `get_etag_scopes()`.
+    """
+    conditional_actions = ('list', 'retrieve')
+    etag_vary_on_user = False
+
+    def get_etag_scopes(self):
+        raise NotImplementedError
+
+    def get_etag(self, request, versions):
+        parts = [request.path, *map(str, versions)]
+        parts.extend(
+            f'{name}={value}'
+            for name, values in sorted(request.query_params.lists())
+            for value in values
+        )
+        if self.etag_vary_on_user:
+            parts.append(f'user={request.user.pk}')
+        digest = hashlib.md5('|'.join(parts).encode('utf-8')).hexdigest()
+        return quote_etag(digest)
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        self.etag = None
+        if (request.method not in ('GET', 'HEAD')
+                or self.action not in self.conditional_actions):
+            return
+        versions = get_versions(self.get_etag_scopes())
+        self.etag = self.get_etag(request, versions)
+        self.last_modified = max(versions) // 10 ** 9
+        response = get_conditional_response(
+            request, etag=self.etag, last_modified=self.last_modified
+        )
+        if response is not None:
+            raise NotModified(response)
+
+    def handle_exception(self, exc):
+        if isinstance(exc, NotModified):
+            return exc.response
+        return super().handle_exception(exc)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(
+            request, response, *args, **kwargs
+        )
+        if (getattr(self, 'etag', None)
+                and response.status_code in (200, 304)):
+            response['ETag'] = self.etag
+            response['Last-Modified'] = http_date(self.last_modified)
+        return response
@@ -0,0 +1,95 @@
+# api/export.py
+"""
+Приложение api.
+Потоковая выгрузка отзывов и комментариев произведения в NDJSON:
+одна строка — один JSON-объект. Строки читаются из базы порциями
+через `iterator(chunk_size=...)` и сразу отдаются клиенту, поэтому
+память не зависит от числа отзывов.
+"""
+import json
+from itertools import islice
+
+from django.conf import settings
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import ValidationError
+
+from reviews.models import Comment, Review
+from .flat_serializers import CommentFlatSerializer, ReviewFlatSerializer
+
+NDJSON_CONTENT_TYPE = 'application/x-ndjson'
+SINCE_PARAM = 'since'
+
+
+def get_chunk_size():
+    return getattr(settings, 'EXPORT_CHUNK_SIZE', 500)
+
+
+def parse_since(request):
+    """
+    `?since=` — момент, после которого опубликованы нужные записи
+    (ISO 8601). Время без часового пояса считается местным.
+    """
+    value = request.query_params.get(SINCE_PARAM)
+    if not value:
+        return None
+    try:
+        since = parse_datetime(value)
+    except ValueError:
+        since = None
+    if since is None:
+        raise ValidationError({SINCE_PARAM: [
+            'Укажите дату и время в формате ISO 8601, '
+            'например 2024-01-31T12:00:00Z.'
+        ]})
+    if timezone.is_naive(since):
+        since = timezone.make_aware(since)
+    return since
+
+
+def chunks(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def export_rows(queryset, flat, kind, extra_columns=None):
+    """
+    Строки NDJSON с типом записи `kind` в поле `type`.
+    `extra_columns` — `{колонка: поле}` сверх полей сериализатора.
+    """
+    extra_columns = extra_columns or {}
+    chunk_size = get_chunk_size()
+    rows = (queryset
+            .order_by('pub_date', 'id')
+            .values(*flat.get_columns(), *extra_columns)
+            .iterator(chunk_size=chunk_size))
+    for chunk in chunks(rows, chunk_size):
+        for row, data in zip(chunk, flat.serialize(chunk)):
+            for column, name in extra_columns.items():
+                data[name] = row[column]
+            yield json.dumps(
+                {'type': kind, **data}, ensure_ascii=False
+            ) + '\n'
+
+
+def export_title_reviews(title_id, since=None):
+    """
+    Сначала все отзывы произведения, затем все комментарии к ним,
+    каждые по (pub_date, id). С `since` — только опубликованные
+    позже: для инкрементальной выгрузки достаточно передать
+    наибольший `pub_date` из прошлой.
+    """
+    reviews = Review.objects.filter(title_id=title_id)
+    comments = Comment.objects.filter(review__title_id=title_id)
+    if since is not None:
+        reviews = reviews.filter(pub_date__gt=since)
+        comments = comments.filter(pub_date__gt=since)
+    yield from export_rows(reviews, ReviewFlatSerializer(), 'review')
+    yield from export_rows(
+        comments, CommentFlatSerializer(), 'comment',
+        extra_columns={'review_id': 'review'}
+    )
@@ -0,0 +1,72 @@
+# api/fields.py
+"""
+Приложение api.
+Поля сериализаторов, разрешающие slug-и пакетно.
+"""
+from rest_framework import serializers
+from rest_framework.relations import MANY_RELATION_KWARGS
+
+PRELOADED_SLUGS = 'preloaded_slugs'
+
+
+class BatchSlugManyRelatedField(serializers.ManyRelatedField):
+    """Список slug-ов разрешается одним запросом `slug__in`."""
+
+    def to_internal_value(self, data):
+        if isinstance(data, str) or not hasattr(data, '__iter__'):
+            self.fail('not_a_list', input_type=type(data).__name__)
+        if not self.allow_empty and len(data) == 0:
+            self.fail('empty')
+        return self.child_relation.to_internal_value_many(data)
+
+
+class BatchSlugRelatedField(serializers.SlugRelatedField):
+    """
+    SlugRelatedField, который при `many=True` загружает все объекты
+    одним запросом и сообщает обо всех неизвестных slug-ах сразу.
+    Если в контексте сериализатора есть `preloaded_slugs`
+    (`{модель: {slug: объект}}`), запросы не выполняются вовсе —
+    так массовое создание разрешает slug-и всего пакета заранее.
+    """
+
+    @classmethod
+    def many_init(cls, *args, **kwargs):
+        list_kwargs = {'child_relation': cls(*args, **kwargs)}
+        for key in kwargs:
+            if key in MANY_RELATION_KWARGS:
+                list_kwargs[key] = kwargs[key]
+        return BatchSlugManyRelatedField(**list_kwargs)
+
+    def get_preloaded(self):
+        preloaded = self.context.get(PRELOADED_SLUGS) or {}
+        return preloaded.get(self.get_queryset().model)
+
+    def lookup(self, slugs):
+        preloaded = self.get_preloaded()
+        if preloaded is not None:
+            return {
+                slug: preloaded[slug] for slug in slugs if slug in preloaded
+            }
+        return self.get_queryset().in_bulk(slugs, field_name=self.slug_field)
+
+    def to_internal_value(self, data):
+        if self.get_preloaded() is None:
+            return super().to_internal_value(data)
+        return self.to_internal_value_many([data])[0]
+
+    def to_internal_value_many(self, data):
+        slugs = []
+        for value in data:
+            if not isinstance(value, (str, int)) or isinstance(value, bool):
+                self.fail('invalid')
+            slugs.append(str(value))
+        found = self.lookup(set(slugs))
+        missing = [slug for slug in dict.fromkeys(slugs) if slug not in found]
+        if missing:
+            raise serializers.ValidationError([
+                self.error_messages['does_not_exist'].format(
+                    slug_name=self.slug_field, value=slug
+                )
+                for slug in missing
+            ])
+        return [found[slug] for slug in slugs]
@@ -0,0 +1,129 @@
+# api/fieldsets.py
+"""
+Приложение api.
+Выборочные поля ответа: `?fields=id,name` оставляет только
+перечисленные поля, `?omit=description` исключает указанные.
+Вместе с ответом сокращается и запрос к базе: невостребованные
+колонки откладываются через `only()`, лишние JOIN и prefetch
+отбрасываются.
+"""
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.settings import api_settings
+
+from .pagination import get_keyset_columns, is_keyset_field
+
+FIELDS_PARAM = 'fields'
+OMIT_PARAM = 'omit'
+
+
+def parse_names(value):
+    return {name.strip() for name in value.split(',') if name.strip()}
+
+
+def get_sparse_fields(request, available):
+    """
+    Возвращает множество полей для ответа или `None`,
+    если клиент не ограничивал набор полей.
+    Неизвестные имена игнорируются.
+    """
+    if request is None or request.method not in SAFE_METHODS:
+        return None
+    params = request.query_params
+    if FIELDS_PARAM not in params and OMIT_PARAM not in params:
+        return None
+    selected = set(available)
+    if params.get(FIELDS_PARAM):
+        selected &= parse_names(params[FIELDS_PARAM])
+    if params.get(OMIT_PARAM):
+        selected -= parse_names(params[OMIT_PARAM])
+    return selected
+
+
+class SparseFieldsetMixin:
+    """Сериализатор отдаёт только поля, выбранные клиентом."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        selected = get_sparse_fields(
+            self.context.get('request'), self.fields.keys()
+        )
+        if selected is None:
+            return
+        for name in list(self.fields):
+            if name not in selected:
+                self.fields.pop(name)
+
+
+def prune_queryset(queryset, serializer, selected, keep=()):
+    """
+    Ограничивает queryset колонками и связями, нужными полям `selected`.
+    `keep` — поля модели, которые нужны независимо от ответа
+    (например, ключ курсорной пагинации).
+    """
+    opts = queryset.model._meta
+    columns = {opts.pk.name, *keep}
+    relations = set()
+    for name in selected:
+        field = serializer.fields[name]
+        # У SerializerMethodField source == '*': считаем, что метод
+        # читает одноимённый атрибут модели.
+        source = name if field.source == '*' else field.source
+        root = source.split('.')[0]
+        try:
+            model_field = opts.get_field(root)
+        except FieldDoesNotExist:
+            continue
+        if model_field.many_to_many or model_field.one_to_many:
+            relations.add(root)
+            continue
+        columns.add(root)
+        if model_field.is_relation:
+            relations.add(root)
+
+    select_related = queryset.query.select_related
+    prefetches = queryset._prefetch_related_lookups
+    queryset = queryset.select_related(None).prefetch_related(None)
+    if isinstance(select_related, dict):
+        needed = [path for path in select_related if path in relations]
+        if needed:
+            queryset = queryset.select_related(*needed)
+    prefetches = [
+        lookup for lookup in prefetches
+        if getattr(lookup, 'prefetch_through', lookup).split('__')[0]
+        in relations
+    ]
+    if prefetches:
+        queryset = queryset.prefetch_related(*prefetches)
+    return queryset.only(*columns)
+
+
+class SparseFieldsetViewMixin:
+    """Сокращает queryset вьюсета под поля, выбранные клиентом."""
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        params = self.request.query_params
+        if (self.action not in ('list', 'retrieve')
+                or (FIELDS_PARAM not in params and OMIT_PARAM not in params)):
+            return queryset
+        serializer = self.get_serializer_class()(
+            context=self.get_serializer_context()
+        )
+        selected = set(serializer.fields)
+        if selected == set(serializer.get_fields()):
+            return queryset
+        # Поля сортировки (в том числе `?ordering=`, который применится
+        # позже) читаются курсорной пагинацией.
+        keep = get_keyset_columns(queryset, self)
+        opts = queryset.model._meta
+        requested = params.get(api_settings.ORDERING_PARAM, '')
+        for name in parse_names(requested):
+            name = name.lstrip('-')
+            try:
+                model_field = opts.get_field(name)
+            except FieldDoesNotExist:
+                continue
+            if is_keyset_field(model_field, name):
+                keep.append(name)
+        return prune_queryset(queryset, serializer, selected, keep)
@@ -1,17 +1,74 @@
 # api/filters.py
 """
 Приложение api.
-Реализация фильтрации для произведений.
+Реализация фильтрации и поиска для произведений.
 """
 import django_filters as filters
-from reviews.models import Title
+from rest_framework.filters import BaseFilterBackend
+
+from reviews.genres import MODE_ALL, MODE_ANY, filter_by_genres
+from reviews.models import Category, Genre, Title
+from reviews.search import get_search_backend
+from .reference import get_reference
 
 class TitleFilter(filters.FilterSet):
     name = filters.CharFilter(field_name='name', lookup_expr='icontains')
-    category = filters.CharFilter(field_name='category__slug')
-    genre = filters.CharFilter(field_name='genre__slug', lookup_expr='exact')
+    # Slug категории разрешается по справочнику: фильтр идёт
+    # по category_id без JOIN и использует индекс (category, year).
+    category = filters.CharFilter(method='filter_category')
+    # `?genre=a,b` — несколько жанров через запятую,
+    # `?genre_mode=all` (по умолчанию) или `any`.
+    genre = filters.CharFilter(method='filter_genre')
+    genre_mode = filters.ChoiceFilter(
+        choices=((MODE_ALL, MODE_ALL), (MODE_ANY, MODE_ANY)),
+        method='filter_genre_mode'
+    )
     year = filters.NumberFilter(field_name='year')
+    # Диапазоны включают границы.
+    year_min = filters.NumberFilter(field_name='year', lookup_expr='gte')
+    year_max = filters.NumberFilter(field_name='year', lookup_expr='lte')
+    rating_min = filters.NumberFilter(field_name='rating', lookup_expr='gte')
+    rating_max = filters.NumberFilter(field_name='rating', lookup_expr='lte')
 
     class Meta:
         model = Title
-        fields = ('name', 'category', 'genre', 'year')
+        fields = (
+            'name', 'category', 'genre', 'genre_mode', 'year',
+            'year_min', 'year_max', 'rating_min', 'rating_max'
+        )
+
+    def filter_category(self, queryset, name, value):
+        category = get_reference(Category).by_slug.get(value)
+        if category is None:
+            return queryset.none()
+        return queryset.filter(category_id=category.pk)
+
+    def filter_genre(self, queryset, name, value):
+        slugs = [slug.strip() for slug in value.split(',') if slug.strip()]
+        if not slugs:
+            return queryset
+        mode = self.form.cleaned_data.get('genre_mode') or MODE_ALL
+        by_slug = get_reference(Genre).by_slug
+        genres = [by_slug[slug] for slug in slugs if slug in by_slug]
+        if mode == MODE_ALL and len(genres) < len(set(slugs)):
+            # Неизвестный жанр: ни одно произведение не подходит.
+            return queryset.none()
+        return filter_by_genres(queryset, genres, mode)
+
+    def filter_genre_mode(self, queryset, name, value):
+        # Режим читается в filter_genre.
+        return queryset
+
+
+class TitleSearchFilter(BaseFilterBackend):
+    """
+    Полнотекстовый поиск по названию: `?q=`.
+    Результаты упорядочены по релевантности, если не задан `?ordering=`.
+    """
+    search_param = 'q'
+
+    def filter_queryset(self, request, queryset, view):
+        query = request.query_params.get(self.search_param, '').strip()
+        if not query:
+            return queryset
+        return get_search_backend().search(queryset, query)
@@ -0,0 +1,191 @@
+# api/flat_serializers.py
+"""
+Приложение api.
+Быстрые сериализаторы списков для чтения.
+Строят ответ из `values()` без экземпляров моделей и полей DRF:
+для каждого поля заранее подготовлена функция доступа к колонкам
+строки. JSON совпадает побайтно с ответом обычных сериализаторов.
+"""
+from operator import attrgetter, itemgetter
+
+from django.conf import settings
+from rest_framework import serializers
+from rest_framework.response import Response
+
+from reviews.models import Category, Genre, Title
+from .fieldsets import get_sparse_fields
+from .pagination import get_keyset_columns
+from .reference import get_reference
+
+# Форматирование даты берём у DRF, чтобы вывод совпадал точно.
+datetime_field = serializers.DateTimeField()
+
+
+class FlatField:
+    """Поле ответа: колонки `values()` и функция сборки значения."""
+
+    def __init__(self, columns, build=None):
+        self.columns = tuple(columns)
+        if build is None and self.columns:
+            build = itemgetter(self.columns[0])
+        self.build = build
+
+
+def format_datetime(column):
+    def build(row):
+        return datetime_field.to_representation(row[column])
+    return build
+
+
+class FlatSerializer:
+    """
+    Базовый быстрый сериализатор.
+    `fields` перечисляет поля ответа в том же порядке, что и обычный
+    сериализатор; `prepare()` может догрузить связанные данные
+    одним запросом на страницу.
+    """
+    fields = {}
+
+    def __init__(self, request=None):
+        selected = get_sparse_fields(request, self.fields)
+        self.field_names = [
+            name for name in self.fields
+            if selected is None or name in selected
+        ]
+
+    def get_columns(self):
+        columns = {'id'}
+        for name in self.field_names:
+            columns.update(self.fields[name].columns)
+        return sorted(columns)
+
+    def get_rows(self, queryset, extra_columns=()):
+        """
+        queryset → queryset словарей с нужными колонками.
+        `extra_columns` читаются сверх полей ответа (ключ курсора).
+        """
+        columns = sorted({*self.get_columns(), *extra_columns})
+        return (queryset
+                .select_related(None)
+                .prefetch_related(None)
+                .values(*columns))
+
+    def prepare(self, rows):
+        return {}
+
+    def serialize(self, rows):
+        rows = list(rows)
+        extra = self.prepare(rows)
+        accessors = [
+            (name, extra.get(name) or self.fields[name].build)
+            for name in self.field_names
+        ]
+        return [
+            {name: build(row) for name, build in accessors}
+            for row in rows
+        ]
+
+
+class TitleFlatSerializer(FlatSerializer):
+    """Аналог TitleReadSerializer."""
+    fields = {
+        'id': FlatField(('id',)),
+        'name': FlatField(('name',)),
+        'year': FlatField(('year',)),
+        'description': FlatField(
+            ('description',), lambda row: row['description'] or ''
+        ),
+        'rating': FlatField(('rating',)),
+        # Жанры и категория заполняются в prepare() из справочников
+        # в памяти: жанры — по маске `genre_mask`, без запросов.
+        'genre': FlatField(('genre_mask',)),
+        'category': FlatField(('category_id',)),
+    }
+
+    def prepare(self, rows):
+        extra = {}
+        if 'category' in self.field_names:
+            categories = get_reference(Category)
+            extra['category'] = (
+                lambda row: categories.represent(row['category_id'])
+            )
+        if 'genre' in self.field_names:
+            extra['genre'] = self.prepare_genres(rows, get_reference(Genre))
+        return extra
+
+    @staticmethod
+    def prepare_genres(rows, genres):
+        if all(genre.bit is not None for genre in genres.objects):
+            by_mask = {}
+            for row in rows:
+                mask = row['genre_mask']
+                if mask not in by_mask:
+                    # Справочник уже упорядочен по названию.
+                    by_mask[mask] = [
+                        {'name': genre.name, 'slug': genre.slug}
+                        for genre in genres.objects
+                        if mask >> genre.bit & 1
+                    ]
+            return lambda row: by_mask[row['genre_mask']]
+
+        # Жанров больше, чем битов в маске: читаем связи страницы.
+        by_title = {row['id']: [] for row in rows}
+        links = (Title.genre.through.objects
+                 .filter(title_id__in=list(by_title))
+                 .values_list('title_id', 'genre_id'))
+        for title_id, genre_id in links:
+            genre = genres.by_id.get(genre_id)
+            if genre is not None:
+                by_title[title_id].append(genre)
+        represented = {
+            title_id: [
+                {'name': genre.name, 'slug': genre.slug}
+                for genre in sorted(title_genres, key=attrgetter('name'))
+            ]
+            for title_id, title_genres in by_title.items()
+        }
+        return lambda row: represented[row['id']]
+
+
+class ReviewFlatSerializer(FlatSerializer):
+    """Аналог ReviewSerializer."""
+    fields = {
+        'id': FlatField(('id',)),
+        'text': FlatField(('text',)),
+        'author': FlatField(('author__username',)),
+        'score': FlatField(('score',)),
+        'pub_date': FlatField(('pub_date',), format_datetime('pub_date')),
+        'comments_count': FlatField(('comments_count',)),
+    }
+
+
+class CommentFlatSerializer(FlatSerializer):
+    """Аналог CommentSerializer."""
+    fields = {
+        'id': FlatField(('id',)),
+        'text': FlatField(('text',)),
+        'author': FlatField(('author__username',)),
+        'pub_date': FlatField(('pub_date',), format_datetime('pub_date')),
+    }
+
+
+class FlatListMixin:
+    """
+    Отдаёт `list` через быстрый сериализатор `flat_serializer_class`.
+    Отключается настройкой `FLAT_READ_SERIALIZERS = False`.
+    """
+    flat_serializer_class = None
+
+    def list(self, request, *args, **kwargs):
+        if (self.flat_serializer_class is None
+                or not getattr(settings, 'FLAT_READ_SERIALIZERS', True)):
+            return super().list(request, *args, **kwargs)
+        flat = self.flat_serializer_class(request)
+        queryset = self.filter_queryset(self.get_queryset())
+        # Поля сортировки нужны курсорной пагинации, даже если
+        # их нет среди выбранных `?fields=`.
+        rows = flat.get_rows(queryset, get_keyset_columns(queryset, self))
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(flat.serialize(page))
+        return Response(flat.serialize(rows))
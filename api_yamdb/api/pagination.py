@@ -0,0 +1,362 @@
+# api/pagination.py
+"""
+Приложение api.
+Пагинация: постраничная (по умолчанию) и курсорная (keyset) по запросу.
+"""
+import base64
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.core.paginator import InvalidPage, Paginator
+from django.db.models import F, Q
+from django.utils.functional import cached_property
+from rest_framework import exceptions
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class CachedCountPaginator(Paginator):
+    """
+    Paginator, берущий `count` из кэша по сигнатуре SQL-запроса.
+    Одинаково отфильтрованные списки делят одно значение в течение
+    `PAGINATION_COUNT_CACHE_TIMEOUT` секунд, поэтому число может
+    немного отставать от реального.
+    """
+    cache_prefix = 'pagination:count:'
+
+    def get_cache_key(self):
+        sql, params = self.object_list.query.sql_with_params()
+        signature = f'{self.object_list.db}:{sql}:{params!r}'
+        return self.cache_prefix + hashlib.md5(
+            signature.encode('utf-8')
+        ).hexdigest()
+
+    @cached_property
+    def count(self):
+        key = self.get_cache_key()
+        value = cache.get(key)
+        if value is None:
+            value = super().count
+            cache.set(
+                key, value, settings.PAGINATION_COUNT_CACHE_TIMEOUT
+            )
+        return value
+
+
+def get_keyset_ordering(queryset, view=None):
+    """
+    Порядок строк для ключа курсора: тот, что задан queryset-у
+    (`?ordering=`, релевантность поиска), иначе `view.cursor_ordering`
+    или `Meta.ordering` модели; `id` добавляется в конец.
+    """
+    ordering = tuple(
+        'id' if field == 'pk' else '-id' if field == '-pk' else field
+        for field in queryset.query.order_by
+    ) or tuple(
+        getattr(view, 'cursor_ordering', None)
+        or queryset.model._meta.ordering
+    )
+    if 'id' not in ordering and '-id' not in ordering:
+        ordering += ('id',)
+    return ordering
+
+
+def is_keyset_field(model_field, name):
+    """Колонка таблицы: обычное поле или `<fk>_id`, но не связь."""
+    return model_field.concrete and (
+        not model_field.is_relation or name == model_field.attname
+    )
+
+
+def get_keyset_columns(queryset, view=None):
+    """Колонки модели, которые читает курсор (для `values()`/`only()`)."""
+    opts = queryset.model._meta
+    columns = []
+    for field in get_keyset_ordering(queryset, view):
+        if not isinstance(field, str):
+            continue
+        try:
+            model_field = opts.get_field(field.lstrip('-'))
+        except FieldDoesNotExist:
+            continue
+        if is_keyset_field(model_field, field.lstrip('-')):
+            columns.append(field.lstrip('-'))
+    return columns
+
+
+class KeysetPagination(BasePagination):
+    """
+    Курсорная пагинация по составному ключу.
+    Позиция хранится как значения полей сортировки последней строки,
+    поэтому страница N стоит столько же, сколько первая:
+    `WHERE (name, id) > (:name, :id) ORDER BY name, id LIMIT n`.
+    Порядок берётся из queryset-а (например, `?ordering=-rating`),
+    иначе из `view.cursor_ordering` или `Meta.ordering` модели; `id`
+    добавляется в конец для однозначности. NULL в необязательных
+    полях всегда идут после значений. Сортировка по вычисляемым
+    значениям и связям в ключ не укладывается — это ошибка 400.
+    """
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Некорректный курсор.'
+    page_size = api_settings.PAGE_SIZE
+    # Необязательные поля ключа, заполняется в get_ordering().
+    nullable = frozenset()
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if not self.page_size:
+            return None
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(queryset, view)
+
+        cursor = self.decode_cursor(request, queryset.model)
+        self.reverse = cursor['reverse'] if cursor else False
+        if cursor:
+            queryset = queryset.filter(
+                self.keyset_filter(cursor['values'], self.reverse)
+            )
+        ordering = [
+            self.order_expression(field, self.reverse)
+            for field in self.ordering
+        ]
+        rows = list(queryset.order_by(*ordering)[:self.page_size + 1])
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        if self.reverse:
+            rows.reverse()
+
+        self.has_next = has_more if not self.reverse else bool(cursor)
+        self.has_previous = bool(cursor) if not self.reverse else has_more
+        self.first_row = rows[0] if rows else None
+        self.last_row = rows[-1] if rows else None
+        return rows
+
+    def get_ordering(self, queryset, view):
+        ordering = get_keyset_ordering(queryset, view)
+        opts = queryset.model._meta
+        self.nullable = set()
+        for field in ordering:
+            name = field.lstrip('-') if isinstance(field, str) else None
+            try:
+                model_field = opts.get_field(name) if name else None
+            except FieldDoesNotExist:
+                model_field = None
+            if model_field is None or not is_keyset_field(model_field, name):
+                raise exceptions.ValidationError({'ordering': [
+                    f'Сортировка по `{name or field}` несовместима с '
+                    'курсорной пагинацией: укажите `ordering` по полям '
+                    'произведения (для поиска `q` — тоже).'
+                ]})
+            if model_field.null:
+                self.nullable.add(name)
+        return ordering
+
+    def order_expression(self, field, reverse):
+        """Поле сортировки с учётом направления; NULL — в конце."""
+        descending = field.startswith('-') != reverse
+        name = field.lstrip('-')
+        if name not in self.nullable:
+            return f'-{name}' if descending else name
+        expression = F(name).desc if descending else F(name).asc
+        # При обратном обходе NULL оказываются в начале.
+        if reverse:
+            return expression(nulls_first=True)
+        return expression(nulls_last=True)
+
+    def keyset_filter(self, values, reverse):
+        """
+        Строит условие «строго после позиции» для составного ключа:
+        f1 >= v1 AND ((f1 > v1) OR (f1 = v1 AND f2 > v2) OR ...)
+        Для необязательных полей NULL считается больше любого значения.
+        """
+        condition = Q()
+        equal = Q()
+        bound = None
+        for index, (field, value) in enumerate(zip(self.ordering, values)):
+            descending = field.startswith('-')
+            name = field.lstrip('-')
+            lookup = 'lt' if descending != reverse else 'gt'
+            if name not in self.nullable:
+                after = Q(**{f'{name}__{lookup}': value})
+                same = Q(**{name: value})
+                if index == 0:
+                    bound = Q(**{f'{name}__{lookup}e': value})
+            elif value is None:
+                # После NULL при прямом обходе ничего нет,
+                # при обратном — все значения.
+                after = Q(**{f'{name}__isnull': False}) if reverse else None
+                same = Q(**{f'{name}__isnull': True})
+            else:
+                after = Q(**{f'{name}__{lookup}': value})
+                if not reverse:
+                    after |= Q(**{f'{name}__isnull': True})
+                same = Q(**{name: value})
+            if after is not None:
+                condition |= equal & after
+            equal &= same
+        # Избыточная граница по первому полю позволяет СУБД начать
+        # чтение индекса с позиции курсора, а не с начала диапазона.
+        return condition if bound is None else bound & condition
+
+    def get_position(self, row):
+        position = []
+        for field in self.ordering:
+            name = field.lstrip('-')
+            # Строки бывают экземплярами моделей или словарями values().
+            value = row[name] if isinstance(row, dict) else getattr(row, name)
+            position.append(
+                value.isoformat() if hasattr(value, 'isoformat') else value
+            )
+        return position
+
+    def decode_cursor(self, request, model):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            payload = json.loads(
+                base64.urlsafe_b64decode(encoded.encode('ascii'))
+            )
+            values = payload['v']
+            if len(values) != len(self.ordering):
+                raise ValueError
+            values = [
+                model._meta.get_field(field.lstrip('-')).to_python(value)
+                for field, value in zip(self.ordering, values)
+            ]
+            return {'values': values, 'reverse': bool(payload.get('r'))}
+        except (TypeError, ValueError, KeyError, UnicodeError,
+                ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def encode_cursor(self, row, reverse):
+        payload = {'v': self.get_position(row)}
+        if reverse:
+            payload['r'] = 1
+        encoded = base64.urlsafe_b64encode(
+            json.dumps(payload, separators=(',', ':')).encode('utf-8')
+        ).decode('ascii')
+        return replace_query_param(
+            self.base_url, self.cursor_query_param, encoded
+        )
+
+    def get_next_link(self):
+        if not self.has_next or self.last_row is None:
+            return None
+        return self.encode_cursor(self.last_row, reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if self.first_row is None:
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self.encode_cursor(self.first_row, reverse=True)
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+
+class PageNumberOrCursorPagination(PageNumberPagination):
+    """
+    Постраничная пагинация с опциональным переключением на keyset.
+    Курсорный режим включается параметром `?pagination=cursor`
+    (или наличием `?cursor=`), остальные клиенты получают прежний
+    формат с `count`.
+
+    Параметр `?count=` управляет подсчётом общего числа записей:
+    `true` (по умолчанию) — точный COUNT, `approx` — значение из кэша
+    по сигнатуре фильтра, `false` — без COUNT, `count` в ответе нет.
+    """
+    mode_query_param = 'pagination'
+    count_query_param = 'count'
+    cursor_class = KeysetPagination
+    cached_paginator_class = CachedCountPaginator
+
+    def use_cursor(self, request):
+        params = request.query_params
+        return (params.get(self.mode_query_param) == 'cursor'
+                or self.cursor_class.cursor_query_param in params)
+
+    def get_count_mode(self, request):
+        mode = request.query_params.get(self.count_query_param, 'true')
+        return mode if mode in ('false', 'approx') else 'true'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.cursor_paginator = None
+        self.count_mode = 'true'
+        if self.use_cursor(request):
+            self.cursor_paginator = self.cursor_class()
+            return self.cursor_paginator.paginate_queryset(
+                queryset, request, view
+            )
+        self.count_mode = self.get_count_mode(request)
+        if self.count_mode == 'false':
+            return self.paginate_without_count(queryset, request)
+        self.django_paginator_class = (
+            self.cached_paginator_class if self.count_mode == 'approx'
+            else Paginator
+        )
+        return super().paginate_queryset(queryset, request, view)
+
+    def paginate_without_count(self, queryset, request):
+        """
+        Отдаёт страницу по OFFSET без COUNT: берётся на одну запись
+        больше, чтобы узнать, есть ли следующая страница.
+        """
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+        self.request = request
+        page_number = request.query_params.get(self.page_query_param, 1)
+        try:
+            self.page_number = int(page_number)
+            if self.page_number < 1:
+                raise ValueError
+        except (TypeError, ValueError):
+            raise NotFound(self.invalid_page_message.format(
+                page_number=page_number, message=InvalidPage.__name__
+            ))
+        offset = (self.page_number - 1) * page_size
+        rows = list(queryset[offset:offset + page_size + 1])
+        self.has_next = len(rows) > page_size
+        return rows[:page_size]
+
+    def get_paginated_response(self, data):
+        if self.cursor_paginator is not None:
+            return self.cursor_paginator.get_paginated_response(data)
+        if self.count_mode == 'false':
+            return Response({
+                'next': self.get_uncounted_next_link(),
+                'previous': self.get_uncounted_previous_link(),
+                'results': data,
+            })
+        return super().get_paginated_response(data)
+
+    def get_uncounted_next_link(self):
+        if not self.has_next:
+            return None
+        return replace_query_param(
+            self.request.build_absolute_uri(),
+            self.page_query_param,
+            self.page_number + 1
+        )
+
+    def get_uncounted_previous_link(self):
+        if self.page_number <= 1:
+            return None
+        url = self.request.build_absolute_uri()
+        if self.page_number == 2:
+            return remove_query_param(url, self.page_query_param)
+        return replace_query_param(
+            url, self.page_query_param, self.page_number - 1
+        )
@@ -0,0 +1,87 @@
+# api/reference.py
+"""
+Приложение api.
+Справочники категорий и жанров в памяти процесса.
+Таблицы маленькие и меняются редко, поэтому каждый процесс держит
+их копию и перечитывает её, только когда в общем кэше сменилась
+версия справочника. Версию увеличивают сигналы после фиксации
+изменений; кэш версий общий для воркеров (процессный отклоняет
+проверка `api.E001`, см. api/checks.py), так что правку видят все.
+"""
+from reviews.models import Category, Genre
+from .caching import get_version
+
+# Ключ контекста сериализатора со снимками, взятыми для этого ответа.
+REFERENCE_SNAPSHOTS = 'reference_snapshots'
+
+
+def reference_scope(model):
+    return f'reference:{model._meta.model_name}'
+
+
+class ReferenceSnapshot:
+    """Неизменяемый снимок справочника: строки по порядку, по id и slug."""
+
+    def __init__(self, version, objects):
+        self.version = version
+        self.objects = tuple(objects)
+        self.by_id = {obj.pk: obj for obj in self.objects}
+        self.by_slug = {obj.slug: obj for obj in self.objects}
+
+    def represent(self, pk):
+        """`{'name', 'slug'}` объекта — как у вложенного сериализатора."""
+        obj = self.by_id.get(pk)
+        if obj is None:
+            return None
+        return {'name': obj.name, 'slug': obj.slug}
+
+
+class ReferenceCache:
+    """
+    Копия таблицы в памяти процесса.
+    Объекты общие для всех запросов: их можно читать,
+    но нельзя изменять и сохранять.
+    """
+
+    def __init__(self, model):
+        self.model = model
+        self.snapshot = None
+
+    def get(self):
+        version = get_version(reference_scope(self.model))
+        snapshot = self.snapshot
+        if snapshot is None or snapshot.version != version:
+            # Версия читается до строк: если правка зафиксируется
+            # между ними, следующая проверка увидит новую версию.
+            snapshot = ReferenceSnapshot(
+                version, self.model.objects.all()
+            )
+            self.snapshot = snapshot
+        return snapshot
+
+
+REFERENCE_CACHES = {
+    Category: ReferenceCache(Category),
+    Genre: ReferenceCache(Genre),
+}
+
+
+def get_reference(model, context=None):
+    """
+    Актуальный снимок справочника. С `context` сериализатора снимок
+    берётся один раз на ответ, а не на каждую строку.
+    """
+    if context is None:
+        return REFERENCE_CACHES[model].get()
+    snapshots = context.setdefault(REFERENCE_SNAPSHOTS, {})
+    if model not in snapshots:
+        snapshots[model] = REFERENCE_CACHES[model].get()
+    return snapshots[model]
+
+
+def get_preloaded_slugs():
+    """`{модель: {slug: объект}}` для полей с пакетным разрешением slug-ов."""
+    return {
+        model: cache.get().by_slug
+        for model, cache in REFERENCE_CACHES.items()
+    }
@@ -4,12 +4,18 @@
 Сериализаторы для моделей категорий, жанров, названий произведений,
 рецензий, комментариев.
 """
-from django.db.models import Avg
-from django.shortcuts import get_object_or_404
+from django.db import IntegrityError, transaction
 from rest_framework import serializers
+from rest_framework.settings import api_settings
 from rest_framework.validators import UniqueValidator
 from reviews.models import Category, Genre, Title, Review, Comment
-from reviews.validators import year_validator
+from reviews.genres import genre_mask
+from reviews.leaderboard import rebuild_leaderboard
+from reviews.validators import score_validator, year_validator
+from .caching import CATALOG, bump_on_commit
+from .fields import BatchSlugRelatedField
+from .fieldsets import SparseFieldsetMixin
+from .reference import get_reference
 
 
 class CategorySerializer(serializers.ModelSerializer):
@@ -48,11 +54,11 @@ class GenreSerializer(serializers.ModelSerializer):
         fields = ('name', 'slug')
 
 
-class TitleReadSerializer(serializers.ModelSerializer):
+class TitleReadSerializer(SparseFieldsetMixin,
+                          serializers.ModelSerializer):
     """Сериализатор для названий произведений (чтение)"""
-    category = CategorySerializer(read_only=True)
+    category = serializers.SerializerMethodField()
     genre = GenreSerializer(many=True, read_only=True)
-    rating = serializers.SerializerMethodField()
     description = serializers.SerializerMethodField()
 
     class Meta:
@@ -63,6 +69,12 @@ class TitleReadSerializer(serializers.ModelSerializer):
             'genre', 'category'
         )
 
+    def get_category(self, obj):
+        """Категория из справочника в памяти, без JOIN и запросов."""
+        return get_reference(Category, self.context).represent(
+            obj.category_id
+        )
+
     def get_description(self, obj):
         """
         Возвращает description.
@@ -70,20 +82,14 @@ class TitleReadSerializer(serializers.ModelSerializer):
         """
         return obj.description or ""
 
-    def get_rating(self, obj):
-        """
-        Возвращает средний `score` всех отзывов или `None`, если их нет.
-        """
-        return obj.reviews.aggregate(avg=Avg('score'))['avg']
-
 
 class TitleWriteSerializer(serializers.ModelSerializer):
     """Сериализатор для названий произведений (запись)"""
-    category = serializers.SlugRelatedField(
+    category = BatchSlugRelatedField(
         slug_field='slug',
         queryset=Category.objects.all()
     )
-    genre = serializers.SlugRelatedField(
+    genre = BatchSlugRelatedField(
         slug_field='slug',
         many=True,
         queryset=Genre.objects.all()
@@ -110,10 +116,56 @@ class TitleWriteSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError(
                 'Поле `genre` не может быть пустым.'
             )
-        return value
+        return list(dict.fromkeys(value))
 
+    @staticmethod
+    def set_genres(title, genres):
+        """
+        Записывает жанры одной вставкой в связующую таблицу и кладёт их
+        в кэш prefetch, чтобы ответ собирался без повторного чтения.
+        """
+        Title.genre.through.objects.bulk_create(
+            Title.genre.through(title_id=title.pk, genre_id=genre.pk)
+            for genre in genres
+        )
+        title._prefetched_objects_cache = {
+            **getattr(title, '_prefetched_objects_cache', {}),
+            'genre': sorted(genres, key=lambda genre: genre.name),
+        }
 
-class ReviewSerializer(serializers.ModelSerializer):
+    def create(self, validated_data):
+        genres = validated_data.pop('genre')
+        with transaction.atomic():
+            title = Title.objects.create(
+                **validated_data, genre_mask=genre_mask(genres)
+            )
+            self.set_genres(title, genres)
+        return title
+
+    def update(self, instance, validated_data):
+        genres = validated_data.pop('genre', None)
+        if genres is not None:
+            validated_data['genre_mask'] = genre_mask(genres)
+        for field, value in validated_data.items():
+            setattr(instance, field, value)
+        with transaction.atomic():
+            # Только изменённые поля: агрегаты рейтинга обновляются
+            # сигналами отзывов и не должны перезаписываться.
+            instance.save(update_fields=list(validated_data))
+            if genres is not None:
+                Title.genre.through.objects.filter(
+                    title_id=instance.pk
+                ).delete()
+                self.set_genres(instance, genres)
+                # Прямая вставка в связующую таблицу не шлёт m2m_changed.
+                bump_on_commit(CATALOG)
+                if instance.rating is not None:
+                    rebuild_leaderboard(Title.objects.filter(pk=instance.pk))
+        return instance
+
+
+class ReviewSerializer(SparseFieldsetMixin,
+                       serializers.ModelSerializer):
     """Сериализатор для рецензий."""
     author = serializers.SlugRelatedField(
         read_only=True,
@@ -128,27 +180,53 @@ class ReviewSerializer(serializers.ModelSerializer):
         }
     )
 
-    def validate(self, value):
-        author = self.context['request'].user
-        title_id = (self.context['request'].
-                    parser_context['kwargs'].get('title_id'))
-        title = get_object_or_404(
-            Title,
-            id=title_id
-        )
-        if (self.context['request'].method == 'POST'
-            and title.reviews.filter(author=author).exists()):
-            raise serializers.ValidationError(
-                f'Отзыв на произведение {title.name} уже существует'
-            )
-        return value
+    def create(self, validated_data):
+        """
+        Повторный отзыв отсекает ограничение `unique_review`:
+        проверка и вставка — один запрос, без гонки между ними.
+        """
+        try:
+            return super().create(validated_data)
+        except IntegrityError:
+            title = validated_data['title']
+            if not title.reviews.filter(
+                author=validated_data['author']
+            ).exists():
+                raise
+            raise serializers.ValidationError({
+                api_settings.NON_FIELD_ERRORS_KEY: [
+                    f'Отзыв на произведение {title.name} уже существует'
+                ]
+            })
+
+    def update(self, instance, validated_data):
+        for field, value in validated_data.items():
+            setattr(instance, field, value)
+        # Только изменённые поля: comments_count обновляется сигналами
+        # комментариев и не должен перезаписываться.
+        instance.save(update_fields=list(validated_data))
+        return instance
 
     class Meta:
-        fields = ('id', 'text', 'author', 'score', 'pub_date')
+        fields = ('id', 'text', 'author', 'score', 'pub_date',
+                  'comments_count')
         model = Review
 
 
-class CommentSerializer(serializers.ModelSerializer):
+class ReviewBulkItemSerializer(serializers.Serializer):
+    """
+    Элемент пакетной загрузки отзывов: проверка полей одного отзыва.
+    Произведение, автор и повтор отзыва проверяются для всего пакета
+    сразу, см. ReviewViewSet.bulk.
+    """
+    title = serializers.IntegerField(min_value=1)
+    author = serializers.CharField(max_length=150)
+    text = serializers.CharField()
+    score = serializers.IntegerField(validators=[score_validator])
+
+
+class CommentSerializer(SparseFieldsetMixin,
+                        serializers.ModelSerializer):
     """Сериализатор для комментариев"""
     author = serializers.SlugRelatedField(
         read_only=True,
@@ -0,0 +1,120 @@
+# api/signals.py
+"""
+Приложение api.
+Инвалидация кэша ответов и ETag при изменении данных.
+"""
+import threading
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from reviews.models import Category, Comment, Genre, Review, Title
+from reviews.signals import is_deleting
+from .caching import (
+    CATALOG, USERNAMES, USERS, bump_on_commit, bump_version, comments_scope,
+    reviews_scope
+)
+from .reference import reference_scope
+
+User = get_user_model()
+
+CATALOG_MODELS = (Title, Genre, Category, Review)
+
+
+def invalidate_catalog_on_change(sender, **kwargs):
+    bump_on_commit(CATALOG)
+
+
+# Подключаем по конкретным моделям: обработчик post_delete без sender
+# отключил бы быстрое удаление (fast delete) для всех моделей.
+for model in CATALOG_MODELS:
+    post_save.connect(invalidate_catalog_on_change, sender=model)
+    post_delete.connect(invalidate_catalog_on_change, sender=model)
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Genre)
+@receiver(post_delete, sender=Genre)
+def invalidate_reference(sender, **kwargs):
+    bump_on_commit(reference_scope(sender))
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def invalidate_catalog_on_genre_change(sender, action, **kwargs):
+    if action.startswith('post_'):
+        bump_on_commit(CATALOG)
+
+
+@receiver(post_save, sender=Review)
+@receiver(post_delete, sender=Review)
+def invalidate_reviews(sender, instance, **kwargs):
+    bump_on_commit(reviews_scope(instance.title_id))
+
+
+class PendingReviewTitles(threading.local):
+    """
+    id отзывов, версии отзывов произведений которых увеличиваются
+    после фиксации. Первый обработчик on_commit транзакции забирает
+    весь набор и находит произведения одним запросом, остальные
+    застают набор пустым. Обработчик регистрируется на каждый id:
+    флаг «уже зарегистрирован» пережил бы откат без обработчика,
+    а так id откатанной транзакции просто уйдут со следующей.
+    """
+
+    def __init__(self):
+        self.review_ids = set()
+
+    def add(self, review_id):
+        self.review_ids.add(review_id)
+        transaction.on_commit(self.flush)
+
+    def flush(self):
+        review_ids, self.review_ids = self.review_ids, set()
+        if not review_ids:
+            return
+        title_ids = (Review.objects
+                     .filter(pk__in=review_ids)
+                     .values_list('title_id', flat=True)
+                     .distinct())
+        for title_id in title_ids:
+            bump_version(reviews_scope(title_id))
+
+
+pending_review_titles = PendingReviewTitles()
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def invalidate_comments(sender, instance, created=None, **kwargs):
+    bump_on_commit(comments_scope(instance.review_id))
+    if created is False:
+        return
+    # Сменился comments_count в списке отзывов произведения.
+    if is_deleting(Review, instance.review_id):
+        # Каскадное удаление отзыва: версию увеличит сам отзыв.
+        return
+    if Comment.review.is_cached(instance):
+        # Комментарий из API: отзыв уже загружен, запроса нет.
+        bump_on_commit(reviews_scope(instance.review.title_id))
+    else:
+        # Не загружаем отзыв на каждый комментарий.
+        pending_review_titles.add(instance.review_id)
+
+
+@receiver(post_save, sender=User)
+def invalidate_users_on_save(sender, created, update_fields=None, **kwargs):
+    scopes = [USERS]
+    # username выводится в отзывах и комментариях; у нового
+    # пользователя их ещё нет.
+    if not created and (update_fields is None
+                        or 'username' in update_fields):
+        scopes.append(USERNAMES)
+    bump_on_commit(*scopes)
+
+
+@receiver(post_delete, sender=User)
+def invalidate_users_on_delete(sender, **kwargs):
+    bump_on_commit(USERS, USERNAMES)
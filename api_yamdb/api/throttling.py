@@ -0,0 +1,208 @@
+# api/throttling.py
+"""
+Приложение api.
+Ограничение частоты запросов по алгоритму token bucket.
+Вёдра хранятся в отдельном файле SQLite (`THROTTLE_BUCKETS_DB`),
+общем для всех воркеров. Вёдра запроса (пользователя и адреса)
+проверяются и списываются в одной транзакции `BEGIN IMMEDIATE`:
+жетоны снимаются, только если их хватает во всех, поэтому
+отклонённый запрос не расходует лимит, а гонки «прочитать —
+изменить — записать», как у кэша, нет.
+Лимиты задаются в `REST_FRAMEWORK['DEFAULT_THROTTLE_RATES']` ключами
+`<scope>.user` и `<scope>.ip`, например `'write.user': '60/min'`:
+ведро вмещает 60 жетонов и пополняется на 60 в минуту.
+"""
+import os
+import sqlite3
+import threading
+import time
+
+from django.conf import settings
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+
+PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+# Ведро, не тронутое дольше самого длинного периода, заведомо полное:
+# такие строки можно удалять.
+STALE_AFTER = PERIODS['d']
+PURGE_INTERVAL = 60
+
+SELECT_SQL = 'SELECT tokens, updated FROM throttle_bucket WHERE key = ?'
+CONSUME_SQL = '''
+    INSERT INTO throttle_bucket (key, tokens, updated)
+    VALUES (:key, :capacity - 1, :now)
+    ON CONFLICT (key) DO UPDATE SET
+        tokens = MIN(:capacity, tokens + (:now - updated) * :rate) - 1,
+        updated = :now
+'''
+
+
+def parse_rate(rate):
+    """`'60/min'` → (ёмкость ведра, жетонов в секунду)."""
+    count, period = rate.split('/')
+    count = int(count)
+    return count, count / PERIODS[period[0]]
+
+
+class TokenBucketStore:
+    """
+    Вёдра в файле SQLite. Соединение своё у каждого потока и процесса
+    (после fork gunicorn соединение родителя не используется).
+    """
+
+    def __init__(self, path):
+        self.path = str(path)
+        self.local = threading.local()
+
+    def get_connection(self):
+        local = self.local
+        if getattr(local, 'pid', None) != os.getpid():
+            connection = sqlite3.connect(
+                self.path, timeout=5, isolation_level=None
+            )
+            # Потеря вёдер при сбое питания безопасна: fsync не нужен.
+            connection.execute('PRAGMA journal_mode = WAL')
+            connection.execute('PRAGMA synchronous = OFF')
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS throttle_bucket ('
+                'key TEXT PRIMARY KEY, tokens REAL NOT NULL, '
+                'updated REAL NOT NULL) WITHOUT ROWID'
+            )
+            local.connection = connection
+            local.pid = os.getpid()
+            local.purged = time.time()
+        return local.connection
+
+    def consume(self, key, capacity, rate, now=None):
+        """
+        Списывает жетон. Возвращает 0, если жетон был,
+        иначе — сколько секунд ждать следующего.
+        """
+        return self.consume_all(((key, capacity, rate),), now)
+
+    def consume_all(self, buckets, now=None):
+        """
+        Списывает по жетону из каждого ведра `(ключ, ёмкость, скорость)`,
+        только если жетон есть во всех. Иначе ничего не списывает
+        и возвращает, сколько секунд ждать.
+        """
+        now = time.time() if now is None else now
+        connection = self.get_connection()
+        # IMMEDIATE сразу берёт блокировку записи: между проверкой
+        # и списанием другой воркер вёдра не изменит.
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            wait = 0
+            for key, capacity, rate in buckets:
+                row = connection.execute(SELECT_SQL, (key,)).fetchone()
+                if row is not None:
+                    tokens = min(capacity, row[0] + (now - row[1]) * rate)
+                    wait = max(wait, (1 - tokens) / rate)
+            if wait <= 0:
+                wait = 0
+                for key, capacity, rate in buckets:
+                    connection.execute(CONSUME_SQL, {
+                        'key': key, 'capacity': capacity,
+                        'rate': rate, 'now': now,
+                    })
+            connection.execute('COMMIT')
+        except BaseException:
+            connection.execute('ROLLBACK')
+            raise
+        if not wait:
+            self.purge(now)
+        return wait
+
+    def purge(self, now):
+        """Раз в PURGE_INTERVAL секунд удаляет давно полные вёдра."""
+        local = self.local
+        if now - local.purged < PURGE_INTERVAL:
+            return
+        local.purged = now
+        local.connection.execute(
+            'DELETE FROM throttle_bucket WHERE updated < ?',
+            (now - STALE_AFTER,)
+        )
+
+
+STORES = {}
+STORES_LOCK = threading.Lock()
+
+
+def get_store():
+    path = str(settings.THROTTLE_BUCKETS_DB)
+    store = STORES.get(path)
+    if store is None:
+        with STORES_LOCK:
+            store = STORES.setdefault(path, TokenBucketStore(path))
+    return store
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """
+    Ограничивает запросы к вью с атрибутом `throttle_scope`.
+    `throttle_methods` вью — методы, которые учитываются
+    (по умолчанию все). Пользователь определяется по JWT без
+    обращения к базе; анонимных ограничивает только лимит `.ip`.
+    """
+    kinds = ('user', 'ip')
+
+    def allow_request(self, request, view):
+        self.wait_seconds = 0
+        scope = getattr(view, 'throttle_scope', None)
+        methods = getattr(view, 'throttle_methods', None)
+        if scope is None or (methods is not None
+                             and request.method not in methods):
+            return True
+        rates = api_settings.DEFAULT_THROTTLE_RATES
+        buckets = []
+        for kind in self.kinds:
+            rate = rates.get(f'{scope}.{kind}')
+            if not rate:
+                continue
+            ident = (self.get_user_ident(request) if kind == 'user'
+                     else self.get_ident(request))
+            if ident is None:
+                continue
+            buckets.append((f'{scope}.{kind}:{ident}', *parse_rate(rate)))
+        if buckets:
+            self.wait_seconds = get_store().consume_all(buckets)
+        return not self.wait_seconds
+
+    @staticmethod
+    def get_user_ident(request):
+        """id пользователя из проверенного access-токена или None."""
+        authentication = JWTAuthentication()
+        header = authentication.get_header(request)
+        if header is None:
+            return None
+        raw_token = authentication.get_raw_token(header)
+        if raw_token is None:
+            return None
+        try:
+            token = authentication.get_validated_token(raw_token)
+        except (InvalidToken, TokenError):
+            return None
+        return token.get(jwt_settings.USER_ID_CLAIM)
+
+    def wait(self):
+        return self.wait_seconds or None
+
+
+class ThrottleFirstMixin:
+    """
+    Проверяет ограничения до аутентификации и прав доступа:
+    лишний запрос отклоняется без обращений к базе.
+    """
+
+    def initial(self, request, *args, **kwargs):
+        self.check_throttles(request)
+        self.throttles_checked = True
+        super().initial(request, *args, **kwargs)
+
+    def check_throttles(self, request):
+        if not getattr(self, 'throttles_checked', False):
+            super().check_throttles(request)
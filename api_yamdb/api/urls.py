@@ -28,5 +28,17 @@ router.register(
 )
 
 urlpatterns = [
+    # До маршрутов роутера: иначе маршрут с суффиксом формата
+    # принял бы адрес за отзыв `export` в формате `ndjson`.
+    path(
+        'v1/titles/<int:title_id>/reviews/export.ndjson',
+        ReviewViewSet.as_view({'get': 'export'}),
+        name='reviews-export'
+    ),
+    path(
+        'v1/reviews/bulk/',
+        ReviewViewSet.as_view({'post': 'bulk'}, throttle_scope='bulk'),
+        name='reviews-bulk'
+    ),
     path('v1/', include(router.urls)),
 ]
@@ -5,24 +5,62 @@
 названий произведений, создания/просмотра рецензий,
 создания/просмотра комментариев.
 """
-from django.db.models import Avg
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import IntegrityError, transaction
+from django.http import StreamingHttpResponse
 from django.shortcuts import get_object_or_404
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import mixins, viewsets, filters, status
+from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound
 from rest_framework.response import Response
-from reviews.models import Category, Genre, Title, Review, Comment
+from rest_framework.settings import api_settings
+from reviews.genres import genre_mask
+from reviews.leaderboard import get_leaderboard, rebuild_leaderboard
+from reviews.models import (
+    Category, Genre, Title, Review, Comment, ScoreHistogram
+)
+from reviews.ratings import (
+    recalculate_histograms, recalculate_ratings, summarize_scores
+)
+from reviews.search import get_search_backend
+from reviews.validators import SCORE_RANGE
 from .serializers import (
     CategorySerializer,
     GenreSerializer,
     TitleReadSerializer,
     TitleWriteSerializer,
     ReviewSerializer,
+    ReviewBulkItemSerializer,
     CommentSerializer,
 )
-from .permissions import IsAdminOrReadOnly, IsAuthorModeratorAdminOrReadOnly
-from .filters import TitleFilter
+from .batching import comment_writer, fill_bulk_ids
+from .caching import (
+    CATALOG, USERNAMES, CatalogCacheMixin, bump_on_commit, comments_scope,
+    reviews_scope
+)
+from .conditional import ConditionalGetMixin
+from .export import (
+    NDJSON_CONTENT_TYPE, export_title_reviews, parse_since
+)
+from .fields import PRELOADED_SLUGS
+from .fieldsets import SparseFieldsetViewMixin
+from .flat_serializers import (
+    CommentFlatSerializer, FlatListMixin, ReviewFlatSerializer,
+    TitleFlatSerializer
+)
+from .pagination import KeysetPagination
+from .reference import get_preloaded_slugs, get_reference
+from .throttling import ThrottleFirstMixin
+from .permissions import (
+    IsAdmin, IsAdminOrReadOnly, IsAuthorModeratorAdminOrReadOnly
+)
+from .filters import TitleFilter, TitleSearchFilter
+
 
 class CategoryViewSet(
+    ConditionalGetMixin,
     mixins.ListModelMixin,
     mixins.CreateModelMixin,
     mixins.DestroyModelMixin,
@@ -34,30 +72,56 @@ class CategoryViewSet(
     search_fields = ('name',)
     lookup_field = 'slug'
 
+    def get_etag_scopes(self):
+        return (CATALOG,)
+
+    def list(self, request, *args, **kwargs):
+        # Без поиска и особых режимов пагинации список отдаётся
+        # из справочника в памяти, без запросов к базе.
+        if set(request.query_params) - {self.paginator.page_query_param}:
+            return super().list(request, *args, **kwargs)
+        rows = list(get_reference(self.queryset.model).objects)
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            serializer = self.get_serializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
+        return Response(self.get_serializer(rows, many=True).data)
+
 
 class GenreViewSet(CategoryViewSet):
     queryset = Genre.objects.all()
     serializer_class = GenreSerializer
 
 
-class TitleViewSet(viewsets.ModelViewSet):
+class TitleViewSet(ConditionalGetMixin, CatalogCacheMixin, FlatListMixin,
+                   SparseFieldsetViewMixin, viewsets.ModelViewSet):
     http_method_names = ['get', 'post', 'patch', 'delete', 'head', 'options']
     permission_classes = (IsAdminOrReadOnly,)
-    queryset = (Title.objects
-                .annotate(rating=Avg('reviews__score'))
-                .select_related('category')
-                .prefetch_related('genre')
-                )
+    # Категория берётся из справочника в памяти (api/reference.py).
+    queryset = Title.objects.prefetch_related('genre')
+    cursor_ordering = ('name', 'id')
+    conditional_actions = ('list', 'retrieve', 'top')
+    flat_serializer_class = TitleFlatSerializer
     filterset_class = TitleFilter
     filter_backends = (
         DjangoFilterBackend,
-        filters.SearchFilter,
+        TitleSearchFilter,
         filters.OrderingFilter
         )
 
+    def get_etag_scopes(self):
+        return (CATALOG,)
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        if self.action not in ('list', 'retrieve', 'top'):
+            # Slug-и категорий и жанров разрешаются по справочникам.
+            context[PRELOADED_SLUGS] = get_preloaded_slugs()
+        return context
+
     # Выбираем сериализатор.
     def get_serializer_class(self):
-        if self.action in ('list', 'retrieve'):
+        if self.action in ('list', 'retrieve', 'top'):
             return TitleReadSerializer
         return TitleWriteSerializer
 
@@ -93,35 +157,403 @@ class TitleViewSet(viewsets.ModelViewSet):
         )
         return Response(read_serializer.data, status=status.HTTP_200_OK)
 
+    @action(detail=False, methods=['get'], url_path='top')
+    def top(self, request):
+        """
+        GET /titles/top/ — произведения по убыванию рейтинга.
+        Читает материализованный рейтинг; срез задаётся параметром
+        `category` или `genre` (slug). Пагинация всегда курсорная.
+        """
+        return self.cached_response(self.get_top_response, request)
+
+    def get_top_response(self, request):
+        params = request.query_params
+        if 'category' in params and 'genre' in params:
+            return Response(
+                {'detail': 'Укажите либо category, либо genre.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        scope = {}
+        for name, model in (('category', Category), ('genre', Genre)):
+            if name in params:
+                scope[name] = get_reference(model).by_slug.get(params[name])
+                if scope[name] is None:
+                    raise NotFound
+
+        paginator = KeysetPagination()
+        # Порядок задаёт Meta.ordering строк рейтинга.
+        entries = paginator.paginate_queryset(
+            get_leaderboard(**scope), request
+        )
+        serializer = self.get_serializer(
+            [entry.title for entry in entries], many=True
+        )
+        return paginator.get_paginated_response(serializer.data)
+
+    @action(detail=False, methods=['post'], url_path='bulk')
+    def bulk(self, request):
+        """
+        POST /titles/bulk/ — создание списка произведений.
+        Slug-и категорий и жанров разрешаются по справочникам в памяти,
+        произведения и связи с жанрами вставляются через bulk_create.
+        Результат возвращается для каждого элемента в исходном порядке.
+        """
+        items = request.data
+        if not isinstance(items, list):
+            return Response(
+                {'detail': 'Ожидается список произведений.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if len(items) > settings.TITLES_BULK_MAX_ITEMS:
+            return Response(
+                {'detail': 'Слишком много произведений в одном запросе, '
+                           f'максимум {settings.TITLES_BULK_MAX_ITEMS}.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        context = self.get_serializer_context()
+        item_serializers = [
+            TitleWriteSerializer(data=item, context=context)
+            for item in items
+        ]
+        valid = [
+            serializer for serializer in item_serializers
+            if serializer.is_valid()
+        ]
+        titles = self.bulk_insert(
+            [serializer.validated_data for serializer in valid]
+        )
+        for serializer, title in zip(valid, titles):
+            serializer.instance = title
+
+        results = []
+        for serializer in item_serializers:
+            if serializer.instance is None:
+                results.append({
+                    'status': status.HTTP_400_BAD_REQUEST,
+                    'errors': serializer.errors,
+                })
+            else:
+                results.append({
+                    'status': status.HTTP_201_CREATED,
+                    'data': TitleReadSerializer(
+                        serializer.instance, context=context
+                    ).data,
+                })
+
+        if len(titles) == len(items):
+            response_status = status.HTTP_201_CREATED
+        elif titles:
+            response_status = status.HTTP_207_MULTI_STATUS
+        else:
+            response_status = status.HTTP_400_BAD_REQUEST
+        return Response(results, status=response_status)
+
+    @staticmethod
+    def bulk_insert(items):
+        """
+        Вставляет произведения и их связи с жанрами в одной транзакции.
+        Возвращает созданные объекты с заполненными жанрами.
+        """
+        if not items:
+            return []
+        with transaction.atomic():
+            titles = [
+                Title(genre_mask=genre_mask(item['genre']), **{
+                    field: value for field, value in item.items()
+                    if field != 'genre'
+                })
+                for item in items
+            ]
+            Title.objects.bulk_create(titles)
+            fill_bulk_ids(titles)
+
+            genres = [list(dict.fromkeys(item['genre'])) for item in items]
+            Title.genre.through.objects.bulk_create(
+                Title.genre.through(title_id=title.pk, genre_id=genre.pk)
+                for title, title_genres in zip(titles, genres)
+                for genre in title_genres
+            )
+            for title, title_genres in zip(titles, genres):
+                # Связанные объекты уже в памяти — ответ без запросов.
+                title._prefetched_objects_cache = {
+                    'genre': sorted(title_genres, key=lambda g: g.name)
+                }
+            get_search_backend().index_many(titles)
+            bump_on_commit(CATALOG)
+        return titles
 
-class ReviewViewSet(viewsets.ModelViewSet):
+
+class ReviewViewSet(ThrottleFirstMixin, ConditionalGetMixin,
+                    FlatListMixin, SparseFieldsetViewMixin,
+                    viewsets.ModelViewSet):
     http_method_names = ['get', 'post', 'patch', 'delete', 'head', 'options']
     permission_classes = (IsAuthorModeratorAdminOrReadOnly,)
     serializer_class = ReviewSerializer
+    throttle_scope = 'write'
+    throttle_methods = ('POST',)
+    flat_serializer_class = ReviewFlatSerializer
+    cursor_ordering = ('pub_date', 'id')
+    conditional_actions = ('list', 'retrieve', 'summary')
+
+    def get_etag_scopes(self):
+        return (reviews_scope(self.kwargs.get('title_id')), USERNAMES)
+
+    @action(detail=False, methods=['get'], url_path='summary')
+    def summary(self, request, title_id=None):
+        """
+        GET /titles/{title_id}/reviews/summary/ — число отзывов с оценкой,
+        средняя, медиана и распределение оценок от 1 до 10.
+        Читает одну строку счётчиков, без обхода отзывов.
+        """
+        histogram = ScoreHistogram.objects.filter(title_id=title_id).first()
+        if histogram is None:
+            get_object_or_404(Title.objects.only('id'), id=title_id)
+            counts = [0] * len(SCORE_RANGE)
+        else:
+            counts = histogram.get_counts()
+        return Response(summarize_scores(counts))
+
+    def get_permissions(self):
+        if self.action == 'bulk':
+            return [IsAdmin()]
+        return super().get_permissions()
+
+    def bulk(self, request):
+        """
+        POST /reviews/bulk/ — загрузка списка отзывов к любым
+        произведениям (администратор). Произведения, авторы и повторы
+        проверяются для всего пакета тремя запросами, отзывы
+        вставляются через bulk_create, рейтинги пересчитываются
+        один раз на каждое затронутое произведение.
+        Результат возвращается для каждого элемента в исходном порядке.
+        """
+        items = request.data
+        if not isinstance(items, list):
+            return Response(
+                {'detail': 'Ожидается список отзывов.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if len(items) > settings.REVIEWS_BULK_MAX_ITEMS:
+            return Response(
+                {'detail': 'Слишком много отзывов в одном запросе, '
+                           f'максимум {settings.REVIEWS_BULK_MAX_ITEMS}.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        item_serializers = [
+            ReviewBulkItemSerializer(data=item) for item in items
+        ]
+        valid = [
+            serializer for serializer in item_serializers
+            if serializer.is_valid()
+        ]
+        try:
+            outcomes = self.bulk_insert(valid)
+        except IntegrityError:
+            # Такой же отзыв успел появиться параллельно. Вставляем
+            # по одному: конфликт станет ошибкой своего элемента.
+            outcomes = [self.insert_one(serializer) for serializer in valid]
+        outcomes = iter(outcomes)
+
+        context = self.get_serializer_context()
+        results = []
+        created = 0
+        for serializer in item_serializers:
+            outcome = serializer.errors or next(outcomes)
+            if isinstance(outcome, Review):
+                created += 1
+                results.append({
+                    'status': status.HTTP_201_CREATED,
+                    'data': ReviewSerializer(outcome, context=context).data,
+                })
+            else:
+                results.append({
+                    'status': status.HTTP_400_BAD_REQUEST,
+                    'errors': outcome,
+                })
+
+        if created == len(items):
+            response_status = status.HTTP_201_CREATED
+        elif created:
+            response_status = status.HTTP_207_MULTI_STATUS
+        else:
+            response_status = status.HTTP_400_BAD_REQUEST
+        return Response(results, status=response_status)
+
+    @classmethod
+    def insert_one(cls, serializer):
+        """Вставляет один элемент пакета; конфликт — ошибка элемента."""
+        try:
+            return cls.bulk_insert([serializer])[0]
+        except IntegrityError:
+            return {api_settings.NON_FIELD_ERRORS_KEY: [
+                'Отзыв не сохранён: произведение или отзыв этого автора '
+                'параллельно изменены, повторите запрос.'
+            ]}
+
+    @staticmethod
+    def bulk_insert(item_serializers):
+        """
+        Проверяет пакет и вставляет отзывы в одной транзакции.
+        Возвращает для каждого элемента созданный отзыв
+        или словарь ошибок.
+        """
+        items = [serializer.validated_data for serializer in item_serializers]
+        if not items:
+            return []
+        with transaction.atomic():
+            titles = Title.objects.only('id', 'name').in_bulk(
+                {item['title'] for item in items}
+            )
+            authors = {
+                user.username: user
+                for user in get_user_model().objects.filter(
+                    username__in={item['author'] for item in items}
+                )
+            }
+            # Пары (произведение, автор) с уже существующими отзывами.
+            taken = set(Review.objects.filter(
+                title__in=titles, author__in=authors.values()
+            ).values_list('title_id', 'author_id'))
+
+            outcomes = []
+            for item in items:
+                title = titles.get(item['title'])
+                author = authors.get(item['author'])
+                errors = {}
+                if title is None:
+                    errors['title'] = [
+                        f'Произведение {item["title"]} не найдено.'
+                    ]
+                if author is None:
+                    errors['author'] = [
+                        f'Пользователь {item["author"]} не найден.'
+                    ]
+                if not errors and (title.pk, author.pk) in taken:
+                    errors[api_settings.NON_FIELD_ERRORS_KEY] = [
+                        f'Отзыв на произведение {title.name} уже существует'
+                    ]
+                if errors:
+                    outcomes.append(errors)
+                    continue
+                taken.add((title.pk, author.pk))
+                outcomes.append(Review(
+                    title=title, author=author,
+                    text=item['text'], score=item['score']
+                ))
+
+            reviews = [
+                outcome for outcome in outcomes
+                if isinstance(outcome, Review)
+            ]
+            if reviews:
+                Review.objects.bulk_create(reviews)
+                fill_bulk_ids(reviews)
+                # bulk_create не отправляет сигналы: агрегаты
+                # затронутых произведений пересчитываются разом.
+                title_ids = {review.title_id for review in reviews}
+                affected = Title.objects.filter(pk__in=title_ids)
+                recalculate_ratings(affected)
+                recalculate_histograms(affected)
+                rebuild_leaderboard(affected)
+                bump_on_commit(CATALOG, *map(reviews_scope, title_ids))
+        return outcomes
+
+    def export(self, request, title_id=None):
+        """
+        GET /titles/{title_id}/reviews/export.ndjson — все отзывы и
+        комментарии произведения потоком NDJSON; `?since=` — только
+        опубликованные после указанного момента.
+        """
+        since = parse_since(request)
+        # 404 для несуществующего произведения — до начала потока.
+        title = self.get_title()
+        return StreamingHttpResponse(
+            export_title_reviews(title.pk, since),
+            content_type=NDJSON_CONTENT_TYPE
+        )
+
+    def perform_content_negotiation(self, request, force=False):
+        # Выгрузка не проходит через рендереры DRF: Accept
+        # с application/x-ndjson не должен приводить к 406.
+        return super().perform_content_negotiation(
+            request, force=force or self.action == 'export'
+        )
 
     def get_queryset(self):
         title_id = self.kwargs.get('title_id')
-        return Review.objects.filter(title__id=title_id)
+        # Автор нужен сериализатору: загружаем его тем же запросом.
+        return (Review.objects
+                .filter(title__id=title_id)
+                .select_related('author'))
+
+    def get_title(self):
+        """Произведение загружается один раз за запрос."""
+        if not hasattr(self, '_title'):
+            self._title = get_object_or_404(
+                Title.objects.only('id', 'name'),
+                id=self.kwargs.get('title_id')
+            )
+        return self._title
 
     def perform_create(self, serializer):
-        title = get_object_or_404(Title, id=self.kwargs.get('title_id'))
-        serializer.save(author=self.request.user, title=title)
+        serializer.save(author=self.request.user, title=self.get_title())
 
 
-class CommentViewSet(viewsets.ModelViewSet):
+class CommentViewSet(ThrottleFirstMixin, ConditionalGetMixin,
+                     FlatListMixin, SparseFieldsetViewMixin,
+                     viewsets.ModelViewSet):
     http_method_names = ['get', 'post', 'patch', 'delete', 'head', 'options']
     permission_classes = (IsAuthorModeratorAdminOrReadOnly,)
     serializer_class = CommentSerializer
+    throttle_scope = 'write'
+    throttle_methods = ('POST',)
+    flat_serializer_class = CommentFlatSerializer
+    cursor_ordering = ('pub_date', 'id')
 
-    def _get_review(self):
-        title_id = self.kwargs.get('title_id')
-        review_id = self.kwargs.get('review_id')
-        return get_object_or_404(Review, id=review_id, title__id=title_id)
+    def get_etag_scopes(self):
+        return (comments_scope(self.kwargs.get('review_id')), USERNAMES)
+
+    def get_review(self):
+        """Отзыв загружается один раз за запрос."""
+        if not hasattr(self, '_review'):
+            self._review = get_object_or_404(
+                Review.objects.only('id', 'title_id'),
+                id=self.kwargs.get('review_id'),
+                title_id=self.kwargs.get('title_id')
+            )
+        return self._review
 
     def get_queryset(self):
-        review = self._get_review()
-        return review.comments.all()
+        # Родитель проверяется условием того же запроса, без
+        # отдельного чтения отзыва; автор загружается JOIN-ом.
+        return (Comment.objects
+                .filter(review_id=self.kwargs.get('review_id'),
+                        review__title_id=self.kwargs.get('title_id'))
+                .select_related('author'))
+
+    def list(self, request, *args, **kwargs):
+        response = super().list(request, *args, **kwargs)
+        rows = response.data
+        if isinstance(rows, dict):
+            rows = rows.get('results')
+        if not rows:
+            # Пустой список: отличаем отзыв без комментариев от
+            # несуществующего отзыва (404).
+            self.get_review()
+        return response
+
+    def create(self, request, *args, **kwargs):
+        # Ведущий пакета ждёт только запросы, которые уже начали
+        # создавать комментарий.
+        with comment_writer.expect():
+            return super().create(request, *args, **kwargs)
 
     def perform_create(self, serializer):
-        review = self._get_review()
-        serializer.save(author=self.request.user, review=review)
+        # В режиме write-behind комментарий вставляется пакетом
+        # вместе с параллельными запросами.
+        serializer.instance = comment_writer.save(Comment(
+            author=self.request.user, review=self.get_review(),
+            **serializer.validated_data
+        ))
@@ -71,6 +71,28 @@ DATABASES = {
 }
 
 
+# Cache
+# Версии каталога, ETag и справочников должны быть общими для всех
+# воркеров, поэтому кэш по умолчанию файловый (один хост). Для
+# нескольких хостов — Redis или Memcached. Кэш в памяти процесса
+# (LocMemCache) допускается только с RESPONSE_CACHE_ALLOW_LOCAL = True
+# и одним процессом, см. api/checks.py.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / '.cache',
+        'OPTIONS': {
+            'MAX_ENTRIES': 10000,
+        },
+    }
+}
+
+RESPONSE_CACHE_ALIAS = 'default'
+RESPONSE_CACHE_TIMEOUT = 300
+RESPONSE_CACHE_ALLOW_LOCAL = False
+
+
 # Password validation
 
 AUTH_PASSWORD_VALIDATORS = [
@@ -109,13 +131,60 @@ STATIC_URL = '/static/'
 STATICFILES_DIRS = ((BASE_DIR / 'static/'),)
 
 REST_FRAMEWORK = {
-    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
+    'DEFAULT_PAGINATION_CLASS': 'api.pagination.PageNumberOrCursorPagination',
     'PAGE_SIZE': 10,
     'DEFAULT_AUTHENTICATION_CLASSES': (
         'rest_framework_simplejwt.authentication.JWTAuthentication',
     ),
+    # Token bucket в общем файле SQLite, см. api/throttling.py.
+    # Ключ — `<throttle_scope вью>.<user|ip>`, значение — ёмкость
+    # ведра и скорость пополнения.
+    'DEFAULT_THROTTLE_CLASSES': (
+        'api.throttling.TokenBucketThrottle',
+    ),
+    'DEFAULT_THROTTLE_RATES': {
+        'signup.ip': '20/hour',
+        'token.ip': '30/min',
+        'write.user': '60/min',
+        'write.ip': '300/min',
+        # Пакетная загрузка отзывов: свой лимит, не расходует `write`.
+        'bulk.user': '10/min',
+    },
+    # Число доверенных прокси перед приложением. 0 — адрес клиента
+    # берётся из REMOTE_ADDR, а X-Forwarded-For, который клиент может
+    # подделать, не учитывается. За nginx укажите 1.
+    'NUM_PROXIES': 0,
 }
 
+# Файл с вёдрами ограничений частоты запросов, общий для воркеров.
+THROTTLE_BUCKETS_DB = BASE_DIR / 'throttle.sqlite3'
+
+# Списки произведений, отзывов и комментариев сериализуются
+# быстрыми сериализаторами из api/flat_serializers.py.
+FLAT_READ_SERIALIZERS = True
+
+# Максимум произведений в одном запросе POST /titles/bulk/.
+TITLES_BULK_MAX_ITEMS = 5000
+
+# Максимум отзывов в одном запросе POST /reviews/bulk/.
+REVIEWS_BULK_MAX_ITEMS = 5000
+
+# Отложенная групповая вставка комментариев (api/batching.py):
+# параллельные запросы ждут друг друга до COMMENT_WRITE_BEHIND_DELAY
+# секунд или пакета из COMMENT_WRITE_BEHIND_MAX_BATCH комментариев
+# и фиксируются вместе. Имеет смысл только с многопоточными воркерами
+# (gunicorn --threads N); в синхронном воркере запрос один, и
+# комментарий пишется сразу, без ожидания.
+COMMENT_WRITE_BEHIND = False
+COMMENT_WRITE_BEHIND_DELAY = 0.005
+COMMENT_WRITE_BEHIND_MAX_BATCH = 100
+
+# Строк за одно чтение из базы при выгрузке отзывов в NDJSON.
+EXPORT_CHUNK_SIZE = 500
+
+# Время жизни кэша `count` для `?count=approx`, секунды.
+PAGINATION_COUNT_CACHE_TIMEOUT = 60
+
 AUTH_USER_MODEL = 'users.User'
 
 # Отправка писем в консоль (локально)
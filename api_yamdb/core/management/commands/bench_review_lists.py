@@ -0,0 +1,160 @@
+# core/management/commands/bench_review_lists.py
+"""
+Задержка списков отзывов и комментариев на растущих таблицах.
+Таблицы наполняются во временной транзакции, которая откатывается.
+При индексах (title, pub_date, id), (review, pub_date, id) и
+(author, pub_date) время страницы не зависит от размера таблицы.
+"""
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Q
+
+from reviews.models import Comment, Review, Title
+
+PAGE_SIZE = 10
+BATCH_SIZE = 5000
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = 'Бенчмарк списков отзывов и комментариев.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes', type=int, nargs='+', default=[1000, 10000, 100000],
+            help='Число отзывов (по умолчанию 1000 10000 100000).'
+        )
+        parser.add_argument(
+            '--repeat', type=int, default=50,
+            help='Число повторов каждого запроса.'
+        )
+        parser.add_argument(
+            '--per-title', type=int, default=100,
+            help='Отзывов на одно произведение (и число авторов).'
+        )
+        parser.add_argument(
+            '--explain', action='store_true',
+            help='Показать планы запросов на наибольшем размере.'
+        )
+
+    def handle(self, *args, **options):
+        self.per_title = options['per_title']
+        try:
+            with transaction.atomic():
+                self.prepare()
+                self.stdout.write(
+                    f'{"отзывов":>10} {"отзывы":>9} {"курсор":>9} '
+                    f'{"комм.":>9} {"автор":>9}   (мс на страницу)'
+                )
+                for size in sorted(options['sizes']):
+                    self.grow(size)
+                    timings = [
+                        self.measure(query, options['repeat'])
+                        for query in self.get_queries().values()
+                    ]
+                    self.stdout.write(f'{size:>10} ' + ' '.join(
+                        f'{timing:>9.3f}' for timing in timings
+                    ))
+                if options['explain']:
+                    for name, query in self.get_queries().items():
+                        self.stdout.write(f'\n{name}:\n{query().explain()}')
+                raise Rollback
+        except Rollback:
+            pass
+
+    def prepare(self):
+        User = get_user_model()
+        User.objects.bulk_create(
+            User(username=f'bench-{index}', email=f'bench-{index}@bench')
+            for index in range(self.per_title)
+        )
+        self.authors = list(
+            User.objects.filter(username__startswith='bench-')
+            .order_by('id').values_list('id', flat=True)
+        )
+        self.titles = 0
+        self.hot_title = None
+        self.hot_review = None
+
+    def grow(self, size):
+        """Добавляет произведения с отзывами, пока отзывов меньше `size`."""
+        needed = -(-size // self.per_title) - self.titles
+        if needed <= 0:
+            return
+        Title.objects.bulk_create(
+            (Title(name=f'Бенчмарк {self.titles + index:08}')
+             for index in range(needed)),
+            batch_size=BATCH_SIZE
+        )
+        # bulk_create на SQLite не возвращает id — перечитываем.
+        title_ids = list(
+            Title.objects.filter(name__startswith='Бенчмарк ')
+            .order_by('-id').values_list('id', flat=True)[:needed]
+        )
+        self.titles += needed
+        Review.objects.bulk_create(
+            (Review(title_id=title_id, author_id=author_id,
+                    text='Текст отзыва', score=7)
+             for title_id in title_ids
+             for author_id in self.authors),
+            batch_size=BATCH_SIZE
+        )
+        if self.hot_title is None:
+            self.hot_title = title_ids[-1]
+            self.hot_review = (Review.objects
+                               .filter(title_id=self.hot_title)
+                               .order_by('id')
+                               .values_list('id', flat=True)
+                               .first())
+        # По комментарию на каждый новый отзыв.
+        review_ids = Review.objects.filter(
+            title_id__in=title_ids
+        ).values_list('id', 'author_id')
+        Comment.objects.bulk_create(
+            (Comment(review_id=review_id, author_id=author_id,
+                     text='Текст комментария')
+             for review_id, author_id in review_ids.iterator()),
+            batch_size=BATCH_SIZE
+        )
+
+    def get_queries(self):
+        """Запросы в том виде, в каком их выполняют списки API."""
+        columns = ('id', 'text', 'author__username', 'score', 'pub_date')
+        reviews = (Review.objects
+                   .filter(title_id=self.hot_title)
+                   .order_by('pub_date', 'id'))
+        middle = reviews.values('pub_date', 'id')[self.per_title // 2]
+        return {
+            'Отзывы произведения': lambda: reviews.values(*columns)[
+                :PAGE_SIZE + 1
+            ],
+            # Условие, которое строит KeysetPagination.
+            'Отзывы после курсора': lambda: reviews.filter(
+                Q(pub_date__gte=middle['pub_date'])
+                & (Q(pub_date__gt=middle['pub_date'])
+                   | Q(pub_date=middle['pub_date'], id__gt=middle['id']))
+            ).values(*columns)[:PAGE_SIZE + 1],
+            'Комментарии к отзыву': lambda: Comment.objects.filter(
+                review_id=self.hot_review
+            ).order_by('pub_date', 'id').values(
+                'id', 'text', 'author__username', 'pub_date'
+            )[:PAGE_SIZE + 1],
+            'Отзывы автора': lambda: Review.objects.filter(
+                author_id=self.authors[0]
+            ).order_by('pub_date').values(*columns)[:PAGE_SIZE + 1],
+        }
+
+    def measure(self, query, repeat):
+        best = None
+        for _ in range(repeat):
+            started = time.perf_counter()
+            list(query())
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        return best * 1000
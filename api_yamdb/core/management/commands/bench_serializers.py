@@ -0,0 +1,110 @@
+# core/management/commands/bench_serializers.py
+"""
+Сравнение скорости TitleReadSerializer и TitleFlatSerializer.
+Данные создаются во временной транзакции и откатываются.
+"""
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from rest_framework.renderers import JSONRenderer
+
+from api.caching import bump_version
+from api.flat_serializers import TitleFlatSerializer
+from api.reference import reference_scope
+from api.serializers import TitleReadSerializer
+from reviews.genres import recalculate_genre_masks
+from reviews.models import Category, Genre, Title
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = 'Бенчмарк быстрых сериализаторов списка произведений.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes', type=int, nargs='+', default=[10, 100, 1000],
+            help='Размеры выборки (по умолчанию 10 100 1000).'
+        )
+        parser.add_argument(
+            '--repeat', type=int, default=20,
+            help='Число повторов для каждого размера.'
+        )
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self.fill(max(options['sizes']))
+                self.run(options['sizes'], options['repeat'])
+                raise Rollback
+        except Rollback:
+            pass
+
+    def fill(self, count):
+        category = Category.objects.create(name='Бенчмарк', slug='bench')
+        genres = [
+            Genre.objects.create(name=f'Жанр {index}', slug=f'bench-{index}')
+            for index in range(2)
+        ]
+        Title.objects.bulk_create(
+            Title(
+                name=f'Произведение {index:05}',
+                year=2000,
+                description='Описание',
+                category=category,
+                rating=7.5,
+            )
+            for index in range(count)
+        )
+        # bulk_create на SQLite не возвращает id — перечитываем.
+        titles = Title.objects.filter(category=category).only('id')
+        Title.genre.through.objects.bulk_create(
+            Title.genre.through(title_id=title.id, genre_id=genre.id)
+            for title in titles
+            for genre in genres
+        )
+        recalculate_genre_masks(titles)
+        # Транзакция не фиксируется, поэтому справочники в памяти
+        # сбрасываем сразу, а не после коммита.
+        bump_version(reference_scope(Category))
+        bump_version(reference_scope(Genre))
+
+    def measure(self, func, repeat):
+        best = None
+        for _ in range(repeat):
+            started = time.perf_counter()
+            func()
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        return best * 1000
+
+    def run(self, sizes, repeat):
+        renderer = JSONRenderer()
+        queryset = Title.objects.prefetch_related('genre')
+
+        self.stdout.write(
+            f'{"строк":>6} {"DRF, мс":>10} {"flat, мс":>10} {"ускорение":>10}'
+        )
+        for size in sizes:
+            def drf():
+                page = list(queryset[:size])
+                return renderer.render(
+                    TitleReadSerializer(page, many=True).data
+                )
+
+            def flat():
+                serializer = TitleFlatSerializer()
+                rows = serializer.get_rows(queryset)[:size]
+                return renderer.render(serializer.serialize(rows))
+
+            if drf() != flat():
+                self.stderr.write(f'{size}: ответы различаются!')
+            drf_ms = self.measure(drf, repeat)
+            flat_ms = self.measure(flat, repeat)
+            self.stdout.write(
+                f'{size:>6} {drf_ms:>10.2f} {flat_ms:>10.2f} '
+                f'{drf_ms / flat_ms:>9.1f}x'
+            )
@@ -0,0 +1,30 @@
+# core/management/commands/cache_stats.py
+"""
+Вывод счётчиков попаданий и промахов кэша ответов каталога.
+"""
+from django.core.management.base import BaseCommand
+
+from api.caching import (
+    bump_catalog_version, get_catalog_version, get_stats
+)
+
+
+class Command(BaseCommand):
+    help = 'Показывает статистику кэша ответов каталога.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--bump', action='store_true',
+            help='Сбросить кэш, увеличив версию каталога.'
+        )
+
+    def handle(self, *args, **options):
+        if options['bump']:
+            bump_catalog_version()
+        stats = get_stats()
+        total = stats['hits'] + stats['misses']
+        ratio = stats['hits'] / total if total else 0
+        self.stdout.write(f'Версия каталога: {get_catalog_version()}')
+        self.stdout.write(f'Попаданий: {stats["hits"]}')
+        self.stdout.write(f'Промахов: {stats["misses"]}')
+        self.stdout.write(f'Доля попаданий: {ratio:.1%}')
@@ -9,7 +9,14 @@ from django.core.management.base import BaseCommand
 from django.db import transaction
 
 from django.contrib.auth import get_user_model
+from api.caching import CATALOG, bump_on_commit
+from api.reference import reference_scope
 from reviews.models import Category, Genre, Title, Review, Comment  # наши модели
+from reviews.counters import recalculate_comments_counts
+from reviews.genres import assign_missing_bits, recalculate_genre_masks
+from reviews.leaderboard import rebuild_leaderboard
+from reviews.ratings import recalculate_histograms, recalculate_ratings
+from reviews.search import get_search_backend
 
 
 # Папка с csv-файлами
@@ -39,6 +46,10 @@ class Command(BaseCommand):
         self.import_users()
         self.import_reviews()
         self.import_comments()
+        # bulk_create не отправляет сигналы — сбрасываем кэши явно.
+        bump_on_commit(
+            CATALOG, reference_scope(Category), reference_scope(Genre)
+        )
 
     # Простые справочники
     def import_categories(self):
@@ -57,6 +68,7 @@ class Command(BaseCommand):
             for row in rows
         ]
         Genre.objects.bulk_create(objs, ignore_conflicts=True)
+        assign_missing_bits()
         self.stdout.write(self.style.SUCCESS(f'Жанров: {Genre.objects.count()}'))
 
     # Titles (есть FK на Category)
@@ -73,6 +85,7 @@ class Command(BaseCommand):
             for row in rows
         ]
         Title.objects.bulk_create(objs, ignore_conflicts=True)
+        get_search_backend().rebuild()
         self.stdout.write(self.style.SUCCESS(f'Произведений: {Title.objects.count()}'))
 
     # M2M Genre–Title
@@ -88,6 +101,7 @@ class Command(BaseCommand):
                 through_objs.append(title.genre.through(title=title, genre=genre))
 
         title.genre.through.objects.bulk_create(through_objs, ignore_conflicts=True)
+        recalculate_genre_masks()
         self.stdout.write(self.style.SUCCESS('Связи Title–Genre загружены'))
 
     # Пользователи
@@ -126,6 +140,10 @@ class Command(BaseCommand):
             for row in rows
         ]
         Review.objects.bulk_create(objs, ignore_conflicts=True)
+        # bulk_create не отправляет сигналы — пересчитываем рейтинги явно.
+        recalculate_ratings()
+        recalculate_histograms()
+        rebuild_leaderboard()
         self.stdout.write(self.style.SUCCESS(f'Отзывов: {Review.objects.count()}'))
 
     # Comments (FK: review, user)
@@ -146,4 +164,5 @@ class Command(BaseCommand):
             for row in rows
         ]
         Comment.objects.bulk_create(objs, ignore_conflicts=True)
+        recalculate_comments_counts()
         self.stdout.write(self.style.SUCCESS(f'Комментариев: {Comment.objects.count()}'))
@@ -0,0 +1,48 @@
+# core/management/commands/recalculate_comments_count.py
+"""
+Пересчёт денормализованного `comments_count` у отзывов.
+Нужен после правок в обход сигналов: bulk_create, SQL вручную.
+Обновляются только отзывы, у которых счётчик разошёлся с таблицей
+комментариев; ETag списков их произведений сбрасывается.
+"""
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, F
+
+from api.caching import bump_on_commit, reviews_scope
+from reviews.counters import recalculate_comments_counts
+from reviews.models import Review
+
+BATCH_SIZE = 500
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает число комментариев у отзывов.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--title', type=int, nargs='+', dest='titles',
+            help='Только отзывы указанных произведений (id).'
+        )
+
+    @transaction.atomic
+    def handle(self, *args, **options):
+        reviews = Review.objects.order_by()
+        if options['titles']:
+            reviews = reviews.filter(title_id__in=options['titles'])
+        stale = list(
+            reviews.annotate(actual=Count('comments'))
+            .exclude(actual=F('comments_count'))
+            .values_list('pk', 'title_id')
+        )
+        for start in range(0, len(stale), BATCH_SIZE):
+            batch = stale[start:start + BATCH_SIZE]
+            recalculate_comments_counts(Review.objects.filter(
+                pk__in=[review_id for review_id, _ in batch]
+            ))
+        title_ids = {title_id for _, title_id in stale}
+        if title_ids:
+            bump_on_commit(*(reviews_scope(pk) for pk in title_ids))
+        self.stdout.write(self.style.SUCCESS(
+            f'Исправлено отзывов: {len(stale)}'
+        ))
@@ -0,0 +1,40 @@
+# reviews/counters.py
+"""
+Приложение reviews.
+Денормализованное число комментариев к отзыву: сдвиг счётчика
+при создании и удалении комментария и полный пересчёт.
+"""
+from django.db.models import Count, F, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def apply_comments_delta(review_id, delta):
+    """Сдвигает счётчик комментариев отзыва одним UPDATE."""
+    if review_id is None or not delta:
+        return 0
+    from .models import Review
+
+    return Review.objects.filter(pk=review_id).update(
+        comments_count=F('comments_count') + delta
+    )
+
+
+def recalculate_comments_counts(reviews=None):
+    """
+    Пересчитывает счётчики по таблице комментариев одним UPDATE.
+    Нужен после массовых операций в обход сигналов (bulk_create и т.п.).
+    Работает и с историческими моделями из миграций.
+    """
+    if reviews is None:
+        from .models import Review
+        reviews = Review.objects.all()
+    Comment = reviews.model._meta.get_field('comments').related_model
+    counts = (Comment.objects
+              .filter(review=OuterRef('pk'))
+              .order_by()
+              .values('review')
+              .annotate(total=Count('id'))
+              .values('total'))
+    return reviews.update(comments_count=Coalesce(
+        Subquery(counts), 0, output_field=IntegerField()
+    ))
@@ -0,0 +1,121 @@
+# reviews/genres.py
+"""
+Приложение reviews.
+Битовые маски жанров произведений.
+Каждому жанру выдаётся свой бит, у произведения в `genre_mask`
+установлены биты его жанров. Фильтр по нескольким жанрам становится
+одним условием на колонку произведения вместо JOIN на каждый жанр.
+"""
+from django.db.models import (
+    BigIntegerField, ExpressionWrapper, F, OuterRef, Q, Subquery, Sum, Value
+)
+from django.db.models.functions import Cast, Coalesce
+
+# Биты 0..62: маска остаётся положительным 64-битным целым.
+GENRE_MASK_BITS = 63
+
+MODE_ALL = 'all'
+MODE_ANY = 'any'
+
+
+def genre_mask(genres):
+    """Маска для набора жанров; жанры без бита не учитываются."""
+    mask = 0
+    for genre in genres:
+        if genre.bit is not None:
+            mask |= 1 << genre.bit
+    return mask
+
+
+def free_bits(genres):
+    """Свободные биты по возрастанию."""
+    used = set(
+        genres.filter(bit__isnull=False).values_list('bit', flat=True)
+    )
+    return [bit for bit in range(GENRE_MASK_BITS) if bit not in used]
+
+
+def assign_missing_bits(genres=None):
+    """
+    Выдаёт биты жанрам, у которых их нет (например, после bulk_create).
+    Работает и с историческими моделями из миграций.
+    Возвращает число жанров, получивших бит.
+    """
+    if genres is None:
+        from .models import Genre
+        genres = Genre.objects.all()
+    bits = free_bits(genres)
+    pending = list(genres.filter(bit__isnull=True).order_by('pk'))
+    for genre, bit in zip(pending, bits):
+        genre.bit = bit
+    assigned = pending[:len(bits)]
+    genres.model.objects.bulk_update(assigned, ['bit'])
+    return len(assigned)
+
+
+def recalculate_genre_masks(titles=None):
+    """
+    Пересчитывает маски по связующей таблице одним UPDATE.
+    Работает и с историческими моделями из миграций.
+    """
+    if titles is None:
+        from .models import Title
+        titles = Title.objects.all()
+    GenreLink = titles.model.genre.through
+    # Пара (произведение, жанр) уникальна, а биты жанров различны,
+    # поэтому сумма битов равна их побитовому ИЛИ.
+    masks = (GenreLink.objects
+             .filter(title=OuterRef('pk'), genre__bit__isnull=False)
+             .order_by()
+             .values('title')
+             .annotate(mask=Sum(ExpressionWrapper(
+                 Cast(Value(1), BigIntegerField())
+                 .bitleftshift(F('genre__bit')),
+                 output_field=BigIntegerField()
+             )))
+             .values('mask'))
+    return titles.update(genre_mask=Coalesce(
+        Subquery(masks, output_field=BigIntegerField()), 0
+    ))
+
+
+def with_genre_bits(queryset, mask):
+    """Произведения, у которых установлен хотя бы один бит из `mask`."""
+    return queryset.alias(
+        genre_bits=F('genre_mask').bitand(mask)
+    ).filter(genre_bits__gt=0)
+
+
+def filter_by_genres(queryset, genres, mode=MODE_ALL):
+    """
+    Фильтрует произведения по жанрам: `all` — все жанры сразу,
+    `any` — хотя бы один. Жанры с битами проверяются по маске,
+    жанры без бита (если их больше 63) — подзапросом к связям.
+    """
+    genres = list(genres)
+    mask = genre_mask(genres)
+    GenreLink = queryset.model.genre.through
+    without_bit = [genre.pk for genre in genres if genre.bit is None]
+    if mode == MODE_ANY:
+        condition = Q()
+        if mask:
+            queryset = queryset.alias(
+                genre_bits=F('genre_mask').bitand(mask)
+            )
+            condition |= Q(genre_bits__gt=0)
+        if without_bit:
+            condition |= Q(pk__in=GenreLink.objects.filter(
+                genre_id__in=without_bit
+            ).values('title_id'))
+        if not condition:
+            return queryset.none()
+        return queryset.filter(condition)
+    if mask:
+        queryset = queryset.alias(
+            genre_bits=F('genre_mask').bitand(mask)
+        ).filter(genre_bits=mask)
+    for genre_id in without_bit:
+        queryset = queryset.filter(pk__in=GenreLink.objects.filter(
+            genre_id=genre_id
+        ).values('title_id'))
+    return queryset
@@ -0,0 +1,78 @@
+# reviews/leaderboard.py
+"""
+Приложение reviews.
+Материализованный рейтинг произведений: общий, по категориям
+и по жанрам. Строки отсортированы индексом, поэтому топ читается
+без агрегации отзывов и без сортировки всего каталога.
+"""
+
+
+def get_leaderboard(category=None, genre=None):
+    """Строки одного среза рейтинга в порядке убывания оценки."""
+    from .models import LeaderboardEntry
+
+    return LeaderboardEntry.objects.filter(
+        category=category, genre=genre
+    ).select_related('title').prefetch_related('title__genre')
+
+
+def rebuild_leaderboard(titles=None):
+    """
+    Перестраивает строки рейтинга указанных произведений (по умолчанию —
+    всех). Нужен при смене категории или жанров и после массовых
+    операций. Работает и с историческими моделями из миграций.
+    """
+    if titles is None:
+        from .models import Title
+        titles = Title.objects.all()
+    Entry = titles.model._meta.get_field(
+        'leaderboard_entries'
+    ).related_model
+    GenreLink = titles.model.genre.through
+
+    Entry.objects.filter(title__in=titles).delete()
+    rated = {
+        pk: (category_id, rating)
+        for pk, category_id, rating in titles.filter(
+            rating__isnull=False
+        ).values_list('pk', 'category_id', 'rating')
+    }
+    if not rated:
+        return 0
+    entries = []
+    for pk, (category_id, rating) in rated.items():
+        entries.append(Entry(title_id=pk, rating=rating))
+        if category_id is not None:
+            entries.append(
+                Entry(title_id=pk, category_id=category_id, rating=rating)
+            )
+    links = GenreLink.objects.filter(
+        title_id__in=list(rated)
+    ).values_list('title_id', 'genre_id')
+    for pk, genre_id in links:
+        entries.append(
+            Entry(title_id=pk, genre_id=genre_id, rating=rated[pk][1])
+        )
+    Entry.objects.bulk_create(entries, batch_size=500)
+    return len(rated)
+
+
+def refresh_title_rating(title_id):
+    """
+    Переносит новый рейтинг произведения в его строки одним UPDATE.
+    Строки создаются, когда у произведения появилась первая оценка,
+    и удаляются, когда оценок не осталось.
+    """
+    from .models import LeaderboardEntry, Title
+
+    if title_id is None:
+        return
+    rating = (Title.objects
+              .filter(pk=title_id)
+              .values_list('rating', flat=True)
+              .first())
+    entries = LeaderboardEntry.objects.filter(title_id=title_id)
+    if rating is None:
+        entries.delete()
+    elif not entries.update(rating=rating):
+        rebuild_leaderboard(Title.objects.filter(pk=title_id))
@@ -0,0 +1,41 @@
+# Generated by Django 3.2 on 2026-10-18 19:36
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+from reviews.leaderboard import rebuild_leaderboard
+
+
+def fill_leaderboard(apps, schema_editor):
+    Title = apps.get_model('reviews', 'Title')
+    rebuild_leaderboard(Title.objects.all())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0007_title_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LeaderboardEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('rating', models.FloatField(verbose_name='Рейтинг')),
+                ('category', models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='reviews.category')),
+                ('genre', models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='reviews.genre')),
+                ('title', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='leaderboard_entries', to='reviews.title')),
+            ],
+            options={
+                'verbose_name': 'Позиция в рейтинге',
+                'verbose_name_plural': 'Рейтинг произведений',
+                'ordering': ['-rating', 'title_id'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='leaderboardentry',
+            index=models.Index(fields=['category', 'genre', '-rating', 'title'], name='leaderboard_scope_rating_idx'),
+        ),
+        migrations.RunPython(fill_leaderboard, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 3.2 on 2026-10-18 19:38
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+from reviews.ratings import recalculate_histograms
+
+
+def fill_histograms(apps, schema_editor):
+    Title = apps.get_model('reviews', 'Title')
+    recalculate_histograms(Title.objects.all())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0008_title_leaderboard'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ScoreHistogram',
+            fields=[
+                ('title', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='score_histogram', serialize=False, to='reviews.title')),
+                ('score_1', models.PositiveIntegerField(default=0, verbose_name='Оценок «1»')),
+                ('score_2', models.PositiveIntegerField(default=0, verbose_name='Оценок «2»')),
+                ('score_3', models.PositiveIntegerField(default=0, verbose_name='Оценок «3»')),
+                ('score_4', models.PositiveIntegerField(default=0, verbose_name='Оценок «4»')),
+                ('score_5', models.PositiveIntegerField(default=0, verbose_name='Оценок «5»')),
+                ('score_6', models.PositiveIntegerField(default=0, verbose_name='Оценок «6»')),
+                ('score_7', models.PositiveIntegerField(default=0, verbose_name='Оценок «7»')),
+                ('score_8', models.PositiveIntegerField(default=0, verbose_name='Оценок «8»')),
+                ('score_9', models.PositiveIntegerField(default=0, verbose_name='Оценок «9»')),
+                ('score_10', models.PositiveIntegerField(default=0, verbose_name='Оценок «10»')),
+            ],
+            options={
+                'verbose_name': 'Распределение оценок',
+                'verbose_name_plural': 'Распределения оценок',
+            },
+        ),
+        migrations.RunPython(fill_histograms, migrations.RunPython.noop),
+    ]
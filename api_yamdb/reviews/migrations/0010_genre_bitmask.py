@@ -0,0 +1,33 @@
+# Generated by Django 3.2 on 2026-10-18 19:44
+
+from django.db import migrations, models
+
+from reviews.genres import assign_missing_bits, recalculate_genre_masks
+
+
+def fill_genre_masks(apps, schema_editor):
+    Genre = apps.get_model('reviews', 'Genre')
+    Title = apps.get_model('reviews', 'Title')
+    assign_missing_bits(Genre.objects.all())
+    recalculate_genre_masks(Title.objects.all())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0009_title_score_histogram'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='genre',
+            name='bit',
+            field=models.PositiveSmallIntegerField(editable=False, null=True, unique=True, verbose_name='Бит в маске жанров'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='genre_mask',
+            field=models.BigIntegerField(default=0, editable=False, verbose_name='Маска жанров'),
+        ),
+        migrations.RunPython(fill_genre_masks, migrations.RunPython.noop),
+    ]
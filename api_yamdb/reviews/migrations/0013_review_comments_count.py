@@ -0,0 +1,26 @@
+# Generated by Django 3.2 on 2026-10-18 19:58
+
+from django.db import migrations, models
+
+from reviews.counters import recalculate_comments_counts
+
+
+def fill_comments_counts(apps, schema_editor):
+    Review = apps.get_model('reviews', 'Review')
+    recalculate_comments_counts(Review.objects.all())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0012_author_pub_date_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='review',
+            name='comments_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Количество комментариев'),
+        ),
+        migrations.RunPython(fill_comments_counts, migrations.RunPython.noop),
+    ]
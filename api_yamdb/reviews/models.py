@@ -1,9 +1,9 @@
 # reviews/models.py
-from django.db import models
+from django.db import models, transaction
 from django.conf import settings
 from django.core.validators import MaxValueValidator, MinValueValidator
 
-from .validators import year_validator, score_validator
+from .validators import SCORE_RANGE, year_validator, score_validator
 
 
 class Category(models.Model):
@@ -43,6 +43,14 @@ class Genre(models.Model):
         db_index=True
     )
 
+    # Номер бита жанра в Title.genre_mask, см. reviews/genres.py.
+    bit = models.PositiveSmallIntegerField(
+        'Бит в маске жанров',
+        null=True,
+        unique=True,
+        editable=False
+    )
+
     class Meta:
         ordering = ['name']
         verbose_name = 'Жанр'
@@ -59,9 +67,9 @@ class Title(models.Model):
         verbose_name='Название',
         help_text='Выберите название произведения'
     )
+    # Отдельный индекс по году не нужен: его покрывает (year, name).
     year = models.PositiveSmallIntegerField(
         verbose_name='Год',
-        db_index=True,
         help_text='Укажите год выпуска',
         null=True,
         blank=True,
@@ -89,16 +97,104 @@ class Title(models.Model):
         blank=True,
         related_name='titles'
     )
+    # Биты жанров произведения, поддерживаются сигналами m2m_changed.
+    genre_mask = models.BigIntegerField(
+        'Маска жанров',
+        default=0,
+        editable=False
+    )
+    # Денормализованные агрегаты оценок, поддерживаются сигналами Review.
+    rating_sum = models.PositiveIntegerField(
+        'Сумма оценок',
+        default=0,
+        editable=False
+    )
+    rating_count = models.PositiveIntegerField(
+        'Количество оценок',
+        default=0,
+        editable=False
+    )
+    rating = models.FloatField(
+        'Рейтинг',
+        null=True,
+        blank=True,
+        editable=False
+    )
 
     class Meta:
         ordering = ['name']
         verbose_name = 'Произведение'
         verbose_name_plural = 'Произведения'
+        indexes = [
+            # Ключ курсорной пагинации списка произведений.
+            models.Index(fields=['name', 'id'], name='title_name_id_idx'),
+            # Категория + диапазон лет: «фильмы 80-х».
+            models.Index(fields=['category', 'year'],
+                         name='title_category_year_idx'),
+            # Диапазон лет с сортировкой по названию.
+            models.Index(fields=['year', 'name'], name='title_year_name_idx'),
+        ]
+
+    # Поля, которые пишут только сигналы и пересчёты.
+    MAINTAINED_FIELDS = frozenset(
+        ('genre_mask', 'rating_sum', 'rating_count', 'rating')
+    )
+
+    def save(self, *args, **kwargs):
+        # Полное сохранение существующего произведения (например,
+        # из админки) не перезаписывает агрегаты значениями из памяти:
+        # их могли изменить отзывы после загрузки объекта.
+        if (not self._state.adding and not args
+                and kwargs.get('update_fields') is None
+                and not kwargs.get('force_insert')):
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.name not in self.MAINTAINED_FIELDS
+            ]
+        super().save(*args, **kwargs)
 
     def __str__(self):
         return self.name
 
 
+class LeaderboardEntry(models.Model):
+    """
+    Строка материализованного рейтинга произведений.
+    Для каждого оценённого произведения хранится общая строка
+    (без категории и жанра), строка его категории и по строке на жанр.
+    Поддерживается сигналами, см. reviews/leaderboard.py.
+    """
+    title = models.ForeignKey(
+        Title,
+        on_delete=models.CASCADE,
+        related_name='leaderboard_entries'
+    )
+    category = models.ForeignKey(
+        Category,
+        on_delete=models.CASCADE,
+        null=True,
+        related_name='+'
+    )
+    genre = models.ForeignKey(
+        Genre,
+        on_delete=models.CASCADE,
+        null=True,
+        related_name='+'
+    )
+    rating = models.FloatField('Рейтинг')
+
+    class Meta:
+        ordering = ['-rating', 'title_id']
+        verbose_name = 'Позиция в рейтинге'
+        verbose_name_plural = 'Рейтинг произведений'
+        indexes = [
+            # Готовая сортировка для каждого среза рейтинга.
+            models.Index(fields=['category', 'genre', '-rating', 'title'],
+                         name='leaderboard_scope_rating_idx'),
+        ]
+
+
 class Review(models.Model):
     """Модель для рецензии."""
     title = models.ForeignKey(
@@ -107,16 +203,25 @@ class Review(models.Model):
         related_name='reviews'
     )
     text = models.TextField()
+    # Отдельный индекс не нужен: author_id — префикс unique_review
+    # и review_author_pub_date_idx.
     author = models.ForeignKey(
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE,
-        related_name='reviews'
+        related_name='reviews',
+        db_index=False
     )
     score = models.IntegerField(
         null=True,
         validators=[score_validator]
     )
     pub_date = models.DateTimeField('Дата публикации', auto_now_add=True)
+    # Денормализованный счётчик, поддерживается сигналами Comment.
+    comments_count = models.PositiveIntegerField(
+        'Количество комментариев',
+        default=0,
+        editable=False
+    )
 
     class Meta:
         ordering = ['pub_date']
@@ -126,11 +231,72 @@ class Review(models.Model):
             models.UniqueConstraint(fields=['author', 'title'],
                                     name='unique_review')
         ]
+        indexes = [
+            # Ключ курсорной пагинации отзывов произведения.
+            models.Index(fields=['title', 'pub_date', 'id'],
+                         name='review_title_pub_date_idx'),
+            # Отзывы пользователя по дате.
+            models.Index(fields=['author', 'pub_date'],
+                         name='review_author_pub_date_idx'),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Запоминаем загруженные значения, чтобы при сохранении
+        # пересчитать рейтинг произведения по разнице, без лишних запросов.
+        instance._loaded_title_id = instance.__dict__.get('title_id')
+        instance._loaded_score = instance.__dict__.get('score')
+        return instance
+
+    def save(self, *args, **kwargs):
+        # Отзыв и агрегаты рейтинга сохраняются в одной транзакции.
+        with transaction.atomic():
+            super().save(*args, **kwargs)
 
     def __str__(self):
         return self.text[:15]
 
 
+def score_counter(score):
+    return models.PositiveIntegerField(f'Оценок «{score}»', default=0)
+
+
+class ScoreHistogram(models.Model):
+    """
+    Распределение оценок произведения: по счётчику на каждую оценку.
+    Поддерживается сигналами Review, строка создаётся с первым отзывом.
+    """
+    title = models.OneToOneField(
+        Title,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='score_histogram'
+    )
+    score_1 = score_counter(1)
+    score_2 = score_counter(2)
+    score_3 = score_counter(3)
+    score_4 = score_counter(4)
+    score_5 = score_counter(5)
+    score_6 = score_counter(6)
+    score_7 = score_counter(7)
+    score_8 = score_counter(8)
+    score_9 = score_counter(9)
+    score_10 = score_counter(10)
+
+    class Meta:
+        verbose_name = 'Распределение оценок'
+        verbose_name_plural = 'Распределения оценок'
+
+    @staticmethod
+    def column(score):
+        return f'score_{score}'
+
+    def get_counts(self):
+        """Счётчики по порядку оценок от 1 до 10."""
+        return [getattr(self, self.column(score)) for score in SCORE_RANGE]
+
+
 class Comment(models.Model):
     """Модель для комментариев."""
     review = models.ForeignKey(
@@ -139,10 +305,13 @@ class Comment(models.Model):
         related_name='comments'
     )
     text = models.TextField()
+    # Отдельный индекс по author_id не нужен: выборки по автору
+    # покрывает составной comment_author_pub_date_idx (author, pub_date).
     author = models.ForeignKey(
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE,
-        related_name='comments'
+        related_name='comments',
+        db_index=False
     )
     pub_date = models.DateTimeField(
         'Дата публикации',
@@ -154,6 +323,27 @@ class Comment(models.Model):
         ordering = ['pub_date']
         verbose_name = 'Комментарий'
         verbose_name_plural = 'Комментарии'
+        indexes = [
+            # Ключ курсорной пагинации комментариев к отзыву.
+            models.Index(fields=['review', 'pub_date', 'id'],
+                         name='comment_review_pub_date_idx'),
+            # Комментарии пользователя по дате.
+            models.Index(fields=['author', 'pub_date'],
+                         name='comment_author_pub_date_idx'),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Запоминаем отзыв, чтобы при переносе комментария
+        # поправить счётчики обоих отзывов.
+        instance._loaded_review_id = instance.__dict__.get('review_id')
+        return instance
+
+    def save(self, *args, **kwargs):
+        # Комментарий и счётчик отзыва сохраняются в одной транзакции.
+        with transaction.atomic():
+            super().save(*args, **kwargs)
 
     def __str__(self):
         return self.text[:15]
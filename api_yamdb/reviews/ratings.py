@@ -0,0 +1,151 @@
+# reviews/ratings.py
+"""
+Приложение reviews.
+Поддержка денормализованного рейтинга произведений:
+инкрементальное обновление и полный пересчёт агрегатов,
+распределение оценок по значениям.
+"""
+from django.db.models import (
+    Avg, Count, F, FloatField, IntegerField, OuterRef, Subquery, Sum
+)
+from django.db.models.functions import Cast, Coalesce, NullIf
+
+from .validators import SCORE_RANGE
+
+
+def apply_rating_delta(title_id, delta_sum, delta_count):
+    """
+    Сдвигает сумму и количество оценок произведения одним UPDATE.
+    Средний рейтинг вычисляется из новых значений в том же запросе.
+    Возвращает число обновлённых строк.
+    """
+    if title_id is None or (not delta_sum and not delta_count):
+        return 0
+    from .models import Title
+
+    new_sum = F('rating_sum') + delta_sum
+    new_count = F('rating_count') + delta_count
+    return Title.objects.filter(pk=title_id).update(
+        rating_sum=new_sum,
+        rating_count=new_count,
+        rating=(
+            Cast(new_sum, FloatField())
+            / NullIf(new_count, 0, output_field=FloatField())
+        ),
+    )
+
+
+def recalculate_ratings(titles=None):
+    """
+    Полностью пересчитывает агрегаты рейтинга по таблице отзывов.
+    Нужен после массовых операций в обход сигналов (bulk_create и т.п.).
+    Работает и с историческими моделями из миграций.
+    """
+    if titles is None:
+        from .models import Title
+        titles = Title.objects.all()
+    Review = titles.model._meta.get_field('reviews').related_model
+    scores = (Review.objects
+              .filter(title=OuterRef('pk'), score__isnull=False)
+              .order_by()
+              .values('title'))
+    return titles.update(
+        rating_sum=Coalesce(
+            Subquery(scores.annotate(total=Sum('score')).values('total')),
+            0,
+            output_field=IntegerField()
+        ),
+        rating_count=Coalesce(
+            Subquery(scores.annotate(total=Count('score')).values('total')),
+            0,
+            output_field=IntegerField()
+        ),
+        rating=Subquery(
+            scores.annotate(avg=Avg('score')).values('avg'),
+            output_field=FloatField()
+        ),
+    )
+
+
+def apply_histogram_delta(title_id, removed=None, added=None):
+    """
+    Переносит оценку в распределении произведения одним UPDATE:
+    `removed` — оценка, которая ушла, `added` — которая появилась.
+    Если строки распределения ещё нет и оценка появилась, строка
+    строится по отзывам; одно удаление оценки строку не строит.
+    """
+    if title_id is None or removed == added:
+        return
+    from .models import ScoreHistogram, Title
+
+    changes = {}
+    if removed is not None:
+        column = ScoreHistogram.column(removed)
+        changes[column] = F(column) - 1
+    if added is not None:
+        column = ScoreHistogram.column(added)
+        changes[column] = F(column) + 1
+    updated = ScoreHistogram.objects.filter(title_id=title_id).update(
+        **changes
+    )
+    if not updated and added is not None:
+        recalculate_histograms(Title.objects.filter(pk=title_id))
+
+
+def recalculate_histograms(titles=None):
+    """
+    Строит распределения оценок заново по таблице отзывов.
+    Работает и с историческими моделями из миграций.
+    """
+    if titles is None:
+        from .models import Title
+        titles = Title.objects.all()
+    Review = titles.model._meta.get_field('reviews').related_model
+    Histogram = titles.model._meta.get_field('score_histogram').related_model
+
+    Histogram.objects.filter(title__in=titles).delete()
+    histograms = {}
+    counts = (Review.objects
+              .filter(title__in=titles, score__isnull=False)
+              .order_by()
+              .values_list('title_id', 'score')
+              .annotate(total=Count('id')))
+    for title_id, score, total in counts:
+        histogram = histograms.setdefault(
+            title_id, Histogram(title_id=title_id)
+        )
+        setattr(histogram, f'score_{score}', total)
+    Histogram.objects.bulk_create(histograms.values(), batch_size=500)
+    return len(histograms)
+
+
+def summarize_scores(counts):
+    """
+    Сводка по распределению оценок: количество, среднее, медиана
+    и счётчики по каждой оценке. `counts` — счётчики оценок 1..10.
+    """
+    total = sum(counts)
+    summary = {
+        'count': total,
+        'mean': None,
+        'median': None,
+        'histogram': {
+            str(score): count for score, count in zip(SCORE_RANGE, counts)
+        },
+    }
+    if not total:
+        return summary
+    summary['mean'] = sum(
+        score * count for score, count in zip(SCORE_RANGE, counts)
+    ) / total
+
+    def nth(position):
+        """Оценка на позиции `position` (с нуля) в отсортированном ряду."""
+        seen = 0
+        for score, count in zip(SCORE_RANGE, counts):
+            seen += count
+            if position < seen:
+                return score
+
+    summary['median'] = (nth((total - 1) // 2) + nth(total // 2)) / 2
+    return summary
@@ -0,0 +1,165 @@
+# reviews/search.py
+"""
+Приложение reviews.
+Полнотекстовый поиск по названиям произведений.
+Бэкенд выбирается по СУБД (SQLite — FTS5, PostgreSQL — tsvector с
+GIN-индексом) или задаётся явно настройкой `TITLE_SEARCH_BACKEND`.
+"""
+import re
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import F, Func
+from django.utils.module_loading import import_string
+
+FTS_TABLE = 'reviews_title_fts'
+TSVECTOR_INDEX = 'reviews_title_name_tsv_idx'
+TSVECTOR_CONFIG = 'simple'
+
+WORD_RE = re.compile(r'\w+')
+
+
+def get_terms(query):
+    """Выделяет из пользовательского запроса слова без спецсимволов."""
+    return WORD_RE.findall(query or '')
+
+
+class BaseSearchBackend:
+    """Поиск подстрокой; используется, если индекс недоступен."""
+
+    def search(self, queryset, query):
+        terms = get_terms(query)
+        if not terms:
+            return queryset.none()
+        for term in terms:
+            queryset = queryset.filter(name__icontains=term)
+        return queryset
+
+    def index(self, title):
+        pass
+
+    def index_many(self, titles):
+        for title in titles:
+            self.index(title)
+
+    def remove(self, title_id):
+        pass
+
+    def rebuild(self):
+        pass
+
+
+class SQLiteFTSBackend(BaseSearchBackend):
+    """
+    Теневая таблица FTS5 с `rowid = title.id`.
+    Ранжирование по bm25: чем меньше значение, тем выше позиция.
+    """
+
+    def match_expression(self, query):
+        # Каждое слово в кавычках и с `*` — поиск по префиксам,
+        # без интерпретации синтаксиса FTS5 из пользовательского ввода.
+        return ' '.join(f'"{term}"*' for term in get_terms(query))
+
+    def search(self, queryset, query):
+        match = self.match_expression(query)
+        if not match:
+            return queryset.none()
+        table = queryset.model._meta.db_table
+        # Таблица FTS присоединяется один раз: rowid и rank читаются
+        # за один проход MATCH. Подзапрос ранга на каждую строку
+        # повторял бы MATCH для каждого найденного произведения.
+        return (queryset
+                .extra(
+                    tables=[FTS_TABLE],
+                    where=[f'{FTS_TABLE}.rowid = {table}.id',
+                           f'{FTS_TABLE} MATCH %s'],
+                    params=[match],
+                    select={'search_rank': f'{FTS_TABLE}.rank'},
+                )
+                .order_by('search_rank', 'id'))
+
+    def index(self, title):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [title.pk]
+            )
+            cursor.execute(
+                f'INSERT INTO {FTS_TABLE} (rowid, name) VALUES (%s, %s)',
+                [title.pk, title.name]
+            )
+
+    def index_many(self, titles):
+        """Индексирует только что созданные произведения пачкой."""
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f'INSERT INTO {FTS_TABLE} (rowid, name) VALUES (%s, %s)',
+                [(title.pk, title.name) for title in titles]
+            )
+
+    def remove(self, title_id):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [title_id]
+            )
+
+    def rebuild(self):
+        from .models import Title
+
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {FTS_TABLE}')
+            cursor.execute(
+                f'INSERT INTO {FTS_TABLE} (rowid, name) '
+                f'SELECT id, name FROM {Title._meta.db_table}'
+            )
+
+
+class TitleNameVector(Func):
+    """
+    `to_tsvector('simple', name)` — ровно то выражение, по которому
+    построен GIN-индекс, иначе планировщик его не использует.
+    """
+    template = f"to_tsvector('{TSVECTOR_CONFIG}', %(expressions)s)"
+
+    def __init__(self):
+        from django.contrib.postgres.search import SearchVectorField
+        super().__init__(F('name'), output_field=SearchVectorField())
+
+
+class PostgresSearchBackend(BaseSearchBackend):
+    """tsvector по названию, индекс создаётся миграцией."""
+
+    def tsquery_expression(self, query):
+        # Как в FTS5: каждое слово в кавычках и с `:*` — поиск по
+        # префиксам, операторы tsquery из пользовательского ввода
+        # не интерпретируются.
+        return ' & '.join(f"'{term}':*" for term in get_terms(query))
+
+    def search(self, queryset, query):
+        from django.contrib.postgres.search import SearchQuery, SearchRank
+
+        expression = self.tsquery_expression(query)
+        if not expression:
+            return queryset.none()
+        search_query = SearchQuery(
+            expression, config=TSVECTOR_CONFIG, search_type='raw'
+        )
+        return (queryset
+                .annotate(search_vector=TitleNameVector())
+                .filter(search_vector=search_query)
+                .annotate(search_rank=SearchRank(
+                    TitleNameVector(), search_query
+                ))
+                .order_by('-search_rank', 'id'))
+
+
+VENDOR_BACKENDS = {
+    'sqlite': SQLiteFTSBackend,
+    'postgresql': PostgresSearchBackend,
+}
+
+
+def get_search_backend():
+    path = getattr(settings, 'TITLE_SEARCH_BACKEND', None)
+    if path:
+        return import_string(path)()
+    return VENDOR_BACKENDS.get(connection.vendor, BaseSearchBackend)()
@@ -0,0 +1,186 @@
+# reviews/signals.py
+"""
+Приложение reviews.
+Обработчики сигналов, поддерживающие денормализованные данные
+в актуальном состоянии.
+"""
+import threading
+
+from django.db.models.signals import (
+    m2m_changed, post_delete, post_save, pre_delete, pre_save
+)
+from django.dispatch import receiver
+
+from .counters import apply_comments_delta
+from .genres import free_bits, recalculate_genre_masks, with_genre_bits
+from .leaderboard import rebuild_leaderboard, refresh_title_rating
+from .models import Comment, Genre, LeaderboardEntry, Review, Title
+from .ratings import (
+    apply_histogram_delta, apply_rating_delta, recalculate_histograms,
+    recalculate_ratings
+)
+from .search import get_search_backend
+
+
+# id удаляемых сейчас произведений и отзывов. Удаляются они вместе
+# с зависимыми строками: при каскаде отзывы и комментарии удаляются
+# раньше родителя, и поддерживать агрегаты родителя незачем.
+_deleting = threading.local()
+
+
+def _deleting_ids(model):
+    if not hasattr(_deleting, 'ids'):
+        _deleting.ids = {}
+    return _deleting.ids.setdefault(model, set())
+
+
+def is_deleting(model, pk):
+    return pk in _deleting_ids(model)
+
+
+@receiver(pre_delete, sender=Title)
+@receiver(pre_delete, sender=Review)
+def mark_deleting(sender, instance, **kwargs):
+    _deleting_ids(sender).add(instance.pk)
+
+
+@receiver(post_delete, sender=Title)
+@receiver(post_delete, sender=Review)
+def unmark_deleting(sender, instance, **kwargs):
+    _deleting_ids(sender).discard(instance.pk)
+
+
+def _score_weight(score):
+    """Возвращает пару (сумма, количество) для одной оценки."""
+    return (0, 0) if score is None else (score, 1)
+
+
+@receiver(post_save, sender=Review)
+def update_rating_on_review_save(sender, instance, created, **kwargs):
+    if not created and not hasattr(instance, '_loaded_score'):
+        # Прежняя оценка неизвестна — пересчитываем произведение целиком.
+        titles = Title.objects.filter(pk=instance.title_id)
+        recalculate_ratings(titles)
+        recalculate_histograms(titles)
+        refresh_title_rating(instance.title_id)
+        instance._loaded_title_id = instance.title_id
+        instance._loaded_score = instance.score
+        return
+    new_sum, new_count = _score_weight(instance.score)
+    old_title_id = getattr(instance, '_loaded_title_id', None)
+    old_score = None if created else getattr(instance, '_loaded_score', None)
+    old_sum, old_count = _score_weight(old_score)
+    if created or old_title_id == instance.title_id:
+        if apply_rating_delta(
+            instance.title_id, new_sum - old_sum, new_count - old_count
+        ):
+            refresh_title_rating(instance.title_id)
+        apply_histogram_delta(instance.title_id, old_score, instance.score)
+    else:
+        # Отзыв перенесён на другое произведение.
+        for title_id, delta_sum, delta_count in (
+            (old_title_id, -old_sum, -old_count),
+            (instance.title_id, new_sum, new_count),
+        ):
+            if apply_rating_delta(title_id, delta_sum, delta_count):
+                refresh_title_rating(title_id)
+        apply_histogram_delta(old_title_id, removed=old_score)
+        apply_histogram_delta(instance.title_id, added=instance.score)
+    instance._loaded_title_id = instance.title_id
+    instance._loaded_score = instance.score
+
+
+@receiver(post_delete, sender=Review)
+def update_rating_on_review_delete(sender, instance, **kwargs):
+    if is_deleting(Title, instance.title_id):
+        return
+    score_sum, score_count = _score_weight(instance.score)
+    if apply_rating_delta(instance.title_id, -score_sum, -score_count):
+        refresh_title_rating(instance.title_id)
+    apply_histogram_delta(instance.title_id, removed=instance.score)
+
+
+@receiver(post_save, sender=Comment)
+def update_comments_count_on_save(sender, instance, created, **kwargs):
+    old_review_id = None if created else getattr(
+        instance, '_loaded_review_id', instance.review_id
+    )
+    if old_review_id != instance.review_id:
+        apply_comments_delta(old_review_id, -1)
+        apply_comments_delta(instance.review_id, 1)
+    instance._loaded_review_id = instance.review_id
+
+
+@receiver(post_delete, sender=Comment)
+def update_comments_count_on_delete(sender, instance, **kwargs):
+    if is_deleting(Review, instance.review_id):
+        return
+    apply_comments_delta(instance.review_id, -1)
+
+
+@receiver(post_save, sender=Title)
+def index_title_on_save(sender, instance, created, update_fields=None,
+                        **kwargs):
+    if created:
+        # Нового произведения в индексе ещё нет: хватает вставки.
+        get_search_backend().index_many([instance])
+    elif update_fields is None or 'name' in update_fields:
+        get_search_backend().index(instance)
+    if (not created and instance.rating is not None
+            and (update_fields is None or 'category' in update_fields)):
+        # Строка категории в рейтинге могла смениться.
+        rebuild_leaderboard(Title.objects.filter(pk=instance.pk))
+
+
+@receiver(post_delete, sender=Title)
+def remove_title_from_index(sender, instance, **kwargs):
+    get_search_backend().remove(instance.pk)
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def update_leaderboard_on_genre_change(sender, instance, action, reverse,
+                                       pk_set, **kwargs):
+    if not action.startswith('post_'):
+        return
+    if not reverse:
+        if instance.rating is not None:
+            rebuild_leaderboard(Title.objects.filter(pk=instance.pk))
+    elif pk_set is None:
+        # genre.titles.clear(): у жанра не осталось произведений.
+        LeaderboardEntry.objects.filter(genre=instance).delete()
+    else:
+        rebuild_leaderboard(
+            Title.objects.filter(pk__in=pk_set, rating__isnull=False)
+        )
+
+
+@receiver(pre_save, sender=Genre)
+def assign_genre_bit(sender, instance, raw=False, **kwargs):
+    if instance.bit is None and not raw:
+        # Если биты кончились, жанр фильтруется через связующую таблицу.
+        bits = free_bits(Genre.objects.all())
+        instance.bit = bits[0] if bits else None
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def update_genre_mask_on_change(sender, instance, action, reverse, pk_set,
+                                **kwargs):
+    if not action.startswith('post_'):
+        return
+    if not reverse:
+        recalculate_genre_masks(Title.objects.filter(pk=instance.pk))
+    elif pk_set is not None:
+        recalculate_genre_masks(Title.objects.filter(pk__in=pk_set))
+    elif instance.bit is not None:
+        recalculate_genre_masks(
+            with_genre_bits(Title.objects.all(), 1 << instance.bit)
+        )
+
+
+@receiver(post_delete, sender=Genre)
+def update_genre_mask_on_genre_delete(sender, instance, **kwargs):
+    # Связи удалены каскадом, без m2m_changed.
+    if instance.bit is not None:
+        recalculate_genre_masks(
+            with_genre_bits(Title.objects.all(), 1 << instance.bit)
+        )
@@ -6,6 +6,9 @@
 from django.core.exceptions import ValidationError
 from django.utils import timezone
 
+# Допустимые оценки отзыва.
+SCORE_RANGE = range(1, 11)
+
 
 def year_validator(value):
     if value > timezone.now().year:
@@ -14,7 +17,7 @@ def year_validator(value):
         )
 
 def score_validator(value):
-    if value < 1 or value > 10:
+    if value not in SCORE_RANGE:
         raise ValidationError(
             f'Оценка {value} должна быть от 1 до 10!'
         )
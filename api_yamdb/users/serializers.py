@@ -6,9 +6,12 @@
 from django.contrib.auth import get_user_model
 from rest_framework import serializers
 
+from api.fieldsets import SparseFieldsetMixin
+
 User = get_user_model()
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(SparseFieldsetMixin,
+                     serializers.ModelSerializer):
 
     def validate_username(self, value):
         """Запрещаем задавать `me` в качестве username (регистронезависимо)."""
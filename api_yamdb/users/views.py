@@ -16,12 +16,17 @@ from rest_framework.views import APIView
 from rest_framework_simplejwt.tokens import RefreshToken
 
 from .serializers import SignupSerializer, TokenObtainSerializer, UserSerializer
+from api.caching import USERS
+from api.conditional import ConditionalGetMixin
+from api.fieldsets import SparseFieldsetViewMixin
 from api.permissions import IsAdmin
+from api.throttling import ThrottleFirstMixin
 
 User = get_user_model()
 
 
-class UsersViewSet(viewsets.ModelViewSet):
+class UsersViewSet(ConditionalGetMixin, SparseFieldsetViewMixin,
+                   viewsets.ModelViewSet):
     queryset = User.objects.all()
     serializer_class = UserSerializer
     permission_classes = (IsAdmin,)          # ← остаётся для остальных методов
@@ -30,6 +35,11 @@ class UsersViewSet(viewsets.ModelViewSet):
     lookup_field = 'username'
     
     http_method_names = ['get', 'post', 'patch', 'delete']
+    conditional_actions = ('list', 'retrieve', 'me')
+    etag_vary_on_user = True
+
+    def get_etag_scopes(self):
+        return (USERS,)
 
     # ─────────  /users/me/  ─────────
     @action(
@@ -61,9 +71,10 @@ class UsersViewSet(viewsets.ModelViewSet):
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 
-class SignupView(APIView):
+class SignupView(ThrottleFirstMixin, APIView):
     """POST /auth/signup/ – регистрация или повторная выдача confirmation_code."""
     permission_classes = (AllowAny,)
+    throttle_scope = 'signup'
 
     def post(self, request):
         serializer = SignupSerializer(data=request.data)
@@ -91,9 +102,10 @@ class SignupView(APIView):
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 
-class TokenView(APIView):
+class TokenView(ThrottleFirstMixin, APIView):
     """POST /auth/token/ – выдаёт JWT, если confirmation_code верный."""
     permission_classes = (AllowAny,)
+    throttle_scope = 'token'
 
     def post(self, request):
         serializer = TokenObtainSerializer(data=request.data)
@@ -0,0 +1,26 @@
+import pytest
+from django.core.cache import caches
+
+from api.caching import lookup_stats
+
+
+@pytest.fixture(autouse=True)
+def clear_caches(settings, tmp_path):
+    # Очистка таблиц между тестами не отправляет сигналы, поэтому
+    # у каждого теста свой пустой файловый кэш — не api_yamdb/.cache.
+    settings.CACHES = {
+        alias: (
+            {**config, 'LOCATION': str(tmp_path / f'cache-{alias}')}
+            if 'LOCATION' in config else config
+        )
+        for alias, config in settings.CACHES.items()
+    }
+    for cache in caches.all():
+        cache.clear()
+    lookup_stats.reset()
+
+
+@pytest.fixture(autouse=True)
+def throttle_buckets(settings, tmp_path):
+    # Вёдра ограничений в своём файле у каждого теста.
+    settings.THROTTLE_BUCKETS_DB = tmp_path / 'throttle.sqlite3'
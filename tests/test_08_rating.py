@@ -0,0 +1,122 @@
+from http import HTTPStatus
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Comment, Review, ScoreHistogram, Title
+from reviews.ratings import apply_histogram_delta
+from tests.utils import create_single_review, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test08TitleRating:
+
+    TITLE_DETAIL_URL_TEMPLATE = '/api/v1/titles/{title_id}/'
+    REVIEW_DETAIL_URL_TEMPLATE = (
+        '/api/v1/titles/{title_id}/reviews/{review_id}/'
+    )
+
+    def get_rating(self, client, title_id):
+        response = client.get(
+            self.TITLE_DETAIL_URL_TEMPLATE.format(title_id=title_id)
+        )
+        assert response.status_code == HTTPStatus.OK
+        return response.json()['rating']
+
+    def test_01_rating_follows_review_changes(self, admin_client,
+                                              user_client):
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        review_id = create_single_review(
+            admin_client, title_id, 'Отлично', 10
+        ).json()['id']
+        create_single_review(user_client, title_id, 'Так себе', 4)
+        assert self.get_rating(admin_client, title_id) == 7, (
+            'Проверьте, что рейтинг произведения пересчитывается '
+            'при создании отзыва.'
+        )
+
+        response = admin_client.patch(
+            self.REVIEW_DETAIL_URL_TEMPLATE.format(
+                title_id=title_id, review_id=review_id
+            ),
+            data={'score': 6}
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert self.get_rating(admin_client, title_id) == 5, (
+            'Проверьте, что рейтинг произведения пересчитывается '
+            'при изменении оценки в отзыве.'
+        )
+
+        response = admin_client.delete(
+            self.REVIEW_DETAIL_URL_TEMPLATE.format(
+                title_id=title_id, review_id=review_id
+            )
+        )
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        assert self.get_rating(admin_client, title_id) == 4, (
+            'Проверьте, что рейтинг произведения пересчитывается '
+            'при удалении отзыва.'
+        )
+        assert self.get_rating(admin_client, titles[1]['id']) is None
+
+    def test_02_full_save_keeps_aggregates(self, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        # Объект загружен до отзыва — как форма админки.
+        stale = Title.objects.get(pk=title_id)
+        review_id = create_single_review(
+            admin_client, title_id, 'Отлично', 8
+        ).json()['id']
+        stale.name = 'Новое название'
+        stale.save()
+        title = Title.objects.get(pk=title_id)
+        assert title.name == 'Новое название'
+        assert (title.rating, title.rating_count) == (8, 1), (
+            'Проверьте, что полное сохранение произведения не '
+            'перезаписывает агрегаты рейтинга значениями из памяти.'
+        )
+        response = admin_client.delete(
+            self.REVIEW_DETAIL_URL_TEMPLATE.format(
+                title_id=title_id, review_id=review_id
+            )
+        )
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        assert self.get_rating(admin_client, title_id) is None
+
+    def test_03_title_delete_skips_maintenance(self, admin_client):
+        User = get_user_model()
+        titles, _, _ = create_titles(admin_client)
+        title = Title.objects.get(pk=titles[0]['id'])
+        for index in range(20):
+            author = User.objects.create(
+                username=f'reader-{index}', email=f'reader-{index}@yamdb.fake'
+            )
+            review = Review.objects.create(
+                title=title, author=author, text='Текст', score=5
+            )
+            Comment.objects.create(review=review, author=author, text='Да')
+        create_single_review(admin_client, titles[1]['id'], 'Другое', 9)
+
+        with CaptureQueriesContext(connection) as context:
+            title.delete()
+        assert len(context.captured_queries) <= 15, (
+            'Проверьте, что при удалении произведения его отзывы и '
+            'комментарии не пересчитывают рейтинг, распределение оценок '
+            'и счётчики по одному.'
+        )
+        assert not Review.objects.filter(title_id=titles[0]['id']).exists()
+        assert self.get_rating(admin_client, titles[1]['id']) == 9
+
+    def test_04_removal_does_not_rebuild_histogram(self, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        with CaptureQueriesContext(connection) as context:
+            apply_histogram_delta(title_id, removed=5)
+        assert len(context.captured_queries) == 1, (
+            'Проверьте, что удаление оценки без строки распределения '
+            'не строит распределение заново.'
+        )
+        assert not ScoreHistogram.objects.filter(title_id=title_id).exists()
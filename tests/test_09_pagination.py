@@ -0,0 +1,141 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.cache import cache
+
+from reviews.models import Title
+
+
+@pytest.mark.django_db(transaction=True)
+class Test09CursorPagination:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    def walk(self, client, url):
+        names = []
+        pages = []
+        while url:
+            response = client.get(url)
+            assert response.status_code == HTTPStatus.OK
+            data = response.json()
+            assert 'count' not in data, (
+                'В курсорном режиме ответ не должен содержать `count`.'
+            )
+            names.extend(title['name'] for title in data['results'])
+            pages.append(data)
+            url = data['next']
+        return names, pages
+
+    def test_01_cursor_walks_all_titles(self, client):
+        # Одинаковые названия проверяют разрешение ничьих по `id`.
+        Title.objects.bulk_create(
+            Title(name=f'Произведение {index // 2:02}') for index in range(23)
+        )
+        expected = list(
+            Title.objects.order_by('name', 'id').values_list('name', flat=True)
+        )
+
+        names, pages = self.walk(
+            client, f'{self.TITLES_URL}?pagination=cursor'
+        )
+        assert names == expected, (
+            'Проверьте, что курсорная пагинация возвращает все записи '
+            'ровно по одному разу в порядке (`name`, `id`).'
+        )
+        assert len(pages) == 3
+        assert pages[0]['previous'] is None
+
+        response = client.get(pages[-1]['previous'])
+        previous_page = [title['name'] for title in response.json()['results']]
+        assert previous_page == [
+            title['name'] for title in pages[-2]['results']
+        ], 'Проверьте ссылку `previous` в курсорном режиме.'
+
+    def test_02_page_number_is_default(self, client):
+        response = client.get(self.TITLES_URL)
+        assert 'count' in response.json()
+
+    def test_03_invalid_cursor(self, client):
+        response = client.get(f'{self.TITLES_URL}?cursor=broken')
+        assert response.status_code == HTTPStatus.NOT_FOUND
+
+    def test_04_count_modes(self, client):
+        cache.clear()
+        Title.objects.bulk_create(
+            Title(name=f'Произведение {index:02}') for index in range(12)
+        )
+        response = client.get(f'{self.TITLES_URL}?count=false')
+        data = response.json()
+        assert 'count' not in data, (
+            'Проверьте, что при `?count=false` ответ не содержит `count`.'
+        )
+        assert len(data['results']) == 10
+        assert data['previous'] is None
+
+        response = client.get(data['next'])
+        data = response.json()
+        assert len(data['results']) == 2
+        assert data['next'] is None
+        assert data['previous'] is not None
+
+        url = f'{self.TITLES_URL}?count=approx'
+        assert client.get(url).json()['count'] == 12
+        Title.objects.create(name='Новое произведение')
+        assert client.get(url).json()['count'] == 12, (
+            'Проверьте, что при `?count=approx` число записей берётся '
+            'из кэша.'
+        )
+        assert client.get(self.TITLES_URL).json()['count'] == 13
+
+    @pytest.mark.parametrize('flat', (True, False))
+    def test_05_cursor_follows_requested_ordering(self, client, settings,
+                                                  flat):
+        settings.FLAT_READ_SERIALIZERS = flat
+        Title.objects.bulk_create(
+            Title(name=f'Произведение {index:02}') for index in range(15)
+        )
+        for index, title in enumerate(Title.objects.order_by('id')):
+            # Ничьи и NULL проверяют порядок по `id` и место NULL.
+            rating = None if index % 4 == 0 else float(index % 3)
+            Title.objects.filter(pk=title.pk).update(rating=rating)
+        expected = [
+            pk for _, _, pk in sorted(
+                (rating is None, -(rating or 0), pk)
+                for pk, rating in Title.objects.values_list('id', 'rating')
+            )
+        ]
+
+        url = f'{self.TITLES_URL}?pagination=cursor&ordering=-rating'
+        ids = []
+        pages = []
+        while url:
+            response = client.get(url)
+            assert response.status_code == HTTPStatus.OK
+            data = response.json()
+            ids.extend(title['id'] for title in data['results'])
+            pages.append(data)
+            url = data['next']
+        assert ids == expected, (
+            'Проверьте, что курсорная пагинация сохраняет порядок '
+            '`?ordering=`, а NULL идут после значений.'
+        )
+        response = client.get(pages[-1]['previous'])
+        assert response.json()['results'] == pages[-2]['results'], (
+            'Проверьте ссылку `previous` при сортировке `?ordering=`.'
+        )
+
+    def test_06_cursor_rejects_search_rank(self, client):
+        Title.objects.create(name='Звёздные войны')
+        response = client.get(
+            self.TITLES_URL, {'q': 'звёздные', 'pagination': 'cursor'}
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что сортировку по релевантности нельзя '
+            'молча заменить другой в курсорном режиме.'
+        )
+        assert 'ordering' in response.json()
+        response = client.get(self.TITLES_URL, {
+            'q': 'звёздные', 'pagination': 'cursor', 'ordering': 'name',
+        })
+        assert response.status_code == HTTPStatus.OK
+        assert len(response.json()['results']) == 1
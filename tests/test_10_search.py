@@ -0,0 +1,82 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Title
+from reviews.search import PostgresSearchBackend, get_search_backend
+
+
+@pytest.mark.django_db(transaction=True)
+class Test10TitleSearch:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    def search(self, client, query):
+        response = client.get(self.TITLES_URL, {'q': query})
+        assert response.status_code == HTTPStatus.OK
+        return [title['name'] for title in response.json()['results']]
+
+    def test_01_full_text_search(self, client):
+        bridge = Title.objects.create(name='Мост через реку Квай')
+        Title.objects.create(name='Крепкий орешек')
+        Title.objects.create(name='Мостовая')
+
+        assert self.search(client, 'мост квай') == [bridge.name], (
+            'Проверьте, что `?q=` находит произведения, в названии которых '
+            'есть все слова запроса.'
+        )
+        assert set(self.search(client, 'мост')) == {
+            'Мост через реку Квай', 'Мостовая'
+        }, 'Проверьте, что `?q=` ищет по началу слов.'
+        assert self.search(client, '"(*') == []
+
+        bridge.name = 'Эта тишина'
+        bridge.save()
+        assert self.search(client, 'квай') == [], (
+            'Проверьте, что поисковый индекс обновляется при изменении '
+            'названия произведения.'
+        )
+        assert self.search(client, 'тишина') == ['Эта тишина']
+
+        bridge.delete()
+        assert self.search(client, 'тишина') == []
+
+    def test_02_many_matches_single_scan(self, client):
+        Title.objects.bulk_create(
+            Title(name=f'Сага часть {index}') for index in range(600)
+        )
+        Title.objects.create(name='Сага')
+        # bulk_create не отправляет сигналы — индекс строится заново.
+        get_search_backend().rebuild()
+
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(self.TITLES_URL, {'q': 'сага'})
+        assert response.status_code == HTTPStatus.OK
+        data = response.json()
+        assert data['count'] == 601
+        assert data['results'][0]['name'] == 'Сага', (
+            'Проверьте, что результаты упорядочены по релевантности.'
+        )
+        page_query = [
+            query['sql'] for query in context.captured_queries
+            if 'LIMIT' in query['sql'] and 'MATCH' in query['sql']
+        ]
+        assert page_query and page_query[0].count('MATCH') == 1, (
+            'Проверьте, что ранг читается тем же проходом MATCH, '
+            'а не подзапросом на каждое найденное произведение.'
+        )
+
+
+class Test10PostgresQuery:
+
+    def test_01_prefix_tsquery(self):
+        backend = PostgresSearchBackend()
+        assert backend.tsquery_expression('мост квай') == (
+            "'мост':* & 'квай':*"
+        ), (
+            'Проверьте, что на PostgreSQL каждое слово запроса ищется '
+            'по началу слова.'
+        )
+        assert backend.tsquery_expression("'(! | &") == ''
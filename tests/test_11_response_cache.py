@@ -0,0 +1,109 @@
+import threading
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import SystemCheckError
+
+from api import caching
+from api.caching import get_stats
+from api.checks import check_shared_cache
+from tests.utils import (create_single_review, create_titles,
+                         run_in_other_process)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test11ResponseCache:
+
+    TITLES_URL = '/api/v1/titles/'
+    TITLE_DETAIL_URL_TEMPLATE = '/api/v1/titles/{title_id}/'
+
+    def test_01_list_is_cached_until_catalog_changes(self, client,
+                                                     admin_client):
+        titles, _, _ = create_titles(admin_client)
+
+        response = client.get(self.TITLES_URL, {'year': 1984, 'page': 1})
+        assert response['X-Cache'] == 'MISS'
+        response = client.get(self.TITLES_URL, {'page': 1, 'year': 1984})
+        assert response.status_code == HTTPStatus.OK
+        assert response['X-Cache'] == 'HIT', (
+            'Проверьте, что повторный запрос с теми же параметрами '
+            'отдаётся из кэша независимо от порядка параметров.'
+        )
+        assert response.json()['count'] == 1
+        assert get_stats() == {'hits': 1, 'misses': 1}
+
+        admin_client.patch(
+            self.TITLE_DETAIL_URL_TEMPLATE.format(title_id=titles[1]['id']),
+            data={'year': 1984}
+        )
+        response = client.get(self.TITLES_URL, {'year': 1984, 'page': 1})
+        assert response['X-Cache'] == 'MISS', (
+            'Проверьте, что изменение произведения сбрасывает кэш.'
+        )
+        assert response.json()['count'] == 2
+
+    def test_02_detail_sees_new_rating(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        url = self.TITLE_DETAIL_URL_TEMPLATE.format(title_id=titles[0]['id'])
+
+        assert client.get(url).json()['rating'] is None
+        assert client.get(url)['X-Cache'] == 'HIT'
+        create_single_review(admin_client, titles[0]['id'], 'Текст', 8)
+        response = client.get(url)
+        assert response['X-Cache'] == 'MISS'
+        assert response.json()['rating'] == 8
+
+    def test_03_other_process_invalidates(self, client, admin_client):
+        create_titles(admin_client)
+        assert client.get(self.TITLES_URL)['X-Cache'] == 'MISS'
+        assert client.get(self.TITLES_URL)['X-Cache'] == 'HIT'
+
+        run_in_other_process(
+            'from api.caching import CATALOG, bump_version; '
+            'bump_version(CATALOG)'
+        )
+        assert client.get(self.TITLES_URL)['X-Cache'] == 'MISS', (
+            'Проверьте, что версия каталога хранится в общем кэше: '
+            'изменение в другом воркере должно сбрасывать кэш ответов.'
+        )
+
+    def test_04_process_local_cache_refused(self, settings):
+        settings.CACHES = {'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }}
+        assert [error.id for error in check_shared_cache()] == ['api.E001']
+        with pytest.raises(SystemCheckError):
+            call_command('check')
+        settings.RESPONSE_CACHE_ALLOW_LOCAL = True
+        assert check_shared_cache() == []
+
+    def test_05_stats_in_process_memory(self, client, admin_client,
+                                        monkeypatch):
+        create_titles(admin_client)
+        for _ in range(3):
+            client.get(self.TITLES_URL)
+        cache = caching.get_cache()
+        assert cache.get(caching.STATS_KEYS['hits']) is None, (
+            'Проверьте, что счётчики попаданий не записываются '
+            'в кэш на каждый запрос.'
+        )
+        assert get_stats() == {'hits': 2, 'misses': 1}
+
+        def count_many():
+            for _ in range(500):
+                caching.count_lookup('hits')
+
+        threads = [threading.Thread(target=count_many) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(timeout=10)
+        assert get_stats()['hits'] == 2002, (
+            'Проверьте, что параллельные запросы не теряют попадания.'
+        )
+
+        monkeypatch.setattr(caching, 'STATS_FLUSH_INTERVAL', 0)
+        caching.count_lookup('misses')
+        assert cache.get(caching.STATS_KEYS['hits']) == 2002
+        assert get_stats() == {'hits': 2002, 'misses': 2}
@@ -0,0 +1,88 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_reviews, run_in_other_process
+
+
+@pytest.mark.django_db(transaction=True)
+class Test12ConditionalGet:
+
+    REVIEWS_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/'
+    COMMENTS_URL_TEMPLATE = (
+        '/api/v1/titles/{title_id}/reviews/{review_id}/comments/'
+    )
+
+    def test_01_reviews_not_modified(self, client, admin_client, admin,
+                                     user_client, user, moderator_client,
+                                     moderator, django_assert_num_queries):
+        author_map = {
+            admin: admin_client,
+            user: user_client,
+            moderator: moderator_client
+        }
+        reviews, titles = create_reviews(admin_client, author_map)
+        url = self.REVIEWS_URL_TEMPLATE.format(title_id=titles[0]['id'])
+
+        response = client.get(url)
+        etag = response['ETag']
+        assert etag, 'Проверьте, что список отзывов возвращает ETag.'
+        assert response['Last-Modified']
+
+        with django_assert_num_queries(0):
+            response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+            'Проверьте, что при совпадении `If-None-Match` возвращается '
+            'ответ 304 без обращения к базе.'
+        )
+        assert response['ETag'] == etag
+
+        other_url = self.REVIEWS_URL_TEMPLATE.format(title_id=titles[1]['id'])
+        other_etag = client.get(other_url)['ETag']
+        admin_client.patch(
+            f'{url}{reviews[0]["id"]}/', data={'text': 'Новый текст'}
+        )
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что изменение отзыва меняет ETag списка.'
+        )
+        response = client.get(other_url, HTTP_IF_NONE_MATCH=other_etag)
+        assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+            'Проверьте, что ETag отзывов другого произведения не меняется.'
+        )
+
+        user.username = 'RenamedUser'
+        user.save()
+        response = client.get(other_url, HTTP_IF_NONE_MATCH=other_etag)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что смена username меняет ETag отзывов.'
+        )
+
+    def test_02_comments_etag(self, client, admin_client, admin):
+        reviews, titles = create_reviews(admin_client, {admin: admin_client})
+        url = self.COMMENTS_URL_TEMPLATE.format(
+            title_id=titles[0]['id'], review_id=reviews[0]['id']
+        )
+        etag = client.get(url)['ETag']
+        admin_client.post(url, data={'text': 'Комментарий'})
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK
+        assert len(response.json()['results']) == 1
+
+    def test_03_other_process_changes_etag(self, client, admin_client,
+                                           admin):
+        reviews, titles = create_reviews(admin_client, {admin: admin_client})
+        url = self.REVIEWS_URL_TEMPLATE.format(title_id=titles[0]['id'])
+        etag = client.get(url)['ETag']
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.NOT_MODIFIED
+
+        run_in_other_process(
+            'from api.caching import bump_version, reviews_scope; '
+            f'bump_version(reviews_scope({titles[0]["id"]}))'
+        )
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что версии для ETag хранятся в общем кэше: '
+            'изменение в другом воркере не должно давать 304.'
+        )
@@ -0,0 +1,102 @@
+from http import HTTPStatus
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Review, Title
+from tests.utils import create_reviews, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test13SparseFieldsets:
+
+    TITLES_URL = '/api/v1/titles/'
+    REVIEWS_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/'
+
+    def test_01_title_fields(self, client, admin_client):
+        create_titles(admin_client)
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(
+                self.TITLES_URL, {'fields': 'id,name,rating'}
+            )
+        assert response.status_code == HTTPStatus.OK
+        for title in response.json()['results']:
+            assert set(title) == {'id', 'name', 'rating'}, (
+                'Проверьте, что `?fields=` оставляет в ответе только '
+                'перечисленные поля.'
+            )
+        sql = ' '.join(query['sql'] for query in context.captured_queries)
+        assert 'reviews_genre' not in sql, (
+            'Проверьте, что при запросе без поля `genre` жанры '
+            'не загружаются.'
+        )
+        assert 'description' not in sql
+        assert len(context.captured_queries) == 2
+
+    def test_02_omit_and_reviews(self, client, admin_client, admin):
+        _, titles = create_reviews(admin_client, {admin: admin_client})
+        response = client.get(self.TITLES_URL, {'omit': 'description,genre'})
+        title = response.json()['results'][0]
+        assert 'description' not in title and 'genre' not in title
+        assert title['category']['slug']
+
+        response = client.get(
+            self.REVIEWS_URL_TEMPLATE.format(title_id=titles[0]['id']),
+            {'fields': 'id,score', 'pagination': 'cursor'}
+        )
+        assert response.json()['results'][0].keys() == {'id', 'score'}
+
+    def test_03_users_fields(self, admin_client):
+        response = admin_client.get('/api/v1/users/me/', {'fields': 'role'})
+        assert response.json() == {'role': 'admin'}
+
+    def walk(self, client, url, params):
+        """Все страницы курсорного списка: id записей по порядку."""
+        ids = []
+        response = client.get(url, params)
+        while True:
+            assert response.status_code == HTTPStatus.OK, (
+                'Проверьте, что `?fields=` вместе с курсорной пагинацией '
+                'не ломает переход между страницами.'
+            )
+            data = response.json()
+            for row in data['results']:
+                assert row.keys() == set(params['fields'].split(','))
+                ids.append(row['id'])
+            if not data['next']:
+                return ids
+            response = client.get(data['next'])
+
+    @pytest.mark.parametrize('flat', (True, False))
+    def test_04_fields_with_cursor_pages(self, client, settings, flat):
+        settings.FLAT_READ_SERIALIZERS = flat
+        Title.objects.bulk_create(
+            Title(name=f'Произведение {index:02}') for index in range(15)
+        )
+        ids = self.walk(
+            client, self.TITLES_URL, {'fields': 'id', 'pagination': 'cursor'}
+        )
+        assert ids == list(
+            Title.objects.order_by('name', 'id').values_list('id', flat=True)
+        )
+
+        title = Title.objects.first()
+        User = get_user_model()
+        User.objects.bulk_create(
+            User(username=f'reader-{index}', email=f'r{index}@yamdb.fake')
+            for index in range(15)
+        )
+        Review.objects.bulk_create(
+            Review(title=title, author=user, text='Отзыв', score=7)
+            for user in User.objects.filter(username__startswith='reader-')
+        )
+        ids = self.walk(
+            client, self.REVIEWS_URL_TEMPLATE.format(title_id=title.id),
+            {'fields': 'id,score', 'pagination': 'cursor'}
+        )
+        assert ids == list(
+            Review.objects.filter(title=title)
+            .order_by('pub_date', 'id').values_list('id', flat=True)
+        )
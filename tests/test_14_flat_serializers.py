@@ -0,0 +1,41 @@
+import pytest
+from django.core.cache import cache
+
+from reviews.models import Title
+from tests.utils import create_comments
+
+
+@pytest.mark.django_db(transaction=True)
+class Test14FlatSerializers:
+
+    def assert_same_content(self, client, settings, url, params=None):
+        settings.FLAT_READ_SERIALIZERS = False
+        cache.clear()
+        expected = client.get(url, params)
+        settings.FLAT_READ_SERIALIZERS = True
+        cache.clear()
+        response = client.get(url, params)
+        assert response.status_code == expected.status_code
+        assert response.content == expected.content, (
+            f'Проверьте, что быстрый сериализатор для `{url}` возвращает '
+            'тот же JSON, что и обычный.'
+        )
+
+    def test_01_same_json(self, client, settings, admin_client, admin, user,
+                          user_client):
+        author_map = {admin: admin_client, user: user_client}
+        _, reviews, titles = create_comments(admin_client, author_map)
+        Title.objects.create(name='Без категории', description=None)
+        reviews_url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        comments_url = f'{reviews_url}{reviews[0]["id"]}/comments/'
+
+        self.assert_same_content(client, settings, '/api/v1/titles/')
+        self.assert_same_content(
+            client, settings, '/api/v1/titles/',
+            {'pagination': 'cursor', 'fields': 'name,genre'}
+        )
+        self.assert_same_content(
+            client, settings, '/api/v1/titles/', {'q': 'орешек'}
+        )
+        self.assert_same_content(client, settings, reviews_url)
+        self.assert_same_content(client, settings, comments_url)
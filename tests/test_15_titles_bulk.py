@@ -0,0 +1,157 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import NotSupportedError, connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from api.batching import fill_bulk_ids
+from reviews.models import Title
+from tests.utils import create_categories, create_genre
+
+
+@pytest.mark.django_db(transaction=True)
+class Test15TitlesBulkCreate:
+
+    BULK_URL = '/api/v1/titles/bulk/'
+
+    def test_01_bulk_create(self, admin_client, client):
+        genres = create_genre(admin_client)
+        categories = create_categories(admin_client)
+        items = [
+            {
+                'name': f'Произведение {index}',
+                'year': 2000 + index,
+                'genre': [genres[0]['slug'], genres[1]['slug']],
+                'category': categories[index % 2]['slug'],
+            }
+            for index in range(20)
+        ]
+        with CaptureQueriesContext(connection) as context:
+            response = admin_client.post(self.BULK_URL, items, format='json')
+        assert response.status_code == HTTPStatus.CREATED, (
+            f'Проверьте, что POST-запрос администратора к `{self.BULK_URL}` '
+            'с корректными данными возвращает ответ со статусом 201.'
+        )
+        assert len(context.captured_queries) < 15, (
+            'Проверьте, что число запросов при массовом создании '
+            'не зависит от числа произведений.'
+        )
+        results = response.json()
+        assert [item['status'] for item in results] == [201] * 20
+        data = results[3]['data']
+        assert data['name'] == 'Произведение 3'
+        assert data['category']['slug'] == categories[1]['slug']
+        assert [genre['slug'] for genre in data['genre']] == sorted(
+            [genres[0]['slug'], genres[1]['slug']],
+            key=lambda slug: next(
+                genre['name'] for genre in genres if genre['slug'] == slug
+            )
+        )
+        assert Title.objects.count() == 20
+
+        detail = client.get(f'/api/v1/titles/{data["id"]}/').json()
+        assert detail == data, (
+            'Проверьте, что в ответе массового создания те же данные, '
+            'что и в карточке произведения.'
+        )
+        found = client.get('/api/v1/titles/', {'q': 'произведение 3'})
+        assert found.json()['count'] == 1, (
+            'Проверьте, что созданные пакетом произведения попадают '
+            'в поисковый индекс.'
+        )
+
+    def test_02_partial_failure(self, admin_client, user_client):
+        genres = create_genre(admin_client)
+        categories = create_categories(admin_client)
+        items = [
+            {
+                'name': 'Корректное',
+                'year': 1999,
+                'genre': [genres[0]['slug']],
+                'category': categories[0]['slug'],
+            },
+            {
+                'name': 'Неизвестные слаги',
+                'year': 1999,
+                'genre': ['no-such-genre', genres[0]['slug'], 'other'],
+                'category': 'no-such-category',
+            },
+            'не объект',
+        ]
+        response = user_client.post(self.BULK_URL, items, format='json')
+        assert response.status_code == HTTPStatus.FORBIDDEN
+
+        response = admin_client.post(self.BULK_URL, items, format='json')
+        assert response.status_code == HTTPStatus.MULTI_STATUS
+        results = response.json()
+        assert results[0]['status'] == 201
+        assert results[1]['status'] == 400
+        assert set(results[1]['errors']) == {'genre', 'category'}
+        assert len(results[1]['errors']['genre']) == 2
+        assert results[2]['status'] == 400
+        assert Title.objects.count() == 1
+
+        response = admin_client.post(self.BULK_URL, {}, format='json')
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+
+
+@pytest.mark.django_db(transaction=True)
+class Test15TitleGenreSlugs:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    def test_01_genres_resolved_in_one_query(self, admin_client):
+        genres = create_genre(admin_client)
+        categories = create_categories(admin_client)
+        data = {
+            'name': 'Много жанров',
+            'year': 2001,
+            'genre': [genre['slug'] for genre in genres],
+            'category': categories[0]['slug'],
+        }
+        with CaptureQueriesContext(connection) as context:
+            admin_client.post(self.TITLES_URL, data=data)
+        # Slug-и разрешаются по справочнику в памяти: не больше одного
+        # чтения таблицы жанров, и то если справочник устарел.
+        genre_lookups = [
+            query for query in context.captured_queries
+            if 'FROM "reviews_genre"' in query['sql']
+        ]
+        assert len(genre_lookups) <= 1, (
+            'Проверьте, что все slug-и жанров разрешаются одним запросом.'
+        )
+
+    def test_02_all_unknown_slugs_reported(self, admin_client):
+        genres = create_genre(admin_client)
+        categories = create_categories(admin_client)
+        data = {
+            'name': 'Неизвестные жанры',
+            'year': 2001,
+            'genre': ['first-unknown', genres[0]['slug'], 'second-unknown'],
+            'category': categories[0]['slug'],
+        }
+        response = admin_client.post(self.TITLES_URL, data=data)
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        errors = response.json()['genre']
+        assert len(errors) == 2 and 'second-unknown' in errors[1], (
+            'Проверьте, что в ответе перечислены все неизвестные slug-и.'
+        )
+
+
+@pytest.mark.django_db(transaction=True)
+class Test15FillBulkIds:
+
+    def test_01_ids_only_inside_sqlite_transaction(self, monkeypatch):
+        titles = [Title(name='Первое'), Title(name='Второе')]
+        with transaction.atomic():
+            Title.objects.bulk_create(titles)
+            fill_bulk_ids(titles)
+        assert [title.pk for title in titles] == list(
+            Title.objects.order_by('id').values_list('id', flat=True)
+        )
+
+        with pytest.raises(NotSupportedError):
+            fill_bulk_ids([Title(name='Вне транзакции')])
+        monkeypatch.setattr(connection, 'vendor', 'mysql')
+        with pytest.raises(NotSupportedError), transaction.atomic():
+            fill_bulk_ids([Title(name='Другая СУБД')])
@@ -0,0 +1,103 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from tests.utils import create_categories, create_genre
+
+
+def statements(context):
+    """Тип каждого запроса; `executemany` пишется как `N times: SQL`."""
+    return [
+        query['sql'].split(': ', 1)[-1].split()[0].upper()
+        for query in context.captured_queries
+        if query['sql'] not in ('BEGIN', 'COMMIT')
+    ]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test16TitleWriteQueries:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    def create_payload(self, admin_client):
+        genres = create_genre(admin_client)
+        categories = create_categories(admin_client)
+        return genres, {
+            'name': 'Поворот',
+            'year': 2001,
+            'genre': [genres[0]['slug'], genres[1]['slug']],
+            'category': categories[0]['slug'],
+        }
+
+    def test_01_create_without_requery(self, admin_client):
+        genres, payload = self.create_payload(admin_client)
+        with CaptureQueriesContext(connection) as context:
+            response = admin_client.post(self.TITLES_URL, data=payload)
+        assert response.status_code == HTTPStatus.CREATED
+        executed = statements(context)
+        first_insert = executed.index('INSERT')
+        assert 'SELECT' not in executed[first_insert:], (
+            'Проверьте, что после создания произведения ответ собирается '
+            'без повторного чтения из базы.'
+        )
+        # Пользователь, категория, жанры; произведение, поиск, связи.
+        assert executed == ['SELECT'] * 3 + ['INSERT'] * 3, (
+            'Проверьте, что создание произведения выполняет только '
+            'необходимые запросы.'
+        )
+        data = response.json()
+        assert data['category']['slug'] == payload['category']
+        assert sorted(genre['slug'] for genre in data['genre']) == sorted(
+            payload['genre']
+        )
+
+    def test_02_update_without_requery(self, admin_client, client):
+        genres, payload = self.create_payload(admin_client)
+        title_id = admin_client.post(
+            self.TITLES_URL, data=payload
+        ).json()['id']
+        url = f'{self.TITLES_URL}{title_id}/'
+
+        with CaptureQueriesContext(connection) as context:
+            response = admin_client.patch(url, data={'year': 1999})
+        assert response.status_code == HTTPStatus.OK
+        executed = statements(context)
+        assert executed[executed.index('UPDATE'):] == ['UPDATE'], (
+            'Проверьте, что после изменения произведения ответ '
+            'собирается без повторного чтения из базы.'
+        )
+        assert response.json()['year'] == 1999
+
+        with CaptureQueriesContext(connection) as context:
+            response = admin_client.patch(
+                url, data={'genre': [genres[2]['slug']]}
+            )
+        assert response.status_code == HTTPStatus.OK
+        executed = statements(context)
+        assert 'SELECT' not in executed[executed.index('DELETE'):], (
+            'Проверьте, что замена жанров не перечитывает произведение.'
+        )
+        assert response.json() == client.get(url).json(), (
+            'Проверьте, что ответ на изменение совпадает с карточкой '
+            'произведения.'
+        )
+
+    def test_03_update_keeps_rating(self, admin_client):
+        _, payload = self.create_payload(admin_client)
+        title_id = admin_client.post(
+            self.TITLES_URL, data=payload
+        ).json()['id']
+        with CaptureQueriesContext(connection) as context:
+            admin_client.patch(
+                f'{self.TITLES_URL}{title_id}/', data={'year': 1999}
+            )
+        update = next(
+            query['sql'] for query in context.captured_queries
+            if query['sql'].startswith('UPDATE')
+        )
+        assert 'rating' not in update, (
+            'Проверьте, что изменение произведения не перезаписывает '
+            'агрегаты рейтинга.'
+        )
@@ -0,0 +1,122 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.leaderboard import rebuild_leaderboard
+from reviews.models import Title
+from tests.utils import create_single_review, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test17Leaderboard:
+
+    TOP_URL = '/api/v1/titles/top/'
+
+    def top_ids(self, client, **params):
+        response = client.get(self.TOP_URL, params)
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что GET-запрос к `{self.TOP_URL}` возвращает '
+            'ответ со статусом 200.'
+        )
+        return [title['id'] for title in response.json()['results']]
+
+    def test_01_top_scopes(self, admin_client, user_client, client):
+        titles, categories, genres = create_titles(admin_client)
+        terminator, die_hard = titles[0]['id'], titles[1]['id']
+        assert self.top_ids(client) == [], (
+            'Проверьте, что произведения без оценок не попадают в рейтинг.'
+        )
+        create_single_review(admin_client, terminator, 'Неплохо', 4)
+        create_single_review(admin_client, die_hard, 'Отлично', 9)
+        create_single_review(user_client, die_hard, 'Хорошо', 7)
+
+        assert self.top_ids(client) == [die_hard, terminator], (
+            'Проверьте, что `/titles/top/` отдаёт произведения '
+            'по убыванию рейтинга.'
+        )
+        response = client.get(self.TOP_URL)
+        assert response.json()['results'][0]['rating'] == 8
+        assert self.top_ids(
+            client, category=categories[0]['slug']
+        ) == [terminator], (
+            'Проверьте, что параметр `category` ограничивает рейтинг '
+            'категорией.'
+        )
+        assert self.top_ids(client, genre=genres[2]['slug']) == [die_hard], (
+            'Проверьте, что параметр `genre` ограничивает рейтинг жанром.'
+        )
+        response = client.get(self.TOP_URL, {'genre': 'unknown'})
+        assert response.status_code == HTTPStatus.NOT_FOUND
+        response = client.get(self.TOP_URL, {
+            'genre': genres[2]['slug'], 'category': categories[0]['slug']
+        })
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+
+    def test_02_top_follows_changes(self, admin_client, client):
+        titles, categories, genres = create_titles(admin_client)
+        terminator, die_hard = titles[0]['id'], titles[1]['id']
+        review_id = create_single_review(
+            admin_client, terminator, 'Неплохо', 4
+        ).json()['id']
+        create_single_review(admin_client, die_hard, 'Отлично', 9)
+
+        response = admin_client.patch(
+            f'/api/v1/titles/{terminator}/reviews/{review_id}/',
+            data={'score': 10}
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert self.top_ids(client) == [terminator, die_hard], (
+            'Проверьте, что рейтинг обновляется при изменении оценки.'
+        )
+
+        admin_client.patch(
+            f'/api/v1/titles/{terminator}/',
+            data={'genre': [genres[2]['slug']],
+                  'category': categories[1]['slug']}
+        )
+        assert self.top_ids(client, genre=genres[0]['slug']) == []
+        assert self.top_ids(client, genre=genres[2]['slug']) == [
+            terminator, die_hard
+        ], 'Проверьте, что рейтинг жанра учитывает смену жанров.'
+        assert self.top_ids(client, category=categories[0]['slug']) == []
+        assert self.top_ids(client, category=categories[1]['slug']) == [
+            terminator, die_hard
+        ], 'Проверьте, что рейтинг категории учитывает смену категории.'
+
+        admin_client.delete(
+            f'/api/v1/titles/{terminator}/reviews/{review_id}/'
+        )
+        assert self.top_ids(client) == [die_hard], (
+            'Проверьте, что произведение без оценок уходит из рейтинга.'
+        )
+
+    def test_03_top_cursor_pages(self, client):
+        Title.objects.bulk_create(
+            Title(name=f'Произведение {index}', rating=index % 7)
+            for index in range(25)
+        )
+        rebuild_leaderboard()
+        expected = list(
+            Title.objects.order_by('-rating', 'id')
+            .values_list('id', flat=True)
+        )
+        ids = []
+        url = self.TOP_URL
+        while url:
+            with CaptureQueriesContext(connection) as context:
+                response = client.get(url)
+            assert response.status_code == HTTPStatus.OK
+            assert len(context.captured_queries) <= 3, (
+                'Проверьте, что страница рейтинга читается без агрегации '
+                'и без запросов на каждое произведение.'
+            )
+            data = response.json()
+            assert 'count' not in data
+            ids.extend(title['id'] for title in data['results'])
+            url = data['next']
+        assert ids == expected, (
+            'Проверьте, что курсорная пагинация рейтинга обходит все '
+            'произведения без пропусков и повторов.'
+        )
@@ -0,0 +1,86 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import ScoreHistogram
+from reviews.ratings import recalculate_histograms
+from tests.utils import create_single_review, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test18ReviewSummary:
+
+    SUMMARY_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/summary/'
+
+    def get_summary(self, client, title_id):
+        url = self.SUMMARY_URL_TEMPLATE.format(title_id=title_id)
+        response = client.get(url)
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что GET-запрос к `{url}` возвращает ответ '
+            'со статусом 200.'
+        )
+        return response.json()
+
+    @staticmethod
+    def histogram(**counts):
+        return {
+            str(score): counts.get(f's{score}', 0) for score in range(1, 11)
+        }
+
+    def test_01_summary(self, admin_client, user_client, moderator_client,
+                        client):
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        assert self.get_summary(client, title_id) == {
+            'count': 0, 'mean': None, 'median': None,
+            'histogram': self.histogram(),
+        }, 'Проверьте сводку по произведению без отзывов.'
+
+        create_single_review(admin_client, title_id, 'Отлично', 10)
+        create_single_review(user_client, title_id, 'Так себе', 4)
+        review_id = create_single_review(
+            moderator_client, title_id, 'Хорошо', 7
+        ).json()['id']
+        assert self.get_summary(client, title_id) == {
+            'count': 3, 'mean': 7, 'median': 7,
+            'histogram': self.histogram(s4=1, s7=1, s10=1),
+        }, 'Проверьте, что сводка учитывает новые отзывы.'
+
+        url = f'/api/v1/titles/{title_id}/reviews/{review_id}/'
+        moderator_client.patch(url, data={'score': 4})
+        summary = self.get_summary(client, title_id)
+        assert summary['histogram'] == self.histogram(s4=2, s10=1), (
+            'Проверьте, что распределение обновляется при изменении оценки.'
+        )
+        assert summary['median'] == 4
+
+        moderator_client.delete(url)
+        summary = self.get_summary(client, title_id)
+        assert summary['count'] == 2
+        assert summary['median'] == 7, (
+            'Проверьте, что при чётном числе оценок медиана — среднее '
+            'двух центральных значений.'
+        )
+        stored = ScoreHistogram.objects.get(title_id=title_id).get_counts()
+        recalculate_histograms()
+        assert ScoreHistogram.objects.get(
+            title_id=title_id
+        ).get_counts() == stored, (
+            'Проверьте, что счётчики совпадают с пересчётом по отзывам.'
+        )
+
+    def test_02_summary_single_query(self, admin_client, client):
+        titles, _, _ = create_titles(admin_client)
+        create_single_review(admin_client, titles[0]['id'], 'Отлично', 9)
+        with CaptureQueriesContext(connection) as context:
+            summary = self.get_summary(client, titles[0]['id'])
+        assert summary['count'] == 1
+        assert len(context.captured_queries) == 1, (
+            'Проверьте, что сводка читается одним запросом.'
+        )
+
+    def test_03_summary_unknown_title(self, client):
+        response = client.get(self.SUMMARY_URL_TEMPLATE.format(title_id=999))
+        assert response.status_code == HTTPStatus.NOT_FOUND
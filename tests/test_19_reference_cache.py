@@ -0,0 +1,95 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Category
+from tests.utils import create_titles, run_in_other_process
+
+
+@pytest.mark.django_db(transaction=True)
+class Test19ReferenceCache:
+
+    def test_01_category_list_from_memory(self, admin_client, client):
+        create_titles(admin_client)
+        client.get('/api/v1/categories/')
+        with CaptureQueriesContext(connection) as context:
+            response = client.get('/api/v1/categories/')
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()['count'] == 2
+        assert len(context.captured_queries) == 0, (
+            'Проверьте, что список категорий отдаётся из справочника '
+            'в памяти без запросов к базе.'
+        )
+        response = client.get('/api/v1/genres/', {'search': 'Ужасы'})
+        assert response.json()['count'] == 1, (
+            'Проверьте, что поиск по жанрам продолжает работать.'
+        )
+
+    def test_02_title_list_without_reference_joins(self, admin_client,
+                                                   client):
+        titles, categories, _ = create_titles(admin_client)
+        client.get('/api/v1/categories/')
+        client.get('/api/v1/genres/')
+        with CaptureQueriesContext(connection) as context:
+            response = client.get('/api/v1/titles/')
+        assert response.status_code == HTTPStatus.OK
+        sql = ' '.join(query['sql'] for query in context.captured_queries)
+        assert 'reviews_category' not in sql and 'reviews_genre"' not in sql, (
+            'Проверьте, что список произведений не обращается к таблицам '
+            'категорий и жанров.'
+        )
+        by_id = {title['id']: title for title in response.json()['results']}
+        assert by_id[titles[0]['id']]['category'] == categories[0]
+        detail = client.get(f'/api/v1/titles/{titles[0]["id"]}/').json()
+        assert detail == by_id[titles[0]['id']], (
+            'Проверьте, что список и карточка произведения совпадают.'
+        )
+
+    def test_03_new_reference_rows_visible(self, admin_client):
+        create_titles(admin_client)
+        admin_client.get('/api/v1/genres/')
+        admin_client.post(
+            '/api/v1/genres/', data={'name': 'Вестерн', 'slug': 'western'}
+        )
+        response = admin_client.post('/api/v1/titles/', data={
+            'name': 'Хороший, плохой, злой',
+            'year': 1966,
+            'genre': ['western'],
+            'category': 'films',
+        })
+        assert response.status_code == HTTPStatus.CREATED, (
+            'Проверьте, что новый жанр сразу доступен при создании '
+            'произведения.'
+        )
+        slugs = [
+            genre['slug']
+            for genre in admin_client.get('/api/v1/genres/').json()['results']
+        ]
+        assert 'western' in slugs
+
+    def test_04_shared_version_reloads(self, admin_client, client):
+        create_titles(admin_client)
+        client.get('/api/v1/categories/')
+        # Правка в обход сигналов; версию затем сбрасывает другой процесс.
+        Category.objects.filter(slug='films').update(name='Кино')
+        names = [
+            category['name']
+            for category in client.get('/api/v1/categories/').json()['results']
+        ]
+        assert 'Кино' not in names
+        run_in_other_process(
+            'from api.caching import bump_version; '
+            'from api.reference import reference_scope; '
+            'from reviews.models import Category; '
+            'bump_version(reference_scope(Category))'
+        )
+        names = [
+            category['name']
+            for category in client.get('/api/v1/categories/').json()['results']
+        ]
+        assert 'Кино' in names, (
+            'Проверьте, что справочник перечитывается при смене версии '
+            'в общем кэше, в том числе другим воркером.'
+        )
@@ -0,0 +1,111 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from api.caching import bump_version
+from api.reference import reference_scope
+from reviews.genres import recalculate_genre_masks
+from reviews.models import Genre, Title
+from tests.utils import create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test20GenreFilter:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    def create_data(self, admin_client):
+        titles, categories, genres = create_titles(admin_client)
+        slugs = [genre['slug'] for genre in genres]
+        response = admin_client.post(self.TITLES_URL, data={
+            'name': 'Чужой',
+            'year': 1979,
+            'genre': [slugs[0], slugs[2]],
+            'category': categories[0]['slug'],
+        })
+        assert response.status_code == HTTPStatus.CREATED
+        ids = [titles[0]['id'], titles[1]['id'], response.json()['id']]
+        return ids, slugs, categories
+
+    def found(self, client, **params):
+        response = client.get(self.TITLES_URL, params)
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что GET-запрос к `{self.TITLES_URL}` с параметрами '
+            f'{params} возвращает ответ со статусом 200.'
+        )
+        return sorted(title['id'] for title in response.json()['results'])
+
+    def test_01_all_and_any(self, admin_client, client):
+        ids, slugs, categories = self.create_data(admin_client)
+        assert self.found(client, genre=slugs[0]) == [ids[0], ids[2]], (
+            'Проверьте фильтрацию по одному жанру.'
+        )
+        assert self.found(client, genre=f'{slugs[0]},{slugs[1]}') == [
+            ids[0]
+        ], 'Проверьте, что по умолчанию нужны все перечисленные жанры.'
+        assert self.found(
+            client, genre=f'{slugs[1]},{slugs[2]}', genre_mode='any'
+        ) == ids, 'Проверьте режим `genre_mode=any`.'
+        assert self.found(client, genre=f'{slugs[0]},unknown') == []
+        assert self.found(
+            client, genre=f'{slugs[1]},unknown', genre_mode='any'
+        ) == [ids[0]]
+        assert self.found(
+            client, genre=slugs[0], category=categories[0]['slug'],
+            year=1979
+        ) == [ids[2]], 'Проверьте сочетание жанров с другими фильтрами.'
+        response = client.get(self.TITLES_URL, {'genre_mode': 'some'})
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+
+    def test_02_single_predicate(self, admin_client, client):
+        _, slugs, _ = self.create_data(admin_client)
+        with CaptureQueriesContext(connection) as context:
+            client.get(self.TITLES_URL, {
+                'genre': ','.join(slugs), 'genre_mode': 'any'
+            })
+        sql = ' '.join(query['sql'] for query in context.captured_queries)
+        assert 'reviews_title_genre' not in sql, (
+            'Проверьте, что фильтр по жанрам не обращается к связующей '
+            'таблице.'
+        )
+
+    def test_03_mask_follows_changes(self, admin_client, client):
+        ids, slugs, _ = self.create_data(admin_client)
+        admin_client.patch(
+            f'{self.TITLES_URL}{ids[1]}/', data={'genre': [slugs[1]]}
+        )
+        assert self.found(client, genre=slugs[1]) == [ids[0], ids[1]], (
+            'Проверьте, что маска обновляется при изменении жанров.'
+        )
+        Title.objects.get(pk=ids[0]).genre.set(
+            [Genre.objects.get(slug=slugs[2])]
+        )
+        assert self.found(client, genre=slugs[2]) == [ids[0], ids[2]], (
+            'Проверьте, что маска обновляется через m2m_changed.'
+        )
+        admin_client.delete(f'/api/v1/genres/{slugs[2]}/')
+        title = Title.objects.get(pk=ids[2])
+        expected = 1 << Genre.objects.get(slug=slugs[0]).bit
+        assert title.genre_mask == expected, (
+            'Проверьте, что при удалении жанра его бит снимается '
+            'с произведений.'
+        )
+
+    def test_04_genres_without_bits(self, admin_client, client):
+        ids, slugs, _ = self.create_data(admin_client)
+        Genre.objects.filter(slug=slugs[0]).update(bit=None)
+        recalculate_genre_masks()
+        bump_version(reference_scope(Genre))
+        assert self.found(client, genre=f'{slugs[0]},{slugs[2]}') == [
+            ids[2]
+        ]
+        assert self.found(
+            client, genre=f'{slugs[0]},{slugs[2]}', genre_mode='any'
+        ) == ids, (
+            'Проверьте, что жанры без бита фильтруются через связи.'
+        )
+        response = client.get(f'{self.TITLES_URL}{ids[0]}/')
+        listed = client.get(self.TITLES_URL, {'genre': slugs[1]})
+        assert listed.json()['results'] == [response.json()]
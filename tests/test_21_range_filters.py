@@ -0,0 +1,85 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+
+from api.filters import TitleFilter
+from reviews.models import Category, Title
+
+
+@pytest.mark.django_db(transaction=True)
+class Test21RangeFilters:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    @pytest.fixture
+    def catalog(self):
+        films = Category.objects.create(name='Фильм', slug='films')
+        books = Category.objects.create(name='Книга', slug='books')
+        Title.objects.bulk_create(
+            Title(
+                name=f'Произведение {index:03}',
+                year=1950 + index % 50,
+                category=films if index % 2 else books,
+                rating=index % 10 + 1 if index % 7 else None,
+            )
+            for index in range(200)
+        )
+        return films
+
+    def found(self, client, **params):
+        response = client.get(self.TITLES_URL, {**params, 'count': 'false'})
+        assert response.status_code == HTTPStatus.OK
+        ids = []
+        while True:
+            data = response.json()
+            ids.extend(title['id'] for title in data['results'])
+            if not data['next']:
+                return sorted(ids)
+            response = client.get(data['next'])
+
+    def test_01_year_and_rating_ranges(self, client, catalog):
+        expected = sorted(Title.objects.filter(
+            category=catalog, year__gte=1980, year__lte=1989
+        ).values_list('id', flat=True))
+        assert self.found(
+            client, category='films', year_min=1980, year_max=1989
+        ) == expected, (
+            'Проверьте, что `year_min` и `year_max` ограничивают годы '
+            'включительно.'
+        )
+        expected = sorted(Title.objects.filter(
+            rating__gte=3, rating__lte=4.5
+        ).values_list('id', flat=True))
+        assert self.found(client, rating_min=3, rating_max=4.5) == expected, (
+            'Проверьте, что `rating_min` и `rating_max` ограничивают рейтинг; '
+            'произведения без оценок не попадают в выборку.'
+        )
+        assert self.found(client, category='unknown') == []
+        response = client.get(self.TITLES_URL, {'year_min': 'eighties'})
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+
+    def plan(self, params):
+        if connection.vendor != 'sqlite':
+            pytest.skip('Планы запросов проверяются на SQLite.')
+        return TitleFilter(params, queryset=Title.objects.all()).qs.explain()
+
+    def test_02_category_decade_uses_index(self, catalog):
+        plan = self.plan({
+            'category': 'films', 'year_min': 1980, 'year_max': 1989
+        })
+        assert 'title_category_year_idx' in plan, (
+            'Проверьте, что выборка «категория + диапазон лет» '
+            f'использует индекс (category_id, year). План: {plan}'
+        )
+        assert 'reviews_category' not in plan, (
+            'Проверьте, что фильтр по категории не соединяет таблицу '
+            'категорий.'
+        )
+
+    def test_03_year_range_uses_index(self, catalog):
+        plan = self.plan({'year_min': 1980, 'year_max': 1989})
+        assert 'title_year_name_idx' in plan, (
+            'Проверьте, что диапазон лет использует индекс (year, name). '
+            f'План: {plan}'
+        )
@@ -0,0 +1,67 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Review
+from tests.utils import create_single_review, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test22ReviewCreate:
+
+    REVIEWS_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/'
+
+    def test_01_single_title_lookup(self, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        url = self.REVIEWS_URL_TEMPLATE.format(title_id=titles[0]['id'])
+        with CaptureQueriesContext(connection) as context:
+            response = admin_client.post(
+                url, data={'text': 'Отлично', 'score': 9}
+            )
+        assert response.status_code == HTTPStatus.CREATED
+        queries = [query['sql'] for query in context.captured_queries]
+        insert = next(
+            index for index, sql in enumerate(queries)
+            if sql.startswith('INSERT INTO "reviews_review"')
+        )
+        before_insert = queries[:insert]
+        title_reads = [
+            sql for sql in before_insert
+            if sql.startswith('SELECT') and 'FROM "reviews_title"' in sql
+        ]
+        assert len(title_reads) == 1, (
+            'Проверьте, что при создании отзыва произведение читается '
+            'из базы один раз.'
+        )
+        assert not any('reviews_review' in sql for sql in before_insert), (
+            'Проверьте, что повторный отзыв отсекает ограничение '
+            '`unique_review`, без отдельного запроса перед вставкой.'
+        )
+
+    def test_02_duplicate_rejected_by_constraint(self, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        create_single_review(admin_client, title_id, 'Отлично', 9)
+        response = admin_client.post(
+            self.REVIEWS_URL_TEMPLATE.format(title_id=title_id),
+            data={'text': 'Ещё раз', 'score': 1}
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что повторный отзыв на то же произведение '
+            'возвращает ответ со статусом 400.'
+        )
+        assert 'non_field_errors' in response.json()
+        assert Review.objects.filter(title_id=title_id).count() == 1
+        rating = admin_client.get(f'/api/v1/titles/{title_id}/').json()
+        assert rating['rating'] == 9, (
+            'Проверьте, что отклонённый отзыв не меняет рейтинг.'
+        )
+
+    def test_03_missing_title(self, admin_client):
+        response = admin_client.post(
+            self.REVIEWS_URL_TEMPLATE.format(title_id=999),
+            data={'text': 'Отлично', 'score': 9}
+        )
+        assert response.status_code == HTTPStatus.NOT_FOUND
@@ -0,0 +1,58 @@
+import pytest
+from django.db import connection
+from django.utils import timezone
+
+from api.pagination import KeysetPagination
+from reviews.models import Comment, Review
+
+
+@pytest.mark.django_db(transaction=True)
+class Test23ListIndexes:
+
+    @pytest.fixture(autouse=True)
+    def sqlite_only(self):
+        if connection.vendor != 'sqlite':
+            pytest.skip('Планы запросов проверяются на SQLite.')
+
+    def assert_index(self, queryset, index):
+        plan = queryset.explain()
+        assert index in plan, (
+            f'Проверьте, что запрос использует индекс {index}. План: {plan}'
+        )
+        assert 'TEMP B-TREE' not in plan, (
+            f'Проверьте, что сортировку обеспечивает индекс. План: {plan}'
+        )
+
+    def test_01_review_list(self):
+        self.assert_index(
+            Review.objects.filter(title_id=1).order_by('pub_date', 'id'),
+            'review_title_pub_date_idx'
+        )
+
+    def test_02_comment_list(self):
+        self.assert_index(
+            Comment.objects.filter(review_id=1).order_by('pub_date', 'id'),
+            'comment_review_pub_date_idx'
+        )
+
+    def test_03_author_listings(self):
+        self.assert_index(
+            Review.objects.filter(author_id=1).order_by('pub_date'),
+            'review_author_pub_date_idx'
+        )
+        self.assert_index(
+            Comment.objects.filter(author_id=1).order_by('pub_date'),
+            'comment_author_pub_date_idx'
+        )
+
+    def test_04_cursor_seeks_index(self):
+        paginator = KeysetPagination()
+        paginator.ordering = ('pub_date', 'id')
+        queryset = Review.objects.filter(title_id=1).filter(
+            paginator.keyset_filter([timezone.now(), 5], False)
+        ).order_by('pub_date', 'id')
+        plan = queryset.explain()
+        assert 'pub_date>' in plan.replace(' ', ''), (
+            'Проверьте, что курсорная страница начинает чтение индекса '
+            f'с позиции курсора. План: {plan}'
+        )
@@ -0,0 +1,59 @@
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from api.pagination import PageNumberOrCursorPagination
+from reviews.models import Comment, Review, Title
+
+User = get_user_model()
+
+
+@pytest.mark.django_db(transaction=True)
+class Test24AuthorQueries:
+
+    def fill(self, prefix, count):
+        """Произведение с `count` отзывами и комментариями разных авторов."""
+        title = Title.objects.create(name=f'Произведение {prefix}')
+        User.objects.bulk_create(
+            User(username=f'{prefix}-{index}', email=f'{prefix}-{index}@ya.ru')
+            for index in range(count)
+        )
+        authors = list(User.objects.filter(username__startswith=f'{prefix}-'))
+        Review.objects.bulk_create(
+            Review(title=title, author=author, text='Отзыв', score=5)
+            for author in authors
+        )
+        review = Review.objects.filter(title=title).first()
+        Comment.objects.bulk_create(
+            Comment(review=review, author=author, text='Комментарий')
+            for author in authors
+        )
+        reviews_url = f'/api/v1/titles/{title.id}/reviews/'
+        return reviews_url, f'{reviews_url}{review.id}/comments/'
+
+    def count_queries(self, client, url, count):
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(url)
+        assert response.status_code == 200
+        results = response.json()['results']
+        assert len(results) == min(count, 100)
+        assert all(item['author'] for item in results)
+        return len(context.captured_queries)
+
+    @pytest.mark.parametrize('flat', (True, False))
+    def test_01_constant_queries(self, client, settings, monkeypatch, flat):
+        settings.FLAT_READ_SERIALIZERS = flat
+        monkeypatch.setattr(PageNumberOrCursorPagination, 'page_size', 100)
+        few = [
+            self.count_queries(client, url, 2)
+            for url in self.fill('few', 2)
+        ]
+        many = [
+            self.count_queries(client, url, 100)
+            for url in self.fill('many', 100)
+        ]
+        assert many == few, (
+            'Проверьте, что число запросов к странице отзывов и комментариев '
+            'не зависит от числа авторов на ней.'
+        )
@@ -0,0 +1,174 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from api.serializers import ReviewSerializer
+from reviews.models import Comment, Review
+from tests.utils import (
+    create_single_comment, create_single_review, create_titles
+)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test25CommentsCount:
+
+    REVIEWS_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/'
+
+    def create_review(self, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        review = create_single_review(admin_client, title_id, 'Отлично', 9)
+        return title_id, review.json()['id']
+
+    def get_counts(self, client, title_id, review_id):
+        url = self.REVIEWS_URL_TEMPLATE.format(title_id=title_id)
+        listed = client.get(url).json()['results']
+        detail = client.get(f'{url}{review_id}/').json()
+        counts = [row['comments_count'] for row in listed]
+        return counts, detail['comments_count']
+
+    @pytest.mark.parametrize('flat', (True, False))
+    def test_01_count_follows_comments(self, admin_client, settings, flat):
+        settings.FLAT_READ_SERIALIZERS = flat
+        title_id, review_id = self.create_review(admin_client)
+        assert self.get_counts(admin_client, title_id, review_id) == ([0], 0)
+
+        comments = [
+            create_single_comment(
+                admin_client, title_id, review_id, f'Комментарий {index}'
+            ).json()['id']
+            for index in range(3)
+        ]
+        assert self.get_counts(admin_client, title_id, review_id) == (
+            [3], 3
+        ), (
+            'Проверьте, что `comments_count` отзыва растёт при создании '
+            'комментария, в том числе в списке отзывов.'
+        )
+
+        url = self.REVIEWS_URL_TEMPLATE.format(title_id=title_id)
+        response = admin_client.delete(
+            f'{url}{review_id}/comments/{comments[0]}/'
+        )
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        assert self.get_counts(admin_client, title_id, review_id) == (
+            [2], 2
+        ), (
+            'Проверьте, что `comments_count` уменьшается при удалении '
+            'комментария.'
+        )
+
+    def test_02_count_is_read_only(self, admin_client):
+        title_id, review_id = self.create_review(admin_client)
+        url = self.REVIEWS_URL_TEMPLATE.format(title_id=title_id)
+        response = admin_client.patch(
+            f'{url}{review_id}/', data={'comments_count': 100}
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()['comments_count'] == 0, (
+            'Проверьте, что `comments_count` нельзя изменить через API.'
+        )
+
+    def test_03_recalculate_command(self, admin_client, admin):
+        title_id, review_id = self.create_review(admin_client)
+        Comment.objects.bulk_create(
+            Comment(review_id=review_id, author=admin, text='Без сигналов')
+            for _ in range(4)
+        )
+        assert Review.objects.get(pk=review_id).comments_count == 0
+        etag = admin_client.get(
+            self.REVIEWS_URL_TEMPLATE.format(title_id=title_id)
+        )['ETag']
+
+        call_command('recalculate_comments_count')
+
+        assert Review.objects.get(pk=review_id).comments_count == 4, (
+            'Проверьте, что команда `recalculate_comments_count` '
+            'пересчитывает счётчики по таблице комментариев.'
+        )
+        response = admin_client.get(
+            self.REVIEWS_URL_TEMPLATE.format(title_id=title_id),
+            HTTP_IF_NONE_MATCH=etag
+        )
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что после пересчёта ETag списка отзывов меняется.'
+        )
+        assert response.json()['results'][0]['comments_count'] == 4
+
+    def test_04_cascade_does_not_load_reviews(self, admin_client, admin,
+                                               client):
+        title_id, review_id = self.create_review(admin_client)
+        for index in range(5):
+            Comment.objects.create(
+                review_id=review_id, author=admin, text=f'Текст {index}'
+            )
+        url = self.REVIEWS_URL_TEMPLATE.format(title_id=title_id)
+        etag = client.get(url)['ETag']
+        # Удаление комментария без загруженного отзыва меняет ETag отзывов.
+        Comment.objects.filter(review_id=review_id).first().delete()
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK
+
+        with CaptureQueriesContext(connection) as context:
+            Review.objects.get(pk=review_id).delete()
+        review_selects = [
+            query['sql'] for query in context.captured_queries
+            if query['sql'].startswith('SELECT')
+            and 'FROM "reviews_review"' in query['sql']
+        ]
+        assert len(review_selects) <= 2, (
+            'Проверьте, что при каскадном удалении отзыва его комментарии '
+            'не загружают отзыв по одному: ' + '; '.join(review_selects)
+        )
+
+    def test_05_review_edit_keeps_count(self, admin_client, admin):
+        title_id, review_id = self.create_review(admin_client)
+        # Отзыв загружен до параллельной вставки комментария.
+        stale = Review.objects.get(pk=review_id)
+        Comment.objects.create(review_id=review_id, author=admin, text='Да')
+        serializer = ReviewSerializer(
+            stale, data={'text': 'Исправлено'}, partial=True
+        )
+        assert serializer.is_valid()
+        serializer.save()
+        review = Review.objects.get(pk=review_id)
+        assert review.text == 'Исправлено'
+        assert review.comments_count == 1, (
+            'Проверьте, что изменение отзыва не перезаписывает '
+            '`comments_count` значением, загруженным до комментария.'
+        )
+
+    def test_06_comment_deletes_batch_title_lookup(self, admin_client,
+                                                   admin, client):
+        title_id, review_id = self.create_review(admin_client)
+        for index in range(5):
+            Comment.objects.create(
+                review_id=review_id, author=admin, text=f'Текст {index}'
+            )
+        url = self.REVIEWS_URL_TEMPLATE.format(title_id=title_id)
+
+        # Откат транзакции не должен ломать следующие инвалидации.
+        with pytest.raises(RuntimeError):
+            with transaction.atomic():
+                Comment.objects.filter(review_id=review_id).first().delete()
+                raise RuntimeError
+        etag = client.get(url)['ETag']
+        with CaptureQueriesContext(connection) as context:
+            with transaction.atomic():
+                for comment in Comment.objects.filter(review_id=review_id):
+                    comment.delete()
+        review_selects = [
+            query['sql'] for query in context.captured_queries
+            if query['sql'].startswith('SELECT')
+            and 'FROM "reviews_review"' in query['sql']
+        ]
+        assert len(review_selects) == 1, (
+            'Проверьте, что произведения удалённых комментариев '
+            'находятся одним запросом на транзакцию.'
+        )
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()['results'][0]['comments_count'] == 0
@@ -0,0 +1,103 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from tests.utils import (
+    create_single_comment, create_single_review, create_titles
+)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test26CommentParent:
+
+    COMMENTS_URL_TEMPLATE = (
+        '/api/v1/titles/{title_id}/reviews/{review_id}/comments/'
+    )
+
+    def create_review(self, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        review = create_single_review(
+            admin_client, titles[0]['id'], 'Отлично', 9
+        )
+        return titles, review.json()['id']
+
+    @staticmethod
+    def review_reads(context):
+        """Запросы, читающие сам отзыв, а не комментарии."""
+        return [
+            query['sql'] for query in context.captured_queries
+            if query['sql'].startswith('SELECT')
+            and 'FROM "reviews_review"' in query['sql']
+        ]
+
+    @pytest.mark.parametrize('flat', (True, False))
+    def test_01_list_without_review_lookup(self, admin_client, settings,
+                                           flat):
+        settings.FLAT_READ_SERIALIZERS = flat
+        titles, review_id = self.create_review(admin_client)
+        title_id = titles[0]['id']
+        create_single_comment(admin_client, title_id, review_id, 'Первый')
+        url = self.COMMENTS_URL_TEMPLATE.format(
+            title_id=title_id, review_id=review_id
+        )
+        with CaptureQueriesContext(connection) as context:
+            response = admin_client.get(url)
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()['count'] == 1
+        assert not self.review_reads(context), (
+            'Проверьте, что список комментариев фильтруется по отзыву '
+            'и произведению в том же запросе, без чтения отзыва.'
+        )
+
+    def test_02_empty_list_checks_parent(self, admin_client):
+        titles, review_id = self.create_review(admin_client)
+        url = self.COMMENTS_URL_TEMPLATE.format(
+            title_id=titles[0]['id'], review_id=review_id
+        )
+        response = admin_client.get(url)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что у отзыва без комментариев список пуст, '
+            'а не 404.'
+        )
+        assert response.json()['results'] == []
+
+        for title_id, missing_review in (
+            (titles[1]['id'], review_id),
+            (titles[0]['id'], review_id + 100),
+        ):
+            response = admin_client.get(self.COMMENTS_URL_TEMPLATE.format(
+                title_id=title_id, review_id=missing_review
+            ))
+            assert response.status_code == HTTPStatus.NOT_FOUND, (
+                'Проверьте, что для отзыва другого произведения или '
+                'несуществующего отзыва возвращается 404.'
+            )
+
+    def test_03_detail_checks_parent(self, admin_client):
+        titles, review_id = self.create_review(admin_client)
+        comment = create_single_comment(
+            admin_client, titles[0]['id'], review_id, 'Первый'
+        ).json()
+        url = self.COMMENTS_URL_TEMPLATE.format(
+            title_id=titles[1]['id'], review_id=review_id
+        )
+        response = admin_client.get(f'{url}{comment["id"]}/')
+        assert response.status_code == HTTPStatus.NOT_FOUND, (
+            'Проверьте, что комментарий не доступен по адресу '
+            'с чужим произведением.'
+        )
+
+    def test_04_create_reads_review_once(self, admin_client):
+        titles, review_id = self.create_review(admin_client)
+        url = self.COMMENTS_URL_TEMPLATE.format(
+            title_id=titles[0]['id'], review_id=review_id
+        )
+        with CaptureQueriesContext(connection) as context:
+            response = admin_client.post(url, data={'text': 'Новый'})
+        assert response.status_code == HTTPStatus.CREATED
+        assert len(self.review_reads(context)) == 1, (
+            'Проверьте, что при создании комментария отзыв читается '
+            'из базы один раз.'
+        )
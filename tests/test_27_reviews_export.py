@@ -0,0 +1,127 @@
+import json
+from datetime import timedelta
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from reviews.models import Comment, Review
+from tests.utils import (
+    create_single_comment, create_single_review, create_titles
+)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test27ReviewsExport:
+
+    EXPORT_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/export.ndjson'
+
+    def read_lines(self, response):
+        assert response.status_code == HTTPStatus.OK
+        assert response['Content-Type'] == 'application/x-ndjson'
+        assert response.streaming, (
+            'Проверьте, что выгрузка отдаётся потоком '
+            '(StreamingHttpResponse).'
+        )
+        content = b''.join(response.streaming_content).decode('utf-8')
+        return [json.loads(line) for line in content.splitlines()]
+
+    def test_01_export_reviews_and_comments(self, admin_client,
+                                            user_client):
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        review = create_single_review(
+            admin_client, title_id, 'Отлично', 9
+        ).json()
+        create_single_review(user_client, title_id, 'Неплохо', 6)
+        create_single_review(admin_client, titles[1]['id'], 'Чужой', 1)
+        comment = create_single_comment(
+            user_client, title_id, review['id'], 'Согласен'
+        ).json()
+
+        lines = self.read_lines(user_client.get(
+            self.EXPORT_URL_TEMPLATE.format(title_id=title_id),
+            HTTP_ACCEPT='application/x-ndjson'
+        ))
+        assert [line['type'] for line in lines] == [
+            'review', 'review', 'comment'
+        ], (
+            'Проверьте, что выгрузка содержит отзывы произведения, '
+            'а за ними комментарии к ним.'
+        )
+        assert lines[0] == {
+            'type': 'review', **review, 'comments_count': 1
+        }, (
+            'Проверьте, что строка отзыва совпадает с ответом API.'
+        )
+        assert lines[2] == {
+            'type': 'comment', **comment, 'review': review['id']
+        }, (
+            'Проверьте, что строка комментария совпадает с ответом API '
+            'и содержит id отзыва.'
+        )
+
+    def test_02_since(self, admin_client, user_client):
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        old = create_single_review(admin_client, title_id, 'Старый', 5)
+        Review.objects.filter(pk=old.json()['id']).update(
+            pub_date=timezone.now() - timedelta(days=2)
+        )
+        create_single_comment(
+            admin_client, title_id, old.json()['id'], 'Новый к старому'
+        )
+        new = create_single_review(user_client, title_id, 'Новый', 7)
+        since = (timezone.now() - timedelta(days=1)).isoformat()
+
+        lines = self.read_lines(admin_client.get(
+            self.EXPORT_URL_TEMPLATE.format(title_id=title_id),
+            {'since': since}
+        ))
+        assert [(line['type'], line['text']) for line in lines] == [
+            ('review', new.json()['text']),
+            ('comment', 'Новый к старому'),
+        ], (
+            'Проверьте, что с параметром `since` выгружаются только '
+            'отзывы и комментарии, опубликованные позже.'
+        )
+
+        response = admin_client.get(
+            self.EXPORT_URL_TEMPLATE.format(title_id=title_id),
+            {'since': 'вчера'}
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что некорректный `since` возвращает 400.'
+        )
+
+    def test_03_missing_title(self, client):
+        response = client.get(self.EXPORT_URL_TEMPLATE.format(title_id=999))
+        assert response.status_code == HTTPStatus.NOT_FOUND
+
+    def test_04_chunked_reads(self, admin_client, admin, settings):
+        settings.EXPORT_CHUNK_SIZE = 2
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        review_id = create_single_review(
+            admin_client, title_id, 'Отлично', 9
+        ).json()['id']
+        Comment.objects.bulk_create(
+            Comment(review_id=review_id, author=admin, text=f'№ {index}')
+            for index in range(7)
+        )
+        with CaptureQueriesContext(connection) as context:
+            response = admin_client.get(
+                self.EXPORT_URL_TEMPLATE.format(title_id=title_id)
+            )
+            lines = self.read_lines(response)
+        assert len(lines) == 8
+        comment_reads = [
+            query for query in context.captured_queries
+            if 'FROM "reviews_comment"' in query['sql']
+        ]
+        assert len(comment_reads) == 1, (
+            'Проверьте, что комментарии читаются одним запросом '
+            'через iterator(), без запроса на строку.'
+        )
@@ -0,0 +1,178 @@
+from http import HTTPStatus
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import IntegrityError, connection
+from django.test.utils import CaptureQueriesContext
+
+from api.views import ReviewViewSet
+from reviews.models import Review
+from tests.utils import create_single_review, create_titles
+
+User = get_user_model()
+
+
+@pytest.mark.django_db(transaction=True)
+class Test28ReviewsBulkCreate:
+
+    BULK_URL = '/api/v1/reviews/bulk/'
+
+    def create_authors(self, count):
+        User.objects.bulk_create(
+            User(username=f'partner-{index}', email=f'p{index}@partner.ru')
+            for index in range(count)
+        )
+        return [f'partner-{index}' for index in range(count)]
+
+    def test_01_bulk_create(self, admin_client, client):
+        titles, _, _ = create_titles(admin_client)
+        authors = self.create_authors(20)
+        items = [
+            {
+                'title': titles[index % 2]['id'],
+                'author': author,
+                'text': f'Отзыв {index}',
+                'score': index % 10 + 1,
+            }
+            for index, author in enumerate(authors)
+        ]
+        with CaptureQueriesContext(connection) as context:
+            response = admin_client.post(self.BULK_URL, items, format='json')
+        assert response.status_code == HTTPStatus.CREATED, (
+            f'Проверьте, что POST-запрос администратора к `{self.BULK_URL}` '
+            'с корректными данными возвращает ответ со статусом 201.'
+        )
+        assert len(context.captured_queries) < 25, (
+            'Проверьте, что число запросов при массовой загрузке отзывов '
+            'не зависит от числа отзывов.'
+        )
+        results = response.json()
+        assert [item['status'] for item in results] == [201] * 20
+        assert Review.objects.count() == 20
+
+        title_id = titles[0]['id']
+        listed = client.get(f'/api/v1/titles/{title_id}/reviews/').json()
+        assert results[0]['data'] in listed['results'], (
+            'Проверьте, что в ответе загрузки те же данные, '
+            'что и в списке отзывов.'
+        )
+        scores = [item['score'] for item in items[::2]]
+        title = client.get(f'/api/v1/titles/{title_id}/').json()
+        assert title['rating'] == pytest.approx(sum(scores) / len(scores)), (
+            'Проверьте, что после загрузки пересчитан рейтинг произведения.'
+        )
+        summary = client.get(
+            f'/api/v1/titles/{title_id}/reviews/summary/'
+        ).json()
+        assert summary['count'] == len(scores)
+        top = client.get('/api/v1/titles/top/').json()['results']
+        assert {row['id'] for row in top} == {
+            titles[0]['id'], titles[1]['id']
+        }
+
+    def test_02_partial_failure(self, admin_client, user_client, admin):
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        create_single_review(admin_client, title_id, 'Уже есть', 5)
+        authors = self.create_authors(2)
+        items = [
+            {'title': title_id, 'author': authors[0], 'text': 'Да',
+             'score': 8},
+            {'title': title_id, 'author': admin.username, 'text': 'Повтор',
+             'score': 8},
+            {'title': title_id, 'author': authors[0], 'text': 'Повтор',
+             'score': 8},
+            {'title': 999, 'author': 'nobody', 'text': 'Нет', 'score': 8},
+            {'title': title_id, 'author': authors[1], 'text': 'Нет',
+             'score': 11},
+            'не объект',
+        ]
+        response = user_client.post(self.BULK_URL, items, format='json')
+        assert response.status_code == HTTPStatus.FORBIDDEN, (
+            'Проверьте, что массовая загрузка отзывов доступна '
+            'только администратору.'
+        )
+
+        response = admin_client.post(self.BULK_URL, items, format='json')
+        assert response.status_code == HTTPStatus.MULTI_STATUS
+        results = response.json()
+        assert [item['status'] for item in results] == [
+            201, 400, 400, 400, 400, 400
+        ]
+        for index in (1, 2):
+            assert 'non_field_errors' in results[index]['errors'], (
+                'Проверьте, что повторный отзыв (в базе или в пакете) '
+                'отклоняется.'
+            )
+        assert set(results[3]['errors']) == {'title', 'author'}
+        assert set(results[4]['errors']) == {'score'}
+        assert Review.objects.count() == 2
+        title = admin_client.get(f'/api/v1/titles/{title_id}/').json()
+        assert title['rating'] == 6.5
+
+        response = admin_client.post(self.BULK_URL, {}, format='json')
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+
+    def test_03_concurrent_conflict(self, admin_client, monkeypatch):
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        authors = self.create_authors(3)
+        bulk_insert = ReviewViewSet.bulk_insert
+
+        def racing_insert(item_serializers):
+            names = {
+                serializer.validated_data['author']
+                for serializer in item_serializers
+            }
+            if len(names) > 1:
+                # Параллельный запрос вставил отзыв того же автора.
+                Review.objects.get_or_create(
+                    title_id=title_id,
+                    author=User.objects.get(username=authors[0]),
+                    defaults={'text': 'Параллельно', 'score': 5}
+                )
+                raise IntegrityError('UNIQUE constraint failed')
+            if authors[2] in names:
+                raise IntegrityError('UNIQUE constraint failed')
+            return bulk_insert(item_serializers)
+
+        monkeypatch.setattr(
+            ReviewViewSet, 'bulk_insert', staticmethod(racing_insert)
+        )
+        items = [
+            {'title': title_id, 'author': author, 'text': 'Текст',
+             'score': 7}
+            for author in authors
+        ]
+        response = admin_client.post(self.BULK_URL, items, format='json')
+        assert response.status_code == HTTPStatus.MULTI_STATUS, (
+            'Проверьте, что повторный конфликт при вставке пакета '
+            'возвращает ошибки элементов, а не ответ 500.'
+        )
+        results = response.json()
+        assert [item['status'] for item in results] == [400, 201, 400]
+        assert 'non_field_errors' in results[0]['errors']
+        assert 'non_field_errors' in results[2]['errors']
+        assert Review.objects.count() == 2
+
+    def test_04_own_throttle_scope(self, admin_client, settings):
+        settings.REST_FRAMEWORK = {
+            **settings.REST_FRAMEWORK,
+            'DEFAULT_THROTTLE_RATES': {
+                'write.user': '1/min', 'bulk.user': '2/min',
+            },
+        }
+        titles, _, _ = create_titles(admin_client)
+        for _ in range(2):
+            response = admin_client.post(self.BULK_URL, [], format='json')
+            assert response.status_code == HTTPStatus.CREATED
+        response = admin_client.post(self.BULK_URL, [], format='json')
+        assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS, (
+            'Проверьте, что массовая загрузка ограничена лимитом `bulk`.'
+        )
+        response = create_single_review(
+            admin_client, titles[0]['id'], 'Текст', 5
+        )
+        assert response.status_code == HTTPStatus.CREATED, (
+            'Проверьте, что массовая загрузка не расходует лимит `write`.'
+        )
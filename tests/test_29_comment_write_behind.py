@@ -0,0 +1,146 @@
+import threading
+import time
+from http import HTTPStatus
+
+import pytest
+from django.db import IntegrityError, connection
+
+from api.batching import CommentWriteBehind
+from reviews.models import Comment, Review
+from tests.utils import create_single_review, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test29CommentWriteBehind:
+
+    def create_review(self, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        review = create_single_review(admin_client, title_id, 'Отлично', 9)
+        return title_id, Review.objects.get(pk=review.json()['id'])
+
+    def save_concurrently(self, writer, comments):
+        """
+        Сохраняет комментарии из параллельных потоков: как запросы,
+        которые начались одновременно.
+        """
+        results = [None] * len(comments)
+        started = threading.Barrier(len(comments))
+
+        def worker(index):
+            try:
+                with writer.expect():
+                    started.wait(timeout=5)
+                    results[index] = writer.save(comments[index])
+            except Exception as error:
+                results[index] = error
+            finally:
+                connection.close()
+
+        threads = [
+            threading.Thread(target=worker, args=(index,))
+            for index in range(len(comments))
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(timeout=10)
+        return results
+
+    def test_01_api_write_behind(self, admin_client, settings):
+        settings.COMMENT_WRITE_BEHIND = True
+        title_id, review = self.create_review(admin_client)
+        url = f'/api/v1/titles/{title_id}/reviews/{review.id}/comments/'
+        etag = admin_client.get(f'/api/v1/titles/{title_id}/reviews/')[
+            'ETag'
+        ]
+        response = admin_client.post(url, data={'text': 'Пакетом'})
+        assert response.status_code == HTTPStatus.CREATED, (
+            'Проверьте, что в режиме `COMMENT_WRITE_BEHIND` комментарий '
+            'создаётся и возвращается ответ со статусом 201.'
+        )
+        data = response.json()
+        assert data['id'] and data['text'] == 'Пакетом'
+        assert admin_client.get(url).json()['results'] == [data], (
+            'Проверьте, что ответ возвращается после фиксации комментария.'
+        )
+        response = admin_client.get(
+            f'/api/v1/titles/{title_id}/reviews/', HTTP_IF_NONE_MATCH=etag
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()['results'][0]['comments_count'] == 1
+
+    def test_02_group_commit(self, admin_client, admin, settings,
+                             monkeypatch):
+        settings.COMMENT_WRITE_BEHIND = True
+        settings.COMMENT_WRITE_BEHIND_MAX_BATCH = 5
+        settings.COMMENT_WRITE_BEHIND_DELAY = 5
+        _, review = self.create_review(admin_client)
+        batches = []
+        write = CommentWriteBehind.write
+
+        def recording_write(batch):
+            batches.append(len(batch))
+            write(batch)
+
+        monkeypatch.setattr(
+            CommentWriteBehind, 'write', staticmethod(recording_write)
+        )
+        writer = CommentWriteBehind()
+        comments = [
+            Comment(review=review, author=admin, text=f'№ {index}')
+            for index in range(5)
+        ]
+        results = self.save_concurrently(writer, comments)
+        assert batches == [5], (
+            'Проверьте, что комментарии параллельных запросов '
+            'записываются одним пакетом.'
+        )
+        assert results == comments
+        assert sorted(comment.pk for comment in comments) == sorted(
+            Comment.objects.values_list('pk', flat=True)
+        ), (
+            'Проверьте, что после пакетной вставки у комментариев '
+            'проставлены id.'
+        )
+        review.refresh_from_db()
+        assert review.comments_count == 5
+
+    def test_03_failed_item_isolated(self, admin_client, admin, settings):
+        settings.COMMENT_WRITE_BEHIND = True
+        settings.COMMENT_WRITE_BEHIND_MAX_BATCH = 2
+        settings.COMMENT_WRITE_BEHIND_DELAY = 5
+        _, review = self.create_review(admin_client)
+        missing = Review(pk=review.pk + 100, title_id=review.title_id)
+        comments = [
+            Comment(review=review, author=admin, text='Хороший'),
+            Comment(review=missing, author=admin, text='Без отзыва'),
+        ]
+        results = self.save_concurrently(CommentWriteBehind(), comments)
+        assert results[0] is comments[0]
+        assert isinstance(results[1], IntegrityError), (
+            'Проверьте, что ошибка одного комментария пакета '
+            'возвращается только его запросу.'
+        )
+        assert list(Comment.objects.values_list('text', flat=True)) == [
+            'Хороший'
+        ]
+        review.refresh_from_db()
+        assert review.comments_count == 1
+
+    def test_04_single_writer_not_delayed(self, admin_client, admin,
+                                          settings):
+        settings.COMMENT_WRITE_BEHIND = True
+        settings.COMMENT_WRITE_BEHIND_DELAY = 5
+        _, review = self.create_review(admin_client)
+        writer = CommentWriteBehind()
+        started = time.monotonic()
+        with writer.expect():
+            comment = writer.save(
+                Comment(review=review, author=admin, text='Один')
+            )
+        assert time.monotonic() - started < 1, (
+            'Проверьте, что без параллельных запросов комментарий '
+            'записывается сразу, без ожидания пакета.'
+        )
+        assert comment.pk
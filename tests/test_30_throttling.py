@@ -0,0 +1,129 @@
+import threading
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from api.throttling import TokenBucketStore
+from tests.utils import create_single_review, create_titles
+
+
+def set_rates(settings, rates):
+    settings.REST_FRAMEWORK = {
+        **settings.REST_FRAMEWORK, 'DEFAULT_THROTTLE_RATES': rates
+    }
+
+
+@pytest.mark.django_db(transaction=True)
+class Test30Throttling:
+
+    SIGNUP_URL = '/api/v1/auth/signup/'
+
+    def test_01_signup_rejected_before_database(self, client, settings):
+        set_rates(settings, {'signup.ip': '3/min'})
+        for index in range(3):
+            response = client.post(self.SIGNUP_URL, data={
+                'email': f'user{index}@yamdb.fake',
+                'username': f'user{index}',
+            })
+            assert response.status_code == HTTPStatus.OK
+        with CaptureQueriesContext(connection) as context:
+            response = client.post(self.SIGNUP_URL, data={
+                'email': 'extra@yamdb.fake', 'username': 'extra',
+            })
+        assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS, (
+            'Проверьте, что регистрация сверх лимита `signup.ip` '
+            'возвращает ответ со статусом 429.'
+        )
+        assert int(response['Retry-After']) > 0
+        assert not context.captured_queries, (
+            'Проверьте, что запрос сверх лимита отклоняется '
+            'без обращений к базе.'
+        )
+
+    def test_02_writes_limited_per_user(self, admin_client, user_client,
+                                        settings):
+        set_rates(settings, {'write.user': '2/min'})
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        review_id = create_single_review(
+            admin_client, title_id, 'Отлично', 9
+        ).json()['id']
+        url = f'/api/v1/titles/{title_id}/reviews/{review_id}/comments/'
+        response = admin_client.post(url, data={'text': 'Второй'})
+        assert response.status_code == HTTPStatus.CREATED
+        response = admin_client.post(url, data={'text': 'Третий'})
+        assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS, (
+            'Проверьте, что отзывы и комментарии пользователя делят '
+            'лимит `write.user`.'
+        )
+        assert admin_client.get(url).status_code == HTTPStatus.OK, (
+            'Проверьте, что чтение не ограничивается лимитом записи.'
+        )
+        response = user_client.post(url, data={'text': 'Другой автор'})
+        assert response.status_code == HTTPStatus.CREATED, (
+            'Проверьте, что лимит `write.user` у каждого пользователя свой.'
+        )
+
+    def test_03_forwarded_for_is_not_trusted(self, client, settings):
+        set_rates(settings, {'signup.ip': '1/min'})
+        response = client.post(self.SIGNUP_URL, data={
+            'email': 'first@yamdb.fake', 'username': 'first',
+        }, HTTP_X_FORWARDED_FOR='10.0.0.1')
+        assert response.status_code == HTTPStatus.OK
+        response = client.post(self.SIGNUP_URL, data={
+            'email': 'second@yamdb.fake', 'username': 'second',
+        }, HTTP_X_FORWARDED_FOR='10.0.0.2')
+        assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS, (
+            'Проверьте, что поддельный заголовок `X-Forwarded-For` '
+            'не даёт клиенту новое ведро без доверенного прокси.'
+        )
+
+
+class Test30TokenBucketStore:
+
+    def test_01_refill(self, tmp_path):
+        store = TokenBucketStore(tmp_path / 'buckets.sqlite3')
+        assert store.consume('key', 2, 1, now=100) == 0
+        assert store.consume('key', 2, 1, now=100) == 0
+        assert store.consume('key', 2, 1, now=100) == pytest.approx(1)
+        assert store.consume('key', 2, 1, now=100.25) == pytest.approx(
+            0.75
+        ), 'Проверьте, что ожидание учитывает пополнение ведра.'
+        assert store.consume('key', 2, 1, now=101) == 0
+        assert store.consume('other', 2, 1, now=101) == 0, (
+            'Проверьте, что у каждого ключа своё ведро.'
+        )
+
+    def test_02_atomic_across_connections(self, tmp_path):
+        store = TokenBucketStore(tmp_path / 'buckets.sqlite3')
+        allowed = []
+
+        def worker():
+            for _ in range(10):
+                if not store.consume('shared', 50, 0.001, now=100):
+                    allowed.append(True)
+
+        threads = [threading.Thread(target=worker) for _ in range(10)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(timeout=10)
+        assert len(allowed) == 50, (
+            'Проверьте, что жетоны списываются атомарно: из 100 '
+            'параллельных запросов к ведру на 50 проходят ровно 50.'
+        )
+
+    def test_03_rejected_request_keeps_tokens(self, tmp_path):
+        store = TokenBucketStore(tmp_path / 'buckets.sqlite3')
+        buckets = (('user', 1, 0.001), ('ip', 3, 0.001))
+        assert store.consume_all(buckets, now=100) == 0
+        for _ in range(5):
+            assert store.consume_all(buckets, now=100) > 0
+        assert store.consume('ip', 3, 0.001, now=100) == 0
+        assert store.consume('ip', 3, 0.001, now=100) == 0, (
+            'Проверьте, что запрос, отклонённый одним ведром, '
+            'не списывает жетоны из остальных.'
+        )
+        assert store.consume('ip', 3, 0.001, now=100) > 0
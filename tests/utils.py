@@ -1,3 +1,6 @@
+import os
+import subprocess
+import sys
 from http import HTTPStatus
 
 
@@ -305,3 +308,23 @@ def check_fields(obj_type, url_pattern, obj, expected_data, detail=False):
         f'данные {obj_types[obj_type]}{results_in_msg}. Поле `id` не '
         'найдено или не является целым числом.'
     )
+
+
+def run_in_other_process(code):
+    """
+    Выполняет код в отдельном процессе `manage.py shell` (другой
+    воркер) с теми же настройками кэша, что и у теста.
+    """
+    from django.conf import settings
+
+    code = (
+        'from django.conf import settings; '
+        f'settings.CACHES = {settings.CACHES!r}; {code}'
+    )
+    result = subprocess.run(
+        [sys.executable, 'manage.py', 'shell', '-c', code],
+        cwd=os.path.join(os.path.dirname(os.path.dirname(__file__)),
+                         'api_yamdb'),
+        capture_output=True, text=True, timeout=60
+    )
+    assert result.returncode == 0, result.stderr